@@ -48,15 +48,21 @@ This section defines higher-level CLI commands for batch workflows and admin tas
 - @notes: 
 """
 
+import contextlib
 from pathlib import Path
 
 import typer
 
 from core.configuration.config_registry import get_path_config
+from core.llm.cache import bypass_cache
 from core.logger import get_logger
+from core.storage.parallel_ingest import ingest_directory
+from core.utils.job_journal import fingerprint, get_job_journal
 from core.workflows.main_commands import (
+    PACK_MAX_TOKENS,
     classify,
-    pipeline_from_upload,
+    classify_many,
+    parsed_name_for,
     upload_and_prepare,
 )
 
@@ -69,34 +75,58 @@ def classify_all(
     chunked: bool = False,
     overwrite: bool = False,
     segmentation: str = "semantic",
+    concurrency: int = typer.Option(
+        1, help="Documents classified in parallel (paced by OPENAI_RPM/OPENAI_TPM)"
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Call the API even for cached prompts"
+    ),
+    map_reduce: bool = typer.Option(
+        False, help="Summarize chunks concurrently and reduce hierarchically"
+    ),
+    pack_tokens: int = typer.Option(
+        PACK_MAX_TOKENS,
+        help="Prompt-token budget for packing small chunks, e.g. 6000 (0 = off)",
+    ),
+    resume: bool = typer.Option(
+        False, help="Continue the last unfinished run, retrying only failures"
+    ),
 ):
     """Classify all parsed files in the system."""
     paths = get_path_config()
-    for file in sorted(paths.parsed.glob("*.txt")):
-        name = file.name
-        meta_path = paths.metadata / f"{name}.meta.json"
-
-        if meta_path.exists() and not overwrite:
-            logger.info("Skipping %s (already classified)", name)
-            continue
-
-        try:
-            logger.info("Classifying %s...", name)
-            classify(name, chunked=chunked, segmentation=segmentation)
-            logger.info("Done: %s", name)
-        except Exception as e:
-            logger.error("Error: %s — %s", name, e)
+    job = get_job_journal(paths).begin(
+        "classify-all",
+        {"chunked": chunked, "overwrite": overwrite, "segmentation": segmentation},
+        resume=resume,
+    )
+    fps = {file.name: fingerprint(file) for file in sorted(paths.parsed.glob("*.txt"))}
+    names = job.pending(fps, "classified", fps)
+    for name in names:
+        job.mark(name, "classified", "running", fp=fps[name])
+    with bypass_cache() if no_cache else contextlib.nullcontext():
+        classify_many(
+            names,
+            concurrency=concurrency,
+            chunked=chunked,
+            segmentation=segmentation,
+            overwrite=overwrite,
+            paths=paths,
+            map_reduce=map_reduce,
+            pack_tokens=pack_tokens,
+            on_result=lambda name, status: job.record_status(
+                name, "classified", status, fps[name]
+            ),
+        )
+    job.complete()
 
 
 @app.command()
-def upload_all(directory: Path):
+def upload_all(
+    directory: Path,
+    workers: int = typer.Option(1, help="Parallel parser processes (0 = all cores)"),
+):
     """Upload and parse all files in the given local directory."""
-    for file in sorted(directory.glob("*")):
-        try:
-            logger.info("Uploading %s...", file.name)
-            upload_and_prepare(file)
-        except Exception as e:
-            logger.error("Failed on %s: %s", file.name, e)
+    ingest_directory(directory, workers=workers)
 
 
 @app.command()
@@ -104,17 +134,57 @@ def ingest_all(
     directory: Path,
     chunked: bool = False,
     segmentation: str = "semantic",
+    resume: bool = typer.Option(
+        False, help="Continue the last unfinished run, retrying only failures"
+    ),
 ):
     """Full pipeline: upload, parse, classify for all files in directory."""
+    paths = get_path_config()
+    job = get_job_journal(paths).begin(
+        "ingest-all",
+        {"directory": directory, "chunked": chunked, "segmentation": segmentation},
+        resume=resume,
+    )
     for file in sorted(directory.glob("*")):
+        txt_name = parsed_name_for(file)
         try:
-            logger.info("Ingesting %s...", file.name)
-            parsed_name = None  # Optional override name
-            result = pipeline_from_upload(
-                file,
-                parsed_name=parsed_name,
-                segmentation=segmentation,
-            )
+            fp = fingerprint(file)
+            if not job.is_done(file.name, "parsed", fp):
+                logger.info("Ingesting %s...", file.name)
+                with job.track(file.name, "parsed", fp):
+                    upload_and_prepare(file, paths=paths)
+            parsed_fp = fingerprint(paths.parsed / txt_name)
+            if job.is_done(txt_name, "classified", parsed_fp):
+                logger.info("Skipping %s (classified in job %d)", txt_name, job.id)
+                continue
+            with job.track(txt_name, "classified", parsed_fp):
+                result = classify(txt_name, segmentation=segmentation, paths=paths)
             logger.info("Metadata: %s...", result.get("summary", "")[:100])
         except Exception as e:
             logger.error("Error during ingestion of %s: %s", file.name, e)
+    job.complete()
+
+
+@app.command()
+def journal(
+    command: str = typer.Option(
+        None, help="Show the last job of this command (pipeline, classify-all, ...)"
+    ),
+):
+    """Show per-stage progress and failures of the last batch job."""
+    job = get_job_journal(get_path_config()).last_job(command)
+    if job is None:
+        typer.echo("No jobs recorded.")
+        return
+    info = job.info()
+    state = "finished" if info["finished"] else "unfinished"
+    typer.echo(f"Job {job.id} ({info['command']}, {state})")
+    for stage, counts in job.summary().items():
+        typer.echo(
+            f"  {stage}: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items()))
+        )
+    for failure in job.failures():
+        typer.echo(
+            f"  ✗ {failure['stage']} {failure['doc']} "
+            f"(attempts {failure['attempts']}): {failure['error']}"
+        )
@@ -2,7 +2,7 @@ from pathlib import Path
 
 import typer
 
-from core.parsing.openai_export import parse_chatgpt_export
+from core.parsing.openai_export import changed_conversations, parse_chatgpt_export
 
 app = typer.Typer(help="ChatGPT data export utilities")
 
@@ -16,8 +16,33 @@ def parse_export(
         Path("chat_exports"), help="Directory to save parsed conversations"
     ),
     markdown: bool = typer.Option(False, help="Save transcripts as Markdown"),
+    stream: bool = typer.Option(
+        False, help="Decode conversations one at a time (bounded memory)"
+    ),
+    incremental: bool = typer.Option(
+        False, help="Key files by conversation ID; rewrite only changed ones"
+    ),
+    workers: int = typer.Option(1, help="Processes rendering and writing files"),
+    columnar: Path | None = typer.Option(
+        None, help="Also write one row per message to this .parquet/.arrow file"
+    ),
 ):
     """Extract conversations and prompts from a ChatGPT data export."""
 
-    results = parse_chatgpt_export(export_path, out_dir, markdown=markdown)
+    results = parse_chatgpt_export(
+        export_path,
+        out_dir,
+        markdown=markdown,
+        stream=stream,
+        incremental=incremental,
+        workers=workers,
+        columnar=columnar,
+    )
     typer.echo(f"Parsed {len(results)} conversations into {out_dir}")
+    if incremental:
+        typer.echo(
+            f"{len(changed_conversations(out_dir))} new or updated; process just "
+            f"these with `kairos pipeline run-all --input-dir {out_dir} --changed-only`"
+        )
+    if columnar:
+        typer.echo(f"Message table written to {columnar}")
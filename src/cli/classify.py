@@ -16,6 +16,8 @@ It is intended for fast integration into scalable document processing pipelines.
 |:---------------|:---------|:------------------------------------|
 | classify       | CLI Command | Classify a single document using Claude summarization. |
 | classify_large | CLI Command | Classify large documents by chunking and merging results. |
+| batch_submit   | CLI Command | Queue pending documents as one OpenAI batch job (or run it locally). |
+| batch_collect  | CLI Command | Ingest a finished batch job and persist validated metadata. |
 
 🧠 For AI Agents:
 - @ai-dependencies: typer
@@ -41,10 +43,22 @@ It is intended for fast integration into scalable document processing pipelines.
 """
 
 
+from pathlib import Path
+from typing import Optional
+
 import typer
 
+from core.configuration.config_registry import get_path_config
 from core.logger import get_logger
-from core.workflows.main_commands import classify
+from core.workflows.batch_jobs import (
+    collect_batch,
+    get_batch_executor,
+    latest_batch,
+    load_manifest,
+    prepare_batch,
+    submit_batch,
+)
+from core.workflows.main_commands import PACK_MAX_TOKENS, classify
 
 app = typer.Typer()
 logger = get_logger(__name__)
@@ -55,8 +69,65 @@ def classify_one(
     name: str,
     chunked: bool = False,
     segmentation: str = "semantic",
+    map_reduce: bool = typer.Option(
+        False, help="Summarize chunks concurrently and reduce hierarchically"
+    ),
+    pack_tokens: int = typer.Option(
+        PACK_MAX_TOKENS,
+        help="Prompt-token budget for packing small chunks, e.g. 6000 (0 = off)",
+    ),
 ):
     """Classify a single document (optionally in chunked mode)."""
-    result = classify(name, chunked=chunked, segmentation=segmentation)
+    result = classify(
+        name,
+        chunked=chunked,
+        segmentation=segmentation,
+        map_reduce=map_reduce,
+        pack_tokens=pack_tokens,
+    )
     logger.info("Metadata saved.")
     logger.info("%s", result)
+
+
+@app.command()
+def batch_submit(
+    chunked: bool = False,
+    overwrite: bool = False,
+    segmentation: str = "semantic",
+    model: str = "gpt-4",
+    local: bool = typer.Option(
+        False, "--local", help="Run the batch offline with the fake stand-in model"
+    ),
+    pack_tokens: int = typer.Option(
+        PACK_MAX_TOKENS,
+        help="Prompt-token budget for packing small chunks, e.g. 6000 (0 = off)",
+    ),
+):
+    """Queue every unclassified parsed file as one batch job (half price)."""
+    paths = get_path_config()
+    job_dir = prepare_batch(
+        [file.name for file in sorted(paths.parsed.glob("*.txt"))],
+        model=model,
+        chunked=chunked,
+        segmentation=segmentation,
+        overwrite=overwrite,
+        paths=paths,
+        pack_tokens=pack_tokens,
+    )
+    submit_batch(job_dir, get_batch_executor("local" if local else "openai"))
+    logger.info("Batch job directory: %s", job_dir)
+
+
+@app.command()
+def batch_collect(
+    job_dir: Optional[Path] = typer.Argument(
+        None, help="Job directory (defaults to the most recent batch)"
+    ),
+):
+    """Ingest a finished batch job and persist its metadata."""
+    paths = get_path_config()
+    job_dir = job_dir or latest_batch(paths)
+    executor = get_batch_executor(load_manifest(job_dir).get("executor", "openai"))
+    status = collect_batch(job_dir, executor, paths=paths)
+    if not status:
+        logger.info("Batch not finished yet; run batch-collect again later.")
@@ -39,12 +39,14 @@ visualizations and metadata. Paths can be optionally configured via a JSON confi
     - Future Hints: Add options to select clustering algorithm or embedding model dynamically.
 """
 
+import contextlib
 from pathlib import Path
 
 import typer
 
 from core.clustering.clustering_steps import run_all_steps
 from core.configuration.config_registry import get_path_config
+from core.llm.cache import bypass_cache
 
 app = typer.Typer()
 
@@ -60,6 +62,9 @@ def run_all(
     out_dir: Path = typer.Option(None, help="Directory to save outputs"),
     method: str = "hdbscan",
     model: str = "gpt-4",
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Call the API even for cached cluster prompts"
+    ),
 ):
     """
     Run full clustering pipeline from existing embeddings.
@@ -69,10 +74,11 @@ def run_all(
     metadata_dir = metadata_dir or paths.metadata
     out_dir = out_dir or (paths.output / "cluster_output")
 
-    run_all_steps(
-        embedding_path=embedding_path,
-        metadata_dir=metadata_dir,
-        out_dir=out_dir,
-        method=method,
-        model=model,
-    )
+    with bypass_cache() if no_cache else contextlib.nullcontext():
+        run_all_steps(
+            embedding_path=embedding_path,
+            metadata_dir=metadata_dir,
+            out_dir=out_dir,
+            method=method,
+            model=model,
+        )
@@ -3,7 +3,15 @@ from pathlib import Path
 import typer
 
 from core.configuration.config_registry import get_path_config
-from core.utils.dedup import dedup_lines_in_folder
+from core.utils.dedup import (
+    MAX_LINES_IN_MEMORY,
+    NEAR_DUP_THRESHOLD,
+    SIMHASH_DISTANCE,
+    dedup_lines_in_folder,
+    dedup_lines_streaming,
+    estimate_savings,
+    find_near_duplicates,
+)
 
 app = typer.Typer()
 
@@ -12,6 +20,19 @@ app = typer.Typer()
 def dedup_prompts(
     prompt_dir: Path = typer.Option(None, help="Directory with prompt text files"),
     out_file: Path = typer.Option(None, help="Output file for unique lines"),
+    streaming: bool = typer.Option(
+        False, help="Sort on disk in bounded memory (for corpora larger than RAM)"
+    ),
+    max_lines: int = typer.Option(
+        MAX_LINES_IN_MEMORY, help="Lines held in memory per sorted run"
+    ),
+    near: bool = typer.Option(
+        False, help="Also drop SimHash near-duplicate lines (implies --streaming)"
+    ),
+    distance: int = typer.Option(
+        SIMHASH_DISTANCE, help="Max SimHash Hamming distance for --near"
+    ),
+    tmp_dir: Path = typer.Option(None, help="Scratch directory for sorted runs"),
 ) -> None:
     """Deduplicate lines across prompt files."""
     paths = get_path_config()
@@ -19,5 +40,36 @@ def dedup_prompts(
         prompt_dir = Path(paths.parsed) / "prompts"
     if out_file is None:
         out_file = Path("dedup.txt")
-    dedup_lines_in_folder(prompt_dir, out_file)
+    if streaming or near:
+        dedup_lines_streaming(
+            prompt_dir,
+            out_file,
+            max_lines=max_lines,
+            near_distance=distance if near else None,
+            tmp_dir=tmp_dir,
+        )
+    else:
+        dedup_lines_in_folder(prompt_dir, out_file)
     typer.echo(f"✅ Wrote deduped lines to {out_file}")
+
+
+@app.command()
+def near(
+    parsed_dir: Path = typer.Option(None, help="Directory with parsed .txt files"),
+    threshold: float = typer.Option(
+        NEAR_DUP_THRESHOLD, help="Estimated Jaccard similarity to count as duplicate"
+    ),
+) -> None:
+    """List near-duplicate documents (MinHash + LSH) and the API spend they cost."""
+    paths = get_path_config()
+    parsed_dir = parsed_dir or Path(paths.parsed)
+    duplicates, tokens = find_near_duplicates(
+        parsed_dir, index_path=Path(paths.vector) / "minhash.npz", threshold=threshold
+    )
+    for name, canonical in sorted(duplicates.items()):
+        typer.echo(f"{name} -> {canonical}")
+    saved = estimate_savings(tokens, duplicates)
+    typer.echo(
+        f"✅ {saved['documents']} near-duplicates; skipping them saves "
+        f"~{saved['tokens']} tokens, ~${saved['usd']:.2f}, ~{saved['seconds']:.0f}s"
+    )
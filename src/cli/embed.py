@@ -5,8 +5,10 @@ import typer
 
 from core.configuration.config_registry import get_path_config
 from core.embeddings.embedder import generate_embeddings
+from core.logger import get_logger
 
 app = typer.Typer()
+logger = get_logger(__name__)
 
 
 @app.command()
@@ -15,11 +17,49 @@ def all(
         "parsed", help="Which text source to embed: parsed, summary, raw, meta"
     ),
     out_path: Path = typer.Option(None, help="Output path for embeddings JSON file"),
+    segment_boundary: str = typer.Option(
+        None, help="Segment boundaries: cluster or texttiling (default: config)"
+    ),
+    pooled_segments: bool = typer.Option(
+        False, help="Pool window vectors into segment vectors (no re-embedding)"
+    ),
 ):
     """
     Generate embeddings from parsed text, summaries, or raw content.
     """
     paths = get_path_config()
     generate_embeddings(
-        method=method, out_path=out_path, segment_mode=paths.semantic_chunking
+        method=method,
+        out_path=out_path,
+        segment_mode=paths.semantic_chunking,
+        boundary_method=segment_boundary,
+        segment_vectors="pooled" if pooled_segments else "embed",
+    )
+
+
+@app.command()
+def neighbors(
+    k: int = typer.Option(10, help="Neighbours stored per vector"),
+    block_size: int = typer.Option(4096, help="Query vectors per FAISS batch"),
+    threads: int = typer.Option(None, help="FAISS threads (default: all cores)"),
+    full: bool = typer.Option(False, help="Rebuild instead of refreshing"),
+):
+    """
+    Precompute the related-documents graph used by ``Retriever.similar``.
+    """
+    from core.embeddings.embedder import MODEL_DIMS
+    from core.retrieval.neighbors import NeighborGraph
+    from core.vectorstore.faiss_store import FaissStore
+
+    paths = get_path_config()
+    store = FaissStore(
+        dim=MODEL_DIMS["text-embedding-3-large"], path=paths.vector / "mosaic.index"
     )
+    graph_path = paths.vector / "neighbors.npz"
+    graph = None if full else NeighborGraph.load(graph_path)
+    if graph is None or graph.k != k:
+        graph = NeighborGraph.build(store, k, block_size, threads)
+    elif graph.version != store.version:
+        graph = graph.refresh(store, block_size=block_size, threads=threads)
+    graph.save(graph_path)
+    logger.info("Saved neighbour graph for %d vectors to %s", len(graph), graph_path)
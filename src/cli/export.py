@@ -9,8 +9,22 @@ app = typer.Typer()
 
 
 @app.command()
-def parse(export_zip: Path, out_dir: Path = None):
+def parse(
+    export_zip: Path,
+    out_dir: Path = None,
+    stream: bool = False,
+    incremental: bool = False,
+    workers: int = 1,
+    columnar: Path = None,
+):
     """Parse a ChatGPT export ZIP into conversation text files."""
     paths = get_path_config()
     out = out_dir or paths.parsed / "chatgpt_export"
-    parse_chatgpt_export(export_zip, out)
+    parse_chatgpt_export(
+        export_zip,
+        out,
+        stream=stream,
+        incremental=incremental,
+        workers=workers,
+        columnar=columnar,
+    )
@@ -4,6 +4,7 @@ import typer
 
 from core.configuration.config_registry import get_path_config
 from core.configuration.path_config import PathConfig
+from core.storage.parallel_ingest import ingest_directory
 from core.storage.upload_local import prepare_document_for_processing
 
 app = typer.Typer(help="Parse documents into text with optional path overrides")
@@ -22,6 +23,7 @@ def _resolve_paths(
         vector=base.vector,
         schema=base.schema,
         semantic_chunking=base.semantic_chunking,
+        segment_boundary=base.segment_boundary,
     )
 
 
@@ -33,16 +35,17 @@ def run(
     raw_dir: Path | None = typer.Option(None, help="Raw documents directory"),
     parsed_dir: Path | None = typer.Option(None, help="Parsed documents directory"),
     metadata_dir: Path | None = typer.Option(None, help="Metadata directory"),
+    workers: int = typer.Option(1, help="Parallel parser processes (0 = all cores)"),
+    force: bool = typer.Option(False, help="Re-extract files that are unchanged"),
 ):
     """Parse a file or all files in a directory."""
     paths = _resolve_paths(root, raw_dir, parsed_dir, metadata_dir)
 
     if input_path.is_dir():
-        for file in sorted(input_path.glob("*")):
-            prepare_document_for_processing(file, paths=paths)
+        ingest_directory(input_path, paths=paths, workers=workers, force=force)
     else:
         prepare_document_for_processing(
-            input_path, parsed_name=parsed_name, paths=paths
+            input_path, parsed_name=parsed_name, paths=paths, force=force
         )
 
 
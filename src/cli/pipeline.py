@@ -1,4 +1,5 @@
 # cli/pipeline.py
+import contextlib
 from pathlib import Path
 
 import typer
@@ -6,6 +7,8 @@ import typer
 from core.clustering.clustering_steps import run_all_steps
 from core.configuration.config_registry import get_path_config
 from core.configuration.path_config import PathConfig
+from core.llm.cache import bypass_cache
+from core.parsing.openai_export import changed_conversations
 from scripts.pipeline import run_pipeline
 
 app = typer.Typer()
@@ -28,6 +31,7 @@ def _resolve_paths(
         vector=base.vector,
         schema=base.schema,
         semantic_chunking=base.semantic_chunking,
+        segment_boundary=base.segment_boundary,
     )
 
 
@@ -44,6 +48,23 @@ def run_all(
     parsed_dir: Path | None = typer.Option(None, help="Parsed documents directory"),
     metadata_dir: Path | None = typer.Option(None, help="Metadata directory"),
     output_dir: Path | None = typer.Option(None, help="Output directory"),
+    workers: int = typer.Option(1, help="Parallel parser processes (0 = all cores)"),
+    near_duplicates: str = typer.Option(
+        "off", help="Near-duplicate handling before classify/embed: off, skip, link"
+    ),
+    concurrency: int = typer.Option(1, help="Documents classified in parallel"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Call the API even for cached prompts"
+    ),
+    resume: bool = typer.Option(
+        False, help="Continue the last unfinished run, retrying only failures"
+    ),
+    changed_only: bool = typer.Option(
+        False,
+        "--changed-only",
+        help="Parse and classify only the transcripts the last "
+        "`chatgpt parse --incremental` into --input-dir wrote",
+    ),
 ):
     """
     Full ingestion + clustering pipeline:
@@ -54,21 +75,27 @@ def run_all(
     """
     paths = _resolve_paths(root, raw_dir, parsed_dir, metadata_dir, output_dir)
 
-    # Steps 1–3
-    run_pipeline(
-        input_dir=input_dir,
-        chunked=chunked,
-        method=method,
-        overwrite=True,
-        segmentation=segmentation,
-        paths=paths,
-    )
+    with bypass_cache() if no_cache else contextlib.nullcontext():
+        # Steps 1–3
+        run_pipeline(
+            input_dir=input_dir,
+            chunked=chunked,
+            method=method,
+            overwrite=True,
+            segmentation=segmentation,
+            paths=paths,
+            workers=workers,
+            near_duplicates=near_duplicates,
+            concurrency=concurrency,
+            resume=resume,
+            only=changed_conversations(input_dir) if changed_only else None,
+        )
 
-    # Step 4
-    run_all_steps(
-        embedding_path=paths.root / "rich_doc_embeddings.json",
-        metadata_dir=paths.metadata,
-        out_dir=paths.output / "cluster_output",
-        method=cluster_method,
-        model=model,
-    )
+        # Step 4
+        run_all_steps(
+            embedding_path=paths.root / "rich_doc_embeddings.json",
+            metadata_dir=paths.metadata,
+            out_dir=paths.output / "cluster_output",
+            method=cluster_method,
+            model=model,
+        )
@@ -10,11 +10,16 @@ logger = get_logger(__name__)
 
 
 @app.command()
-def semantic(query: str, k: int = 5):
+def semantic(
+    query: str,
+    k: int = 5,
+    mmr: bool = typer.Option(False, help="Diversify results with MMR"),
+    mmr_lambda: float = typer.Option(0.5, help="MMR relevance/diversity balance"),
+):
     """Return top-k document IDs matching the query."""
     retriever = Retriever()
     logger.info("Running semantic search for: %s", query)
-    hits = retriever.query(query, k=k)
+    hits = retriever.query(query, k=k, mmr=mmr, mmr_lambda=mmr_lambda)
     for doc_id, score in hits:
         logger.info("%s %.3f", doc_id, score)
 
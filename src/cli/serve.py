@@ -0,0 +1,25 @@
+import typer
+
+from core.logger import get_logger
+
+app = typer.Typer(help="Run the long-lived retrieval server")
+logger = get_logger(__name__)
+
+
+@app.callback(invoke_without_command=True)
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to bind"),
+    port: int = typer.Option(8000, help="Port to listen on"),
+    max_wait_ms: float = typer.Option(
+        5.0, help="How long a request waits to be coalesced with others"
+    ),
+    max_batch: int = typer.Option(64, help="Maximum requests per batch"),
+):
+    """Keep the retriever warm and serve /search, /search_batch and /similar."""
+    import uvicorn
+
+    from core.retrieval.server import create_app
+
+    api = create_app(max_wait_ms=max_wait_ms, max_batch=max_batch)
+    logger.info("Serving retrieval on http://%s:%d", host, port)
+    uvicorn.run(api, host=host, port=port)
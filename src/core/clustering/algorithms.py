@@ -50,6 +50,7 @@ def cluster_embeddings(
     min_cluster_size: int = 4,
     n_clusters: int = 24,
     random_state: int = 42,
+    affinity=None,
 ) -> np.ndarray:
     """
     Cluster high-dimensional embeddings using specified algorithm.
@@ -60,6 +61,9 @@ def cluster_embeddings(
         min_cluster_size (int): Minimum size for HDBSCAN clusters
         n_clusters (int): Cluster count for spectral
         random_state (int): Seed for reproducibility
+        affinity (sparse matrix, optional): Precomputed kNN affinity aligned
+            with the rows of ``X`` (see ``NeighborGraph.to_affinity``); reused
+            by spectral clustering instead of rebuilding the graph
 
     Returns:
         np.ndarray: Cluster labels
@@ -93,10 +97,10 @@ def cluster_embeddings(
         cluster_count = max(2, min(n_clusters, n_samples - 1))
         model = SpectralClustering(
             n_clusters=cluster_count,
-            affinity="nearest_neighbors",
+            affinity="nearest_neighbors" if affinity is None else "precomputed",
             assign_labels="kmeans",
             random_state=random_state,
         )
-        return model.fit_predict(embeddings)
+        return model.fit_predict(embeddings if affinity is None else affinity)
 
     raise ValueError(f"Unsupported clustering method: {method}")
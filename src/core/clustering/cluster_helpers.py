@@ -4,11 +4,11 @@ from pathlib import Path
 import hdbscan
 import matplotlib.pyplot as plt
 import numpy as np
-import openai
 import pandas as pd
 import umap
 from sklearn.cluster import SpectralClustering
 
+from core.llm.clients import get_openai_client
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -123,7 +123,7 @@ These are document topics:
 
 Provide a short (2–6 words) high-level label for this cluster:"""
 
-        response = openai.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model=model, messages=[{"role": "user", "content": prompt}], temperature=0.4
         )
 
@@ -1,11 +1,17 @@
 # scripts/clustering_steps.py
+import json
 from pathlib import Path
 from typing import List
 
 from core.clustering.algorithms import cluster_embeddings, reduce_dimensions
 from core.clustering.export import export_cluster_data
 from core.clustering.labeling import label_clusters
+from core.configuration.config_registry import get_path_config
 from core.embeddings.loader import load_embeddings
+from core.llm.cache import cache_stats, log_cache_stats
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 def run_dimensionality_reduction(embedding_path: Path):
@@ -15,9 +21,36 @@ def run_dimensionality_reduction(embedding_path: Path):
     return doc_ids, X, coords
 
 
-def run_clustering(X, method: str = "hdbscan") -> List[int]:
+def load_neighbor_affinity(doc_ids: List[str]):
+    """Return the precomputed kNN affinity for ``doc_ids`` if one is available.
+
+    The graph is checked against the current FAISS index, so one built before
+    later additions is ignored and the kNN affinity is computed afresh.
+    """
+    from core.embeddings.embedder import MODEL_DIMS
+    from core.retrieval.neighbors import NeighborGraph
+    from core.vectorstore.faiss_store import FaissStore
+
+    vector_dir = get_path_config().vector
+    index_path = vector_dir / "mosaic.index"
+    id_map_path = vector_dir / "id_map.json"
+    if not index_path.exists() or not id_map_path.exists():
+        return None
+    store = FaissStore(dim=MODEL_DIMS["text-embedding-3-large"], path=index_path)
+    graph = NeighborGraph.load(vector_dir / "neighbors.npz", store)
+    if graph is None:
+        return None
+    by_name = {name: int(k) for k, name in json.loads(id_map_path.read_text()).items()}
+    try:
+        return graph.to_affinity([by_name[doc_id] for doc_id in doc_ids])
+    except KeyError:
+        logger.info("Neighbour graph does not cover all documents; rebuilding kNN")
+        return None
+
+
+def run_clustering(X, method: str = "hdbscan", affinity=None) -> List[int]:
     """Run clustering algorithm (HDBSCAN or Spectral)."""
-    return cluster_embeddings(X, method=method)
+    return cluster_embeddings(X, method=method, affinity=affinity)
 
 
 def run_labeling(
@@ -48,6 +81,9 @@ def run_all_steps(
 ):
     """Run the full clustering flow with modular components."""
     doc_ids, X, coords = run_dimensionality_reduction(embedding_path)
-    labels = run_clustering(X, method=method)
+    affinity = load_neighbor_affinity(doc_ids) if method == "spectral" else None
+    labels = run_clustering(X, method=method, affinity=affinity)
+    cache_before = cache_stats()
     label_map = run_labeling(doc_ids, labels, metadata_dir, model=model)
+    log_cache_stats(cache_before)
     run_export(doc_ids, coords, labels, label_map, out_dir, metadata_dir)
@@ -50,9 +50,10 @@ This function sends each document cluster to a GPT model and requests a short se
 import json
 from typing import Dict, List
 
-from openai import OpenAI
-
 from core.configuration.config_registry import get_remote_config
+from core.llm.cache import active_cache, make_response_key
+from core.llm.clients import get_openai_client
+from core.llm.invoke import completion_cost
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -64,6 +65,7 @@ def label_clusters(
     metadata_dir,
     model: str = "gpt-4",
     preview: bool = True,
+    use_cache: bool = True,
 ) -> Dict[str, str]:
     """
     Generate GPT labels for each cluster.
@@ -74,6 +76,8 @@ def label_clusters(
         metadata_dir: Path to .meta.json files
         model: OpenAI model
         preview: Whether to emit live output via logger
+        use_cache: Reuse labels from the LLM response cache for identical
+            cluster prompts (``False`` always calls the API)
 
     Returns:
         cluster_id → label
@@ -95,7 +99,8 @@ def label_clusters(
 
     # Init GPT
     config = get_remote_config()
-    client = OpenAI(api_key=config.openai_api_key)
+    client = get_openai_client(config.openai_api_key)
+    cache = active_cache(use_cache)
 
     label_map = {}
     for cluster_id, docs in cluster_map.items():
@@ -104,16 +109,27 @@ def label_clusters(
     {json.dumps(docs, indent=2)}
     Give a short 2–6 word descriptive label for this cluster:
     """
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4,
-            )
-            label = response.choices[0].message.content.strip()
-        except Exception as e:
-            label = "Unlabeled"
-            logger.error("%s labeling failed: %s", cluster_id, e)
+        key = make_response_key(model, 0.4, None, prompt)
+        label = cache.get(key) if cache is not None else None
+        if label is None:
+            try:
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.4,
+                )
+                label = response.choices[0].message.content.strip()
+                if cache is not None:
+                    usage = getattr(response, "usage", None)
+                    cost = completion_cost(
+                        model,
+                        getattr(usage, "prompt_tokens", len(prompt) // 4),
+                        getattr(usage, "completion_tokens", len(label) // 4),
+                    )
+                    cache.put(key, model, label, cost=cost)
+            except Exception as e:
+                label = "Unlabeled"
+                logger.error("%s labeling failed: %s", cluster_id, e)
         label_map[cluster_id] = label
         if preview:
             logger.info("%s: %s", cluster_id, label)
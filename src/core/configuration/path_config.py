@@ -18,6 +18,7 @@ Role: Centralized configuration for filesystem paths (raw, parsed, metadata, out
 - path_config.parsed → Path to parsed .txt files
 - path_config.metadata → Path to .meta.json files
 - path_config.output → Path to exported summaries or plots
+- path_config.segment_boundary → "cluster" (UMAP + clustering) or "texttiling"
 
 🧠 For AI Agents:
 - Ensures file access is consistent and portable
@@ -43,11 +44,17 @@ import json
 from pathlib import Path
 from typing import Union
 
-from core.constants import DEFAULT_METADATA_SCHEMA_PATH, ERROR_PATH_RESOLVE_FAILURE
+from core.constants import (
+    DEFAULT_METADATA_SCHEMA_PATH,
+    ERROR_PATH_RESOLVE_FAILURE,
+    ERROR_SEGMENT_BOUNDARY_INVALID,
+)
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
+SEGMENT_BOUNDARIES = ("cluster", "texttiling")
+
 
 def validate_schema_path(candidate: Union[str, Path, None]) -> Path:
     """Ensure the metadata schema path exists, falling back to the default."""
@@ -79,6 +86,7 @@ class PathConfig:
         vector: Union[str, Path] = None,
         schema: Union[str, Path] = None,
         semantic_chunking: bool = False,
+        segment_boundary: str = "cluster",
     ):
         # Use the root provided (do not resolve relative to codebase)
         self.root = Path(root).expanduser().resolve() if root else Path(".").resolve()
@@ -94,6 +102,13 @@ class PathConfig:
         )
         self.schema = validate_schema_path(schema_candidate)
         self.semantic_chunking = bool(semantic_chunking)
+        if segment_boundary not in SEGMENT_BOUNDARIES:
+            raise ValueError(
+                ERROR_SEGMENT_BOUNDARY_INVALID.format(
+                    value=segment_boundary, choices=SEGMENT_BOUNDARIES
+                )
+            )
+        self.segment_boundary = segment_boundary
 
     def __repr__(self):
         return (
@@ -105,6 +120,7 @@ class PathConfig:
             f"VECTOR:   {self.vector}\n"
             f"SCHEMA:   {self.schema}\n"
             f"SEMANTIC_CHUNKING: {self.semantic_chunking}\n"
+            f"SEGMENT_BOUNDARY: {self.segment_boundary}\n"
         )
 
     def _resolve_path_relative_to_root(self, path_value, default):
@@ -131,7 +147,8 @@ class PathConfig:
             "parsed": "parsed_docs",
             "metadata": "meta",
             "output": "clustered",
-            "vector": "vector"
+            "vector": "vector",
+            "segment_boundary": "texttiling"
         }
         """
         config_path = Path(config_path).expanduser().resolve()
@@ -154,6 +171,7 @@ class PathConfig:
             vector=config.get("vector"),
             schema=config.get("schema"),
             semantic_chunking=config.get("semantic_chunking", False),
+            segment_boundary=config.get("segment_boundary", "cluster"),
         )
 
 
@@ -37,6 +37,9 @@ ERROR_PATH_CONFIG_NOT_FOUND = "Path config file not found at: {path}"
 ERROR_REMOTE_CONFIG_NOT_FOUND = "Remote config file not found at: {path}"
 ERROR_REMOTE_CONFIG_MISSING_FIELDS = "Missing required remote config fields: {fields}"
 ERROR_PATH_RESOLVE_FAILURE = "Failed to resolve path relative to root: {value}\n{error}"
+ERROR_SEGMENT_BOUNDARY_INVALID = (
+    "Unknown segment_boundary {value!r}; expected one of {choices}"
+)
 ERROR_PROMPT_FILE_NOT_FOUND = "Prompt file not found: {path}"
 ERROR_BUDGET_EXCEEDED = "Budget exceeded for completion request"
 ERROR_OPENAI_RESPONSE_NOT_JSON = "Could not parse OpenAI response as JSON:\n{response}"
@@ -1,21 +1,27 @@
 # core/embeddings/embedder.py
 from __future__ import annotations
 
+import contextlib
 import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict, List, Literal, Sequence
+from typing import Callable, Collection, Dict, List, Literal, Sequence
 
 import numpy as np
 import tiktoken
-from openai import OpenAI
 
-from core.configuration.config_registry import get_path_config, get_remote_config
+from core.configuration.config_registry import get_path_config
+from core.llm.clients import get_openai_client
 from core.logger import get_logger
-from core.utils.budget_tracker import get_budget_tracker
+from core.utils.budget_tracker import Reservation, get_budget_tracker
+from core.utils.job_journal import Job, fingerprint
 from core.vectorstore.faiss_store import FaissStore
 
 MAX_EMBED_TOKENS = 8191
+# per-request limits of the embeddings endpoint
+MAX_REQUEST_TOKENS = 300_000
+MAX_REQUEST_INPUTS = 2048
 MODEL_DIMS = {
     "text-embedding-3-small": 1536,
     "text-embedding-3-large": 3072,
@@ -35,16 +41,11 @@ def get_model_for_dim(dim: int) -> str:
 logger = get_logger(__name__)
 
 
-_client: OpenAI | None = None
 _encodings: Dict[str, tiktoken.Encoding] = {}
 
 
-def _get_client() -> OpenAI:
-    global _client
-    if _client is None:
-        remote = get_remote_config()
-        _client = OpenAI(api_key=remote.openai_api_key)
-    return _client
+def _get_client():
+    return get_openai_client()
 
 
 def _get_encoding(model: str) -> tiktoken.Encoding:
@@ -53,12 +54,22 @@ def _get_encoding(model: str) -> tiktoken.Encoding:
     return _encodings[model]
 
 
-def _charge_budget(token_count: int, model: str, tracker) -> None:
+def _reserve_budget(token_count: int, model: str, tracker):
+    """Reserve the cost of ``token_count`` input tokens; a no-op context
+    without a tracker. Settle with :func:`_settle_budget` once usage is known."""
     if not tracker or token_count <= 0:
-        return
+        return contextlib.nullcontext()
     est_cost = token_count / 1000 * EMBED_COST_PER_1K.get(model, 0)
-    if not tracker.check(est_cost):
+    reservation = tracker.reserve(est_cost)
+    if reservation is None:
         raise RuntimeError("Budget exceeded for embedding request")
+    return reservation
+
+
+def _settle_budget(reservation, response, model: str) -> None:
+    tokens = getattr(getattr(response, "usage", None), "prompt_tokens", None)
+    if isinstance(reservation, Reservation) and tokens is not None:
+        reservation.settle(tokens / 1000 * EMBED_COST_PER_1K.get(model, 0))
 
 
 def embed_text(text: str, model: str = "text-embedding-3-small") -> List[float]:
@@ -70,17 +81,19 @@ def embed_text(text: str, model: str = "text-embedding-3-small") -> List[float]:
     tokens = enc.encode(text, disallowed_special=())
 
     if len(tokens) <= MAX_EMBED_TOKENS:
-        _charge_budget(len(tokens), model, tracker)
-        response = client.embeddings.create(input=[text], model=model)
+        with _reserve_budget(len(tokens), model, tracker) as reservation:
+            response = client.embeddings.create(input=[text], model=model)
+            _settle_budget(reservation, response, model)
         return response.data[0].embedding
 
     # chunk into MAX_EMBED_TOKENS slices and average embeddings
     vectors = []
     for i in range(0, len(tokens), MAX_EMBED_TOKENS):
         chunk_tokens = tokens[i : i + MAX_EMBED_TOKENS]
-        _charge_budget(len(chunk_tokens), model, tracker)
         chunk_text = enc.decode(chunk_tokens)
-        resp = client.embeddings.create(input=[chunk_text], model=model)
+        with _reserve_budget(len(chunk_tokens), model, tracker) as reservation:
+            resp = client.embeddings.create(input=[chunk_text], model=model)
+            _settle_budget(reservation, resp, model)
         vectors.append(np.asarray(resp.data[0].embedding, dtype="float32"))
 
     return np.mean(vectors, axis=0).tolist()
@@ -97,7 +110,6 @@ def embed_text_batch(
     if not texts:
         return []
 
-    tracker = get_budget_tracker()
     enc = _get_encoding(model)
     embed_fn = embedder or embed_text
 
@@ -122,15 +134,87 @@ def embed_text_batch(
             for idx, text in zip(short_indices, short_payload):
                 results[idx] = embed_fn(text, model=model)
         else:
-            total_tokens = sum(short_tokens)
-            _charge_budget(total_tokens, model, tracker)
-            response = embeddings_api(input=short_payload, model=model)
-            for idx, data in zip(short_indices, response.data):
-                results[idx] = data.embedding
+            vectors = embed_packed(short_payload, model, token_counts=short_tokens)
+            for idx, vector in zip(short_indices, vectors):
+                results[idx] = vector
 
     return [results[i] for i in range(len(texts))]
 
 
+def pack_requests(
+    token_counts: Sequence[int],
+    max_tokens: int = MAX_REQUEST_TOKENS,
+    max_inputs: int = MAX_REQUEST_INPUTS,
+) -> List[range]:
+    """Split consecutive inputs into request-sized ``range`` batches."""
+    batches: List[range] = []
+    start, tokens = 0, 0
+    for idx, count in enumerate(token_counts):
+        if idx > start and (tokens + count > max_tokens or idx - start >= max_inputs):
+            batches.append(range(start, idx))
+            start, tokens = idx, 0
+        tokens += count
+    if len(token_counts) > start:
+        batches.append(range(start, len(token_counts)))
+    return batches
+
+
+def embed_packed(
+    texts: Sequence[str],
+    model: str = "text-embedding-3-small",
+    *,
+    token_counts: Sequence[int] | None = None,
+    concurrency: int = 4,
+    max_tokens: int = MAX_REQUEST_TOKENS,
+    max_inputs: int = MAX_REQUEST_INPUTS,
+) -> List[List[float]]:
+    """Embed texts (each within ``MAX_EMBED_TOKENS``) in packed requests.
+
+    Inputs are packed into as few requests as the endpoint limits allow and
+    the requests run on up to ``concurrency`` threads. Pass ``token_counts``
+    when the caller already tokenized, to skip re-encoding.
+    """
+    if not texts:
+        return []
+    if token_counts is None:
+        enc = _get_encoding(model)
+        token_counts = [len(enc.encode(t, disallowed_special=())) for t in texts]
+    client = _get_client()
+    tracker = get_budget_tracker()
+    batches = pack_requests(token_counts, max_tokens, max_inputs)
+
+    def run(batch: range) -> List[List[float]]:
+        tokens = sum(token_counts[i] for i in batch)
+        with _reserve_budget(tokens, model, tracker) as reservation:
+            response = client.embeddings.create(
+                input=[texts[i] for i in batch], model=model
+            )
+            _settle_budget(reservation, response, model)
+        return [data.embedding for data in response.data]
+
+    if len(batches) == 1 or concurrency <= 1:
+        chunks = [run(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as pool:
+            chunks = list(pool.map(run, batches))
+    return [vector for chunk in chunks for vector in chunk]
+
+
+def _read_checkpoint(path: Path) -> Dict[str, Dict[str, List[float]]]:
+    """Vectors per document from a ``.partial.jsonl`` checkpoint (last wins)."""
+    done: Dict[str, Dict[str, List[float]]] = {}
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn final line from an interrupted write
+            done[record["doc"]] = record["vectors"]
+    return done
+
+
 def generate_embeddings(
     source_dir: Path = None,
     method: Literal["parsed", "summary", "raw", "meta"] = "parsed",
@@ -138,6 +222,10 @@ def generate_embeddings(
     model: str = "text-embedding-3-large",
     segment_mode: bool | None = None,
     chunk_dir: Path | None = None,
+    boundary_method: str | None = None,
+    segment_vectors: Literal["embed", "pooled"] = "embed",
+    exclude: Collection[str] | None = None,
+    job: Job | None = None,
 ) -> None:
     """Generate embeddings for documents or topic segments.
 
@@ -145,9 +233,21 @@ def generate_embeddings(
     ``topic_segmenter`` and every chunk is embedded separately. Resulting
     vectors are stored in the FAISS index with IDs in the form
     ``"docID_chunkXX"`` and optionally written to ``chunk_dir``.
+    ``boundary_method`` (default: ``paths.segment_boundary``) picks clustering
+    or TextTiling boundaries for the segments, and ``segment_vectors="pooled"``
+    derives segment vectors from the window embeddings instead of
+    re-embedding each segment. Parsed file names in ``exclude`` (e.g.
+    near-duplicates from :func:`core.utils.dedup.find_near_duplicates`) are
+    skipped, along with their ``.meta.json``.
+
+    With a journal ``job`` (:mod:`core.utils.job_journal`) every embedded
+    document is checkpointed to ``<out_path>.partial.jsonl`` and marked
+    ``embedded``; a resumed job reuses those vectors for unchanged inputs and
+    only embeds what failed or was never reached.
     """
     paths = get_path_config()
     segment_mode = paths.semantic_chunking if segment_mode is None else segment_mode
+    boundary_method = boundary_method or paths.segment_boundary
     source_dir = source_dir or paths.parsed
     out_path = out_path or paths.vector / "rich_doc_embeddings.json"
     embeddings: Dict[str, List[float]] = {}
@@ -160,10 +260,39 @@ def generate_embeddings(
     store = FaissStore(dim=index_dim, path=index_path)
 
     chunk_dir = chunk_dir or (paths.vector / "chunks")
+    checkpoint = out_path.with_name(out_path.name + ".partial.jsonl")
+    reusable = _read_checkpoint(checkpoint) if job is not None else {}
+    if job is None:
+        checkpoint.unlink(missing_ok=True)
+
+    def add_vector(vec_id: str, vector: List[float], single: bool) -> None:
+        if single:
+            hashed = (
+                int.from_bytes(
+                    hashlib.blake2b(vec_id.encode("utf-8"), digest_size=8).digest(),
+                    "big",
+                )
+                & 0x7FFF_FFFF_FFFF_FFFF
+            )
+        else:
+            hashed = store._hash_id(vec_id) & 0x7FFF_FFFF_FFFF_FFFF
+        embeddings[vec_id] = vector
+        store.add([hashed], [vector])
+        id_map[str(hashed)] = vec_id
 
     pattern = "*.meta.json" if method in {"summary", "meta"} else "*.txt"
+    exclude = set(exclude or ())
+    failed = 0
     for file in sorted(source_dir.glob(pattern)):
         doc_id = file.stem
+        name = file.name.removesuffix(".meta.json")
+        if name in exclude:
+            continue
+        fp = fingerprint(file) if job is not None else None
+        if job is not None and name in reusable and job.is_done(name, "embedded", fp):
+            for vec_id, vector in reusable[name].items():
+                add_vector(vec_id, vector, single=vec_id == doc_id)
+            continue
 
         if method == "parsed":
             text = file.read_text(encoding="utf-8")
@@ -183,11 +312,18 @@ def generate_embeddings(
             logger.warning("Skipping empty file: %s", file.name)
             continue
 
+        if job is not None:
+            job.mark(name, "embedded", "running", fp=fp)
         try:
             if segment_mode:
                 from core.parsing.semantic_chunk import semantic_chunk
 
-                segments = semantic_chunk(text, model=model)
+                segments = semantic_chunk(
+                    text,
+                    model=model,
+                    boundary_method=boundary_method,
+                    segment_vectors=segment_vectors,
+                )
             else:
                 from core.parsing.chunk_text import chunk_text
 
@@ -196,35 +332,40 @@ def generate_embeddings(
                     for t in chunk_text(text)
                 ]
 
+            vectors: Dict[str, List[float]] = {}
             if len(segments) == 1 and not segment_mode:
-                vector = segments[0]["embedding"]
-                embeddings[doc_id] = vector
-                hashed_id = (
-                    int.from_bytes(
-                        hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest(),
-                        "big",
-                    )
-                    & 0x7FFF_FFFF_FFFF_FFFF
-                )
-                store.add([hashed_id], [vector])
-                id_map[str(hashed_id)] = doc_id
+                vectors[doc_id] = segments[0]["embedding"]
+                add_vector(doc_id, vectors[doc_id], single=True)
             else:
                 chunk_dir.mkdir(parents=True, exist_ok=True)
                 for idx, chunk in enumerate(segments):
                     seg_id = f"{doc_id}_chunk{idx:02d}"
-                    vector = chunk["embedding"]
-                    embeddings[seg_id] = vector
-                    hashed = store._hash_id(seg_id) & 0x7FFF_FFFF_FFFF_FFFF
-                    store.add([hashed], [vector])
-                    id_map[str(hashed)] = seg_id
+                    vectors[seg_id] = chunk["embedding"]
+                    add_vector(seg_id, vectors[seg_id], single=False)
                     (chunk_dir / f"{seg_id}.json").write_text(
                         json.dumps(chunk, indent=2), encoding="utf-8"
                     )
-        except Exception:
+        except Exception as exc:
             logger.exception("Failed embedding %s", file.name)
+            failed += 1
+            if job is not None:
+                job.mark(name, "embedded", "failed", error=str(exc))
+            continue
+        if job is not None:
+            with open(checkpoint, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"doc": name, "vectors": vectors}) + "\n")
+            job.mark(name, "embedded", "done", fp=fp)
 
     out_path.write_text(json.dumps(embeddings, indent=2))
     store.persist()
     id_map_path = paths.vector / "id_map.json"
     id_map_path.write_text(json.dumps(id_map, indent=2))
+    from core.retrieval.doc_index import DocumentIndex
+
+    DocumentIndex.build(store, {int(k): v for k, v in id_map.items()}).save(
+        paths.vector / "doc_index.npz"
+    )
+    if not failed:
+        # Keep the checkpoint while failures remain so a resume can reuse it.
+        checkpoint.unlink(missing_ok=True)
     logger.info("Saved %d embeddings to %s", len(embeddings), out_path)
@@ -0,0 +1,234 @@
+"""Content-addressed cache of LLM completions.
+
+Responses are keyed by ``(model, temperature, max_tokens, prompt)`` digest and
+kept in one SQLite file, so re-running classification after a crash or a
+schema tweak does not pay again for identical prompts. The file is bounded
+by total response bytes; least-recently-used rows are evicted first.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "kairos" / "llm_responses.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "llm_cache_bypass", default=False
+)
+
+
+def make_response_key(
+    model: str, temperature: float, max_tokens: Optional[int], prompt: str
+) -> str:
+    """Return the cache key for one completion request."""
+    payload = json.dumps([model, temperature, max_tokens], sort_keys=True)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(payload.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed completion cache with size-bounded LRU eviction.
+
+    Parameters
+    ----------
+    path : Path
+        SQLite file; created on first use and safe to share across processes.
+    max_bytes : int
+        Upper bound on the summed size of stored responses.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max(1, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self.usd_saved = 0.0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, cost REAL, "
+            "size INTEGER, accessed REAL)"
+        )
+        self._db.commit()
+        self._size = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` and count the hit or miss."""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT response, cost FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._db.execute(
+                    "UPDATE responses SET accessed = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                self._db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("LLM cache read failed: %s", exc)
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.usd_saved += row[1]
+            return row[0]
+
+    def put(self, key: str, model: str, response: str, cost: float = 0.0) -> None:
+        """Store ``response`` (and what it cost) under ``key``."""
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            try:
+                old = self._db.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, response, cost, size, time.time()),
+                )
+                self._size += size - (old[0] if old else 0)
+                if self._size > self.max_bytes:
+                    self._evict()
+                self._db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("LLM cache write failed: %s", exc)
+
+    def discard(self, key: str) -> None:
+        """Remove ``key`` (e.g. a response the caller could not parse)."""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._size -= row[0]
+            except sqlite3.Error as exc:
+                logger.warning("LLM cache delete failed: %s", exc)
+
+    def _evict(self) -> None:
+        """Drop least-recently-used rows until 90% of ``max_bytes`` is free."""
+        target = self.max_bytes * 0.9
+        doomed = []
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed ASC"
+        ):
+            if self._size <= target:
+                break
+            doomed.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        logger.info("LLM cache evicted %d responses", len(doomed))
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative lookups, hits and dollars saved for this process."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "usd_saved": self.usd_saved,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._size = 0
+
+
+_instance: "ResponseCache | None" = None
+_instance_lock = threading.Lock()
+
+
+def get_response_cache() -> "ResponseCache | None":
+    """Return the process-wide ``ResponseCache`` configured from the environment.
+
+    Environment variables:
+    - ``LLM_CACHE``: set to ``off`` to disable caching entirely.
+    - ``LLM_CACHE_PATH``: SQLite file
+      (default ``~/.cache/kairos/llm_responses.sqlite``).
+    - ``LLM_CACHE_MAX_MB``: size bound for stored responses (default 512).
+    """
+    global _instance
+    if os.getenv("LLM_CACHE", "").lower() == "off":
+        return None
+    with _instance_lock:
+        if _instance is None:
+            path = Path(os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+            max_mb = float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 2**20))
+            try:
+                _instance = ResponseCache(path, max_bytes=int(max_mb * 2**20))
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("LLM cache unavailable at %s: %s", path, exc)
+                return None
+    return _instance
+
+
+def active_cache(use_cache: bool = True) -> "ResponseCache | None":
+    """Return the cache unless ``use_cache`` is false or a bypass is active."""
+    if not use_cache or _bypass.get():
+        return None
+    return get_response_cache()
+
+
+@contextlib.contextmanager
+def bypass_cache() -> Iterator[None]:
+    """Skip cache reads and writes for LLM calls made inside this block."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Snapshot of the process-wide cache counters (zeros before first use)."""
+    if _instance is None:
+        return {"hits": 0, "misses": 0, "usd_saved": 0.0}
+    return _instance.stats()
+
+
+def log_cache_stats(since: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Log hit rate and dollars saved since the ``since`` snapshot; return them."""
+    now = cache_stats()
+    base = since or {"hits": 0, "misses": 0, "usd_saved": 0.0}
+    delta = {key: now[key] - base[key] for key in now}
+    lookups = delta["hits"] + delta["misses"]
+    if lookups:
+        logger.info(
+            "LLM cache: %d/%d hits (%.0f%%), ~$%.2f saved",
+            delta["hits"],
+            lookups,
+            100 * delta["hits"] / lookups,
+            delta["usd_saved"],
+        )
+    return delta
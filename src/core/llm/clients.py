@@ -0,0 +1,105 @@
+"""Long-lived OpenAI clients shared across the LLM and embedding paths.
+
+Building an ``OpenAI`` client per request throws away its HTTP connection
+pool, so every call pays DNS, TCP and TLS setup again. Clients here are
+created once per ``(api_key, base_url)`` and reused by every call site
+(summaries, cluster labels, embeddings, the chat GUI), with keep-alive
+connection limits sized for the concurrent classification engine.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import openai
+
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+from core.configuration.config_registry import get_remote_config
+
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 32
+KEEPALIVE_EXPIRY = 120.0
+REQUEST_TIMEOUT = 120.0
+
+_Key = Tuple[Optional[str], Optional[str]]
+_sync_clients: Dict[_Key, Any] = {}
+_async_clients: Dict[_Key, Any] = {}
+_lock = threading.Lock()
+
+
+def _key(api_key: Optional[str], base_url: Optional[str]) -> _Key:
+    return (
+        api_key or get_remote_config().openai_api_key,
+        base_url or os.getenv("OPENAI_BASE_URL") or None,
+    )
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_openai_client(
+    api_key: Optional[str] = None, base_url: Optional[str] = None
+) -> "openai.OpenAI":
+    """Return the shared sync client for ``api_key``/``base_url``.
+
+    ``api_key`` defaults to ``RemoteConfig.openai_api_key`` (read once via
+    :func:`get_remote_config`); ``base_url`` to ``OPENAI_BASE_URL``.
+    """
+    key = _key(api_key, base_url)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            kwargs: Dict[str, Any] = {"api_key": key[0]}
+            if key[1]:
+                kwargs["base_url"] = key[1]
+            if httpx is not None:
+                kwargs["http_client"] = httpx.Client(
+                    limits=_limits(), timeout=REQUEST_TIMEOUT
+                )
+            client = _sync_clients[key] = openai.OpenAI(**kwargs)
+    return client
+
+
+def get_async_openai_client(
+    api_key: Optional[str] = None, base_url: Optional[str] = None
+) -> "openai.AsyncOpenAI":
+    """Async counterpart of :func:`get_openai_client`.
+
+    The underlying connection pool is bound to the event loop that first uses
+    it, so share one loop per process (e.g. a single ``asyncio.run``).
+    """
+    key = _key(api_key, base_url)
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None:
+            kwargs: Dict[str, Any] = {"api_key": key[0]}
+            if key[1]:
+                kwargs["base_url"] = key[1]
+            if httpx is not None:
+                kwargs["http_client"] = httpx.AsyncClient(
+                    limits=_limits(), timeout=REQUEST_TIMEOUT
+                )
+            client = _async_clients[key] = openai.AsyncOpenAI(**kwargs)
+    return client
+
+
+def close_clients() -> None:
+    """Close and forget every pooled sync client (async ones are dropped)."""
+    with _lock:
+        for client in _sync_clients.values():
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+        _sync_clients.clear()
+        _async_clients.clear()
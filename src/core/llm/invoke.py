@@ -27,13 +27,13 @@ The function sends the prompt to the OpenAI API and parses the result as a JSON
 
 - load_prompt
 - run_openai_completion
-- RemoteConfig.from_file
+- get_remote_config
 - json.loads
 
 🧠 For AI Agents:
 
 - @ai-dependencies: json, openai, core.config.remote_config
-- @ai-calls: load_prompt, run_openai_completion, json.loads, RemoteConfig.from_file
+- @ai-calls: load_prompt, run_openai_completion, json.loads, get_remote_config, get_openai_client
 - @ai-uses: config.openai_api_key, json.JSONDecodeError
 - @ai-tags: summarization, LLM, prompt, OpenAI, completion
 
@@ -49,20 +49,24 @@ The function sends the prompt to the OpenAI API and parses the result as a JSON
 - @change-summary: Initial AI-generated docstring with static + semantic alignment     
 - @notes: """
 
+import contextlib
 import json
 from pathlib import Path
 from typing import Literal, Optional
 
 import tiktoken
-from openai import OpenAI
 
+from core.configuration.config_registry import get_remote_config
 from core.configuration.remote_config import RemoteConfig
 from core.constants import (
     ERROR_BUDGET_EXCEEDED,
     ERROR_OPENAI_RESPONSE_NOT_JSON,
     ERROR_PROMPT_FILE_NOT_FOUND,
 )
+from core.llm.cache import active_cache, bypass_cache, make_response_key
+from core.llm.clients import get_openai_client
 from core.utils.budget_tracker import get_budget_tracker
+from core.utils.rate_limiter import get_rate_limiter
 
 PROMPT_DIR = Path(__file__).parent / "prompts"
 
@@ -74,6 +78,15 @@ LLM_COMPLETION_COST_PER_1K = {
     "gpt-4": 0.06,
     "gpt-4o": 0.015,
 }
+DEFAULT_MAX_TOKENS = 700
+SUMMARY_TEMPERATURE = 0.4
+
+
+def completion_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Dollar cost of one chat completion at the configured per-1K prices."""
+    return prompt_tokens / 1000 * LLM_PROMPT_COST_PER_1K.get(
+        model, 0
+    ) + completion_tokens / 1000 * LLM_COMPLETION_COST_PER_1K.get(model, 0)
 
 
 def load_prompt(prompt_name: str) -> str:
@@ -87,28 +100,87 @@ def run_openai_completion(
     prompt: str,
     model: str = "gpt-4",
     temperature: float = 0.4,
-    max_tokens: int = 700,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
     api_key: Optional[str] = None,
+    use_cache: bool = True,
 ) -> str:
-    client = OpenAI(api_key=api_key or RemoteConfig.from_file().openai_api_key)
+    """Return the completion for ``prompt``, served from the response cache
+    (:mod:`core.llm.cache`) when an identical request was answered before.
+    ``use_cache=False`` always calls the API and leaves the cache untouched."""
+    cache = active_cache(use_cache)
+    key = make_response_key(model, temperature, max_tokens, prompt)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    client = get_openai_client(api_key)
     tracker = get_budget_tracker()
+    limiter = get_rate_limiter()
 
-    if tracker:
+    prompt_tokens = len(prompt) // 4
+    if tracker or limiter:
         enc = tiktoken.encoding_for_model(model)
         prompt_tokens = len(enc.encode(prompt, disallowed_special=()))
-        est_cost = prompt_tokens / 1000 * LLM_PROMPT_COST_PER_1K.get(
-            model, 0
-        ) + max_tokens / 1000 * LLM_COMPLETION_COST_PER_1K.get(model, 0)
-        if not tracker.check(est_cost):
+    reservation = None
+    if tracker:
+        # Hold the worst case; settled with the reported usage below.
+        reservation = tracker.reserve(completion_cost(model, prompt_tokens, max_tokens))
+        if reservation is None:
             raise RuntimeError(ERROR_BUDGET_EXCEEDED)
+    if limiter:
+        limiter.acquire(prompt_tokens + max_tokens)
+
+    with reservation or contextlib.nullcontext():
+        response = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        content = response.choices[0].message.content.strip()
+        usage = getattr(response, "usage", None)
+        cost = completion_cost(
+            model,
+            getattr(usage, "prompt_tokens", prompt_tokens),
+            getattr(usage, "completion_tokens", len(content) // 4),
+        )
+        if reservation is not None:
+            reservation.settle(cost)
+    if cache is not None:
+        cache.put(key, model, content, cost=cost)
+    return content
+
+
+def build_summary_prompt(
+    text: str,
+    doc_type: Literal["standard", "chatlog"] = "standard",
+    prompt_override: Optional[str] = None,
+) -> str:
+    """Fill the summary (or chat-log summary) template with ``text``."""
+    if prompt_override:
+        return prompt_override.format(text=text)
+    prompt_file = "chatlog_summary" if doc_type == "chatlog" else "summary"
+    return load_prompt(prompt_file).format(text=text)
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
-    return response.choices[0].message.content.strip()
+
+def discard_cached_summary(
+    text: str,
+    doc_type: Literal["standard", "chatlog"] = "standard",
+    model: str = "gpt-4",
+    prompt_override: Optional[str] = None,
+) -> None:
+    """Drop the cached reply to this summary request so the next run asks again.
+
+    Used whenever a reply turns out unusable: not JSON (here) or metadata that
+    fails schema validation (in :func:`core.workflows.main_commands.classify`).
+    """
+    cache = active_cache()
+    if cache is not None:
+        prompt = build_summary_prompt(text, doc_type, prompt_override)
+        cache.discard(
+            make_response_key(model, SUMMARY_TEMPERATURE, DEFAULT_MAX_TOKENS, prompt)
+        )
 
 
 def summarize_text(
@@ -117,23 +189,24 @@ def summarize_text(
     model: str = "gpt-4",
     prompt_override: Optional[str] = None,
     config: Optional[RemoteConfig] = None,
+    use_cache: bool = True,
 ) -> dict:
-    config = config or RemoteConfig.from_file()
-
-    if prompt_override:
-        prompt = prompt_override.format(text=text)
-    else:
-        prompt_file = "chatlog_summary" if doc_type == "chatlog" else "summary"
-        base_prompt = load_prompt(prompt_file)
-        prompt = base_prompt.format(text=text)
+    config = config or get_remote_config()
+    prompt = build_summary_prompt(text, doc_type, prompt_override)
 
-    raw_response = run_openai_completion(
-        prompt=prompt, model=model, temperature=0.4, api_key=config.openai_api_key
-    )
+    with contextlib.nullcontext() if use_cache else bypass_cache():
+        raw_response = run_openai_completion(
+            prompt=prompt,
+            model=model,
+            temperature=SUMMARY_TEMPERATURE,
+            api_key=config.openai_api_key,
+        )
 
     try:
         return json.loads(raw_response)
     except json.JSONDecodeError as e:
+        if use_cache:
+            discard_cached_summary(text, doc_type, model, prompt_override)
         raise ValueError(
             ERROR_OPENAI_RESPONSE_NOT_JSON.format(response=raw_response)
         ) from e
@@ -26,6 +26,18 @@ def topic_segmenter(*args, **kwargs):
     return fn(*args, **kwargs)
 
 
+def token_chunks(*args, **kwargs):
+    from .token_chunker import token_chunks as fn
+
+    return fn(*args, **kwargs)
+
+
+def pack_chunks(*args, **kwargs):
+    from .token_chunker import pack_chunks as fn
+
+    return fn(*args, **kwargs)
+
+
 def parse_chatgpt_export(*args, **kwargs):
     from .openai_export import parse_chatgpt_export as fn
 
@@ -37,5 +49,7 @@ __all__ = [
     "segment_text",
     "segment_topics",
     "topic_segmenter",
+    "token_chunks",
+    "pack_chunks",
     "parse_chatgpt_export",
 ]
@@ -47,6 +47,9 @@ import fitz  # PyMuPDF
 import markdown
 from docx import Document
 
+# Bump when extraction output changes so cached parses are regenerated.
+EXTRACTOR_VERSION = "2"
+
 
 def extract_text(filepath: str) -> str:
     """
@@ -0,0 +1,102 @@
+"""Single-file columnar table of chat messages (Parquet or Arrow IPC).
+
+One row per message keeps tens of thousands of conversations in one file that
+analytics, dedup and embedding stages can scan column-wise instead of globbing
+transcript directories. Rows are buffered and flushed as record batches so
+the writer works with the streaming export parser.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+try:
+    import pyarrow as pa  # type: ignore[import]
+    import pyarrow.ipc as pa_ipc  # type: ignore[import]
+    import pyarrow.parquet as pq  # type: ignore[import]
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    pa = pa_ipc = pq = None  # type: ignore[assignment]
+
+ROW_BATCH_SIZE = 50_000
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+
+def message_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("conversation_id", pa.string()),
+            ("title", pa.string()),
+            ("position", pa.int32()),
+            ("role", pa.string()),
+            ("timestamp", pa.float64()),
+            ("text", pa.string()),
+            ("token_count", pa.int32()),
+        ]
+    )
+
+
+class MessageTableWriter:
+    """Append message rows to ``path``; the suffix picks Parquet or Arrow."""
+
+    def __init__(self, path: Path, batch_rows: int = ROW_BATCH_SIZE):
+        if pa is None:  # pragma: no cover - optional dependency
+            raise ModuleNotFoundError(
+                "pyarrow is required for columnar message export but is not installed."
+            )
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_rows = batch_rows
+        self.schema = message_schema()
+        self.rows_written = 0
+        self._columns: Dict[str, List] = {name: [] for name in self.schema.names}
+        if self.path.suffix.lower() in ARROW_SUFFIXES:
+            self._writer = pa_ipc.new_file(str(self.path), self.schema)
+        else:
+            self._writer = pq.ParquetWriter(
+                str(self.path), self.schema, compression="zstd"
+            )
+
+    def add(self, rows: Sequence[Dict]) -> None:
+        for row in rows:
+            for name, column in self._columns.items():
+                column.append(row.get(name))
+        if len(self._columns["text"]) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        count = len(self._columns["text"])
+        if not count:
+            return
+        batch = pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows_written += count
+        for column in self._columns.values():
+            column.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "MessageTableWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_messages(path: Path, columns: Sequence[str] | None = None) -> "pa.Table":
+    """Load the message table (optionally only ``columns``) as an Arrow table."""
+    if pa is None:  # pragma: no cover - optional dependency
+        raise ModuleNotFoundError(
+            "pyarrow is required for columnar message export but is not installed."
+        )
+    path = Path(path)
+    if path.suffix.lower() in ARROW_SUFFIXES:
+        # zero-copy: the table keeps the memory map alive
+        table = pa_ipc.open_file(pa.memory_map(str(path))).read_all()
+        return table.select(list(columns)) if columns else table
+    return pq.read_table(str(path), columns=list(columns) if columns else None)
+
+
+__all__ = ["MessageTableWriter", "message_schema", "read_messages"]
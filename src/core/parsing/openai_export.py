@@ -13,46 +13,151 @@ This module reads the `conversations.json` file included in an OpenAI ChatGPT
 "Data Export" archive and writes each conversation to its own text file.
 Additionally, it saves a corresponding file containing only the user messages
 for quick prompt reuse or duplicate detection.
+
+With ``stream=True`` the top-level JSON array is decoded one conversation at
+a time straight from the zip member, so peak memory is bounded by the largest
+single conversation rather than the whole multi-GB export.
+
+With ``incremental=True`` files are keyed by conversation ID and a manifest
+of ``update_time`` and content hash lets re-exports rewrite only the
+conversations that actually changed.
+
+``workers`` renders and writes conversations on a thread pool, and
+``columnar`` additionally writes one row per message to a single Parquet or
+Arrow file (see :mod:`core.parsing.message_table`).
 """
 
 from __future__ import annotations
 
+import hashlib
+import io
 import json
+import multiprocessing
+import os
+import re
 import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import IO, Callable, Deque, Dict, Iterable, Iterator, List, Tuple
 
 from core.constants import (
     ERROR_CONVERSATION_EXTRACTION_FAILED,
     ERROR_CONVERSATIONS_EXPORT_MISSING,
 )
+from core.logger import get_logger
 
 from .normalize import normalize_filename
 
+logger = get_logger(__name__)
 
-def _load_conversations(export_path: Path) -> List[Dict]:
-    """Load conversation list from a zip archive or directory."""
+STREAM_READ_SIZE = 1 << 20
+RENDER_BATCH = 64
+"""Conversations pickled to a render worker per task (``workers > 1``)."""
+MANIFEST_NAME = "manifest.json"
+
+
+@contextmanager
+def _open_conversations(export_path: Path) -> Iterator[IO[bytes]]:
+    """Open ``conversations.json`` inside a zip archive or directory."""
     if export_path.is_dir():
-        conv_path = export_path / "conversations.json"
-        with conv_path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        with (export_path / "conversations.json").open("rb") as f:
+            yield f
+        return
     with zipfile.ZipFile(export_path) as zf:
+        # Standard export has files under a top-level directory. Look for the
+        # conversations file anywhere in the archive to support both
+        # flattened and nested zips.
+        name = next(
+            (n for n in zf.namelist() if n.endswith("conversations.json")),
+            "conversations.json",
+        )
         try:
-            # Standard export has files under a top-level directory. Look for the
-            # conversations file anywhere in the archive to support both
-            # flattened and nested zips.
-            name = next(
-                (n for n in zf.namelist() if n.endswith("conversations.json")),
-                "conversations.json",
-            )
-            with zf.open(name) as f:
-                return json.load(f)
+            f = zf.open(name)
         except KeyError as exc:
             raise FileNotFoundError(ERROR_CONVERSATIONS_EXPORT_MISSING) from exc
+        with f:
+            yield f
 
 
-def _extract_messages(convo: Dict) -> Iterable[Tuple[str, str]]:
-    """Return ordered (role, text) tuples for a conversation.
+def _load_conversations(export_path: Path) -> List[Dict]:
+    """Load conversation list from a zip archive or directory."""
+    with _open_conversations(export_path) as f:
+        return json.load(f)
+
+
+_LEADING_SPACE = re.compile("[ \t\r\n\ufeff]*")
+_SEPARATORS = re.compile("[ \t\r\n,]*")
+
+
+def _iter_json_array(
+    stream: IO[str], read_size: int = STREAM_READ_SIZE
+) -> Iterator[object]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Text is read in blocks and each element is decoded with
+    ``JSONDecoder.raw_decode`` as soon as it is complete. Decoding only
+    advances an offset into the buffer; consumed text is cut off when the
+    buffer is refilled, so each character is copied about once however many
+    elements a block holds. When an element spans more than the buffered
+    text, the read size doubles so very large elements do not trigger
+    quadratic re-parsing.
+    """
+    decoder = json.JSONDecoder()
+    buf = stream.read(read_size)
+    eof = not buf
+    pos = 0
+    size = read_size
+
+    def skip(chars: re.Pattern) -> None:
+        nonlocal buf, pos, eof
+        while True:
+            pos = chars.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return
+            buf, pos = stream.read(read_size), 0
+            eof = not buf
+
+    skip(_LEADING_SPACE)
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("conversations.json is not a JSON array")
+    pos += 1
+
+    while True:
+        skip(_SEPARATORS)
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of conversations.json")
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+            complete = end < len(buf) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield item
+            pos, size = end, read_size
+            continue
+        more = stream.read(size)
+        size *= 2
+        buf, pos = buf[pos:] + more, 0
+        eof = not more
+
+
+def iter_conversations(export_path: Path) -> Iterator[Dict]:
+    """Yield conversations one by one without loading the whole export."""
+    with _open_conversations(Path(export_path)) as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8")
+        yield from _iter_json_array(text)
+
+
+def _walk_messages(convo: Dict) -> List[Tuple[str, str, float | None]]:
+    """Return ordered (role, text, create_time) tuples for a conversation.
 
     Malformed nodes are skipped so that parsing continues even if
     individual messages are missing or not structured as expected.
@@ -61,7 +166,7 @@ def _extract_messages(convo: Dict) -> Iterable[Tuple[str, str]]:
 
     mapping = convo.get("mapping", {})
     node_id = convo.get("current_node")
-    path: List[Tuple[str, str]] = []
+    path: List[Tuple[str, str, float | None]] = []
     while node_id:
         node = mapping.get(node_id)
         if not node:
@@ -76,13 +181,173 @@ def _extract_messages(convo: Dict) -> Iterable[Tuple[str, str]]:
             text_parts = [p for p in parts if isinstance(p, str)]
             if text_parts:
                 text = "\n".join(text_parts)
-                path.append((role, text))
+                path.append((role, text, msg.get("create_time")))
         node_id = node.get("parent")
-    return reversed(path)
+    path.reverse()
+    return path
+
+
+def _extract_messages(convo: Dict) -> Iterable[Tuple[str, str]]:
+    """Return ordered (role, text) tuples for a conversation."""
+    return [(role, text) for role, text, _ in _walk_messages(convo)]
+
+
+def _render(convo: Dict, markdown: bool) -> Tuple[str, str]:
+    """Return the transcript and prompt-file text for one conversation."""
+    lines = []
+    prompts = []
+    msgs = _extract_messages(convo)
+    if msgs is None:
+        raise ValueError(ERROR_CONVERSATION_EXTRACTION_FAILED)
+    for role, text in msgs:
+        clean = text.strip()
+        if markdown:
+            lines.append(f"**{role.title()}:** {clean}")
+        else:
+            lines.append(f"{role.upper()}: {clean}")
+        if role == "user":
+            prompts.append(clean)
+    return "\n".join(lines), "\n".join(prompts)
+
+
+def default_token_counter(model: str = "gpt-4o-mini") -> Callable[[str], int]:
+    """Return a tiktoken counter, or a whitespace estimate if unavailable."""
+    try:
+        import tiktoken
+
+        enc = tiktoken.encoding_for_model(model)
+    except Exception as exc:  # missing package or offline BPE download
+        logger.warning("tiktoken unavailable (%s); estimating tokens by words", exc)
+        return lambda text: len(text.split())
+    return lambda text: len(enc.encode(text, disallowed_special=()))
+
+
+_default_counter: Callable[[str], int] | None = None
+
+
+def _count_default_tokens(text: str) -> int:
+    """:func:`default_token_counter`, built once per process (picklable)."""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = default_token_counter()
+    return _default_counter(text)
+
+
+def _message_rows(
+    convo: Dict, convo_id: str, count_tokens: Callable[[str], int]
+) -> List[Dict]:
+    title = convo.get("title") or ""
+    return [
+        {
+            "conversation_id": convo_id,
+            "title": title,
+            "position": position,
+            "role": role,
+            "timestamp": timestamp,
+            "text": text,
+            "token_count": count_tokens(text),
+        }
+        for position, (role, text, timestamp) in enumerate(_walk_messages(convo))
+    ]
+
+
+def _content_hash(*texts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_manifest(out_dir: Path) -> Dict:
+    """Return the incremental-parse manifest for ``out_dir`` (empty if absent)."""
+    try:
+        manifest = json.loads((Path(out_dir) / MANIFEST_NAME).read_text("utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("conversations", {})
+    manifest.setdefault("last_run", {"changed": [], "removed": []})
+    return manifest
+
+
+def _save_manifest(out_dir: Path, manifest: Dict) -> None:
+    path = out_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def changed_conversations(out_dir: Path) -> List[Path]:
+    """Transcripts written or rewritten by the last incremental parse."""
+    out_dir = Path(out_dir)
+    return [out_dir / name for name in load_manifest(out_dir)["last_run"]["changed"]]
+
+
+@dataclass
+class _Job:
+    convo: Dict
+    convo_id: str | None
+    convo_file: Path
+    prompt_file: Path
+    entry: Dict | None
+    render: bool
+    update_time: float | None = None
+    digest: str | None = None
+    written: bool = False
+    rows: List[Dict] | None = None
+
+
+_Rendered = Tuple[List[Dict] | None, str | None, bool]
+
+
+def _render_batch(
+    tasks: List[Tuple[Dict, str | None, Path, Path, str | None]],
+    markdown: bool,
+    incremental: bool,
+    count_tokens: Callable[[str], int] | None,
+) -> List[_Rendered]:
+    """Render, hash, token-count and write a batch of conversations.
+
+    Each task is ``(convo, convo_id, convo_file, prompt_file, old_hash)``,
+    with ``convo_file`` ``None`` when the conversation is unchanged and only
+    its rows are wanted. Files are written unless the content hash still
+    matches ``old_hash``. Returns ``(rows, digest, written)`` per task, so a
+    worker process sends back no transcript text.
+    """
+    results: List[_Rendered] = []
+    for convo, convo_id, convo_file, prompt_file, old_hash in tasks:
+        rows = None
+        if count_tokens is not None:
+            rows = _message_rows(convo, convo_id or "", count_tokens)
+        digest, written = None, False
+        if convo_file is not None:
+            transcript, prompts = _render(convo, markdown)
+            if incremental and convo_id:
+                digest = _content_hash(transcript, prompts)
+            if not (digest and digest == old_hash):
+                convo_file.write_text(transcript, encoding="utf-8")
+                prompt_file.write_text(prompts, encoding="utf-8")
+                written = True
+        results.append((rows, digest, written))
+    return results
+
+
+def _batches(items: Iterable[_Job], size: int) -> Iterator[List[_Job]]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
 
 
 def parse_chatgpt_export(
-    export_path: Path, out_dir: Path, *, markdown: bool = False
+    export_path: Path,
+    out_dir: Path,
+    *,
+    markdown: bool = False,
+    stream: bool = False,
+    incremental: bool = False,
+    workers: int = 1,
+    columnar: Path | None = None,
+    count_tokens: Callable[[str], int] | None = None,
 ) -> List[Dict[str, Path]]:
     """Parse conversations and write text + prompt files.
 
@@ -94,6 +359,33 @@ def parse_chatgpt_export(
         Directory to write conversation and prompt files.
     markdown: bool, optional
         If True, save conversation transcripts as Markdown rather than plain text.
+    stream: bool, optional
+        Decode and write conversations one at a time instead of loading the
+        whole ``conversations.json`` into memory.
+    incremental: bool, optional
+        Name files by conversation ID instead of export position and keep a
+        ``manifest.json`` of each conversation's ``update_time`` and content
+        hash. Conversations that did not change are not rewritten (their
+        mtimes stay put, so stat-based skips downstream still hold); the files
+        that were written are listed under ``last_run`` in the manifest and
+        returned by :func:`changed_conversations`, which
+        ``kairos pipeline run-all --changed-only`` passes to
+        :func:`scripts.pipeline.run_pipeline` as its ``only`` filter.
+    workers: int, optional
+        Processes used to render, hash, token-count and write conversations
+        (pure-Python work bound by the GIL, so threads would not help).
+        Conversations are sent in batches of ``RENDER_BATCH`` and at most two
+        batches per worker are in flight, so streaming keeps its memory bound.
+        Decoding the export stays in the calling process. ``count_tokens``
+        must then be picklable (a module-level function); see
+        ``src/tools/chatgpt_parse_bench.py`` for the gain on a given machine.
+    columnar: Path, optional
+        Also write every message as one row (conversation ID, title,
+        position, role, timestamp, text, token count) to this Parquet file,
+        or Arrow IPC file for ``.arrow``/``.feather``. Requires ``pyarrow``.
+    count_tokens: Callable[[str], int], optional
+        Token counter for the columnar ``token_count``; defaults to
+        :func:`default_token_counter`.
     Returns
     -------
     List[Dict[str, Path]]
@@ -110,30 +402,128 @@ def parse_chatgpt_export(
     prompt_dir = out_dir / "prompts"
     prompt_dir.mkdir(exist_ok=True)
 
-    conversations = _load_conversations(export_path)
+    conversations: Iterable[Dict] = (
+        iter_conversations(export_path) if stream else _load_conversations(export_path)
+    )
+    manifest = load_manifest(out_dir) if incremental else None
+    previous = manifest["conversations"] if manifest else {}
+    seen: Dict[str, Dict] = {}
+    changed: List[str] = []
     outputs: List[Dict[str, Path]] = []
     ext = "md" if markdown else "txt"
-    for idx, convo in enumerate(conversations):
-        title = convo.get("title") or f"conversation_{idx}"
-        slug = normalize_filename(title)[:32]
-        convo_file = out_dir / f"{idx:04d}_{slug}.{ext}"
-        prompt_file = prompt_dir / f"{idx:04d}_{slug}_prompts.txt"
-        lines = []
-        prompts = []
-        msgs = _extract_messages(convo)
-        if msgs is None:
-            raise ValueError(ERROR_CONVERSATION_EXTRACTION_FAILED)
-        for role, text in msgs:
-            clean = text.strip()
-            if markdown:
-                lines.append(f"**{role.title()}:** {clean}")
+    table = None
+    if columnar is not None:
+        from .message_table import MessageTableWriter
+
+        table = MessageTableWriter(columnar)
+        count_tokens = count_tokens or _count_default_tokens
+    else:
+        count_tokens = None
+
+    def task(job: _Job) -> Tuple[Dict, str | None, Path, Path, str | None]:
+        convo, job.convo = job.convo, {}  # release the parsed conversation early
+        return (
+            convo,
+            job.convo_id,
+            job.convo_file if job.render else None,
+            job.prompt_file,
+            job.entry.get("hash") if job.entry else None,
+        )
+
+    def finish(job: _Job, rendered: _Rendered) -> None:
+        job.rows, job.digest, job.written = rendered
+        if table is not None and job.rows:
+            table.add(job.rows)
+        if manifest is None or not job.convo_id:
+            return
+        if job.render:
+            seen[job.convo_id] = {
+                "stem": job.convo_file.stem,
+                "ext": ext,
+                "update_time": job.update_time,
+                "hash": job.digest,
+            }
+        else:
+            seen[job.convo_id] = job.entry
+        if job.written:
+            changed.append(job.convo_file.name)
+
+    def jobs() -> Iterator[_Job]:
+        for idx, convo in enumerate(conversations):
+            title = convo.get("title") or f"conversation_{idx}"
+            slug = normalize_filename(title)[:32]
+            convo_id = convo.get("conversation_id") or convo.get("id")
+            if manifest is None or not convo_id:
+                stem = f"{idx:04d}_{slug}"
+                entry = None
             else:
-                lines.append(f"{role.upper()}: {clean}")
-            if role == "user":
-                prompts.append(clean)
+                entry = previous.get(convo_id)
+                # keep the first name we gave a conversation, even if retitled
+                stem = entry["stem"] if entry else f"{slug}_{str(convo_id)[:8]}"
+            convo_file = out_dir / f"{stem}.{ext}"
+            prompt_file = prompt_dir / f"{stem}_prompts.txt"
+            outputs.append({"conversation": convo_file, "prompts": prompt_file})
+
+            update_time = convo.get("update_time")
+            unchanged = bool(
+                entry
+                and convo_file.exists()
+                and prompt_file.exists()
+                and entry.get("ext") == ext
+                and update_time is not None
+                and entry.get("update_time") == update_time
+            )
+            if entry and not (convo_file.exists() and prompt_file.exists()):
+                entry = None  # outputs were deleted: always rewrite
+            yield _Job(
+                convo,
+                convo_id,
+                convo_file,
+                prompt_file,
+                entry,
+                render=not unchanged,
+                update_time=update_time,
+            )
+
+    try:
+        if workers <= 1:
+            for job in jobs():
+                tasks = [task(job)]
+                finish(job, *_render_batch(tasks, markdown, incremental, count_tokens))
+        else:
+            # spawn, not fork: the parent may already run FAISS/OpenMP threads
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                pending: Deque[Tuple[List[_Job], Future]] = deque()
+                for batch in _batches(jobs(), RENDER_BATCH):
+                    tasks = [task(job) for job in batch]
+                    future = pool.submit(
+                        _render_batch, tasks, markdown, incremental, count_tokens
+                    )
+                    pending.append((batch, future))
+                    # bounded window, finished in submission order
+                    while len(pending) >= workers * 2:
+                        batch, future = pending.popleft()
+                        for job, rendered in zip(batch, future.result()):
+                            finish(job, rendered)
+                while pending:
+                    batch, future = pending.popleft()
+                    for job, rendered in zip(batch, future.result()):
+                        finish(job, rendered)
+    finally:
+        if table is not None:
+            table.close()
 
-        convo_file.write_text("\n".join(lines), encoding="utf-8")
-        prompt_file.write_text("\n".join(prompts), encoding="utf-8")
-        outputs.append({"conversation": convo_file, "prompts": prompt_file})
+    if manifest is not None:
+        manifest["conversations"] = {**previous, **seen}
+        # exports are cumulative, so vanished conversations are reported only
+        manifest["last_run"] = {
+            "changed": changed,
+            "removed": sorted(set(previous) - set(seen)),
+        }
+        _save_manifest(out_dir, manifest)
+        logger.info("%d of %d conversations changed", len(changed), len(outputs))
+    if table is not None:
+        logger.info("Wrote %d messages to %s", table.rows_written, columnar)
 
     return outputs
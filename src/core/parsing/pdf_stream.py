@@ -0,0 +1,143 @@
+"""Streaming, page-parallel PDF text extraction.
+
+``extract_text`` materialises a whole PDF as one string. The helpers here
+write pages to the parsed file as they are extracted, and for long PDFs
+split the page range across worker processes that each write a part file.
+The output is byte-for-byte what ``extract_text`` would produce (pages joined
+by ``"\\n"``), plus the character offset at which every page starts.
+"""
+
+from __future__ import annotations
+
+import bisect
+import multiprocessing
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+import fitz  # PyMuPDF
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PARALLEL_PAGE_THRESHOLD = 200
+MIN_PAGES_PER_WORKER = 50
+
+
+def page_count(filepath: str | Path) -> int:
+    with fitz.open(str(filepath)) as doc:
+        return doc.page_count
+
+
+def iter_pdf_pages(
+    filepath: str | Path, start: int = 0, stop: int | None = None
+) -> Iterator[str]:
+    """Yield the text of pages ``[start, stop)`` one page at a time."""
+    with fitz.open(str(filepath)) as doc:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for number in range(start, stop):
+            yield doc.load_page(number).get_text()
+
+
+def _write_pages(
+    filepath: str | Path, dest: Path, start: int = 0, stop: int | None = None
+) -> List[int]:
+    """Stream pages into ``dest``; return the character length of each page."""
+    lengths: List[int] = []
+    with dest.open("w", encoding="utf-8") as out:
+        for text in iter_pdf_pages(filepath, start, stop):
+            if lengths:
+                out.write("\n")
+            out.write(text)
+            lengths.append(len(text))
+    return lengths
+
+
+def _write_part(task: tuple[str, str, int, int]) -> List[int]:
+    filepath, part, start, stop = task
+    return _write_pages(filepath, Path(part), start, stop)
+
+
+def _offsets(lengths: Sequence[int]) -> List[int]:
+    offsets, pos = [], 0
+    for length in lengths:
+        offsets.append(pos)
+        pos += length + 1
+    return offsets
+
+
+def _can_fork_workers() -> bool:
+    # pool workers (e.g. parallel ingestion) are daemonic and may not spawn
+    return not multiprocessing.current_process().daemon
+
+
+def stream_pdf_to_file(
+    filepath: str | Path, dest: Path, workers: int | None = None
+) -> List[int]:
+    """Extract ``filepath`` into ``dest`` and return per-page start offsets.
+
+    PDFs with at least ``PARALLEL_PAGE_THRESHOLD`` pages are split into
+    contiguous page ranges, one part file per worker, then concatenated in
+    order. ``workers`` defaults to the CPU count; ``1`` forces streaming in
+    the current process. ``dest`` is written via a temporary file so a failed
+    extraction never leaves a truncated parsed file behind.
+    """
+    dest = Path(dest)
+    tmp = dest.with_name(dest.name + ".partial")
+    pages = page_count(filepath)
+    workers = min(workers or os.cpu_count() or 1, max(1, pages // MIN_PAGES_PER_WORKER))
+
+    try:
+        if pages < PARALLEL_PAGE_THRESHOLD or workers <= 1 or not _can_fork_workers():
+            lengths = _write_pages(filepath, tmp)
+        else:
+            lengths = _write_parallel(filepath, tmp, pages, workers)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return _offsets(lengths)
+
+
+def _write_parallel(
+    filepath: str | Path, tmp: Path, pages: int, workers: int
+) -> List[int]:
+    bounds = [round(i * pages / workers) for i in range(workers + 1)]
+    parts = [tmp.with_name(f"{tmp.name}.{i:03d}") for i in range(workers)]
+    tasks = [
+        (str(filepath), str(part), bounds[i], bounds[i + 1])
+        for i, part in enumerate(parts)
+    ]
+    logger.info(
+        "Extracting %d pages of %s with %d workers", pages, Path(filepath).name, workers
+    )
+    lengths: List[int] = []
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes=workers) as pool:
+            part_lengths = pool.map(_write_part, tasks)
+        with tmp.open("w", encoding="utf-8") as out:
+            for i, (part, chunk) in enumerate(zip(parts, part_lengths)):
+                if i and chunk:
+                    out.write("\n")
+                with part.open("r", encoding="utf-8") as fh:
+                    shutil.copyfileobj(fh, out)
+                lengths.extend(chunk)
+    finally:
+        for part in parts:
+            part.unlink(missing_ok=True)
+    return lengths
+
+
+def page_for_offset(page_offsets: Sequence[int], offset: int) -> int:
+    """Return the 0-based page containing character ``offset``."""
+    return max(0, bisect.bisect_right(page_offsets, offset) - 1)
+
+
+__all__ = [
+    "iter_pdf_pages",
+    "page_count",
+    "page_for_offset",
+    "stream_pdf_to_file",
+]
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Sequence, Tuple
+from typing import Any, Dict, List, Literal, Sequence, Tuple
 
 import numpy as np
 from sklearn.cluster import SpectralClustering
@@ -21,6 +21,8 @@ except ModuleNotFoundError:  # pragma: no cover - optional dependency
 from core.embeddings.embedder import embed_text, embed_text_batch
 from core.logger import get_logger
 
+from .texttiling import boundary_labels, texttiling_boundaries
+
 logger = get_logger(__name__)
 
 
@@ -67,14 +69,49 @@ def _cluster_embeddings(
     return labels.tolist()
 
 
+def pool_window_vectors(
+    window_vectors: Sequence[Sequence[float]],
+    window_spans: Sequence[Tuple[int, int]],
+    segment_spans: Sequence[Tuple[int, int]],
+) -> np.ndarray:
+    """Segment vectors as token-weighted means of overlapping window vectors.
+
+    Each window contributes in proportion to how many of its tokens fall
+    inside the segment; results are L2-normalised like API embeddings.
+    """
+    W = np.asarray(window_vectors, dtype="float32")
+    win = np.asarray(window_spans, dtype=np.int64).reshape(-1, 2)
+    seg = np.asarray(segment_spans, dtype=np.int64).reshape(-1, 2)
+    lo = np.maximum(seg[:, None, 0], win[None, :, 0])
+    hi = np.minimum(seg[:, None, 1], win[None, :, 1])
+    weights = np.clip(hi - lo, 0, None).astype("float32")
+    pooled = weights @ W
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return pooled / norms
+
+
 def semantic_chunk(
     text: str,
     model: str = "text-embedding-3-large",
     window_tokens: int = 256,
     step_tokens: int = 128,
     cluster_method: str = "spectral",
+    boundary_method: str = "cluster",
+    segment_vectors: Literal["embed", "pooled"] = "embed",
 ) -> List[Dict[str, Any]]:
-    """Return semantic chunk objects with embeddings and metadata."""
+    """Return semantic chunk objects with embeddings and metadata.
+
+    ``boundary_method="texttiling"`` cuts at depth-score valleys of adjacent
+    window similarity instead of clustering the windows with UMAP +
+    ``cluster_method``; segment ids are then sequential.
+
+    ``segment_vectors="pooled"`` derives each segment's embedding from the
+    window embeddings already computed (:func:`pool_window_vectors`) instead
+    of a second embedding pass over the segment texts, roughly halving the
+    tokens billed. ``tools/segment_pooling_check.py`` measures how closely
+    pooled vectors track re-embedded ones on a corpus.
+    """
     if tiktoken is None:  # pragma: no cover - optional dependency
         raise ModuleNotFoundError(
             "tiktoken is required for semantic chunking but is not installed."
@@ -107,9 +144,14 @@ def semantic_chunk(
         ]
 
     window_vectors = embed_text_batch(window_texts, model=model, embedder=embed_text)
-    labels = [
-        int(label) for label in _cluster_embeddings(window_vectors, cluster_method)
-    ]
+    if boundary_method == "texttiling":
+        labels = boundary_labels(
+            len(window_vectors), texttiling_boundaries(window_vectors)
+        )
+    else:
+        labels = [
+            int(label) for label in _cluster_embeddings(window_vectors, cluster_method)
+        ]
 
     segment_bounds: List[Tuple[int, int, int]] = []
     current_start = 0
@@ -141,9 +183,19 @@ def semantic_chunk(
             }
         ]
 
-    segment_embeddings = embed_text_batch(
-        [payload[3] for payload in segment_payload], model=model, embedder=embed_text
-    )
+    if segment_vectors == "pooled":
+        window_spans = [(i, min(i + window_tokens, len(tokens))) for i in starts]
+        segment_embeddings = pool_window_vectors(
+            window_vectors,
+            window_spans,
+            [(start, end) for start, end, _, _ in segment_payload],
+        ).tolist()
+    else:
+        segment_embeddings = embed_text_batch(
+            [payload[3] for payload in segment_payload],
+            model=model,
+            embedder=embed_text,
+        )
 
     segments: List[Dict[str, Any]] = []
     for (start, end, label, seg_text), vector in zip(
@@ -165,5 +217,9 @@ def semantic_chunk(
 
 
 def semantic_chunk_text(*args, **kwargs) -> List[str]:
-    """Compatibility wrapper returning only text chunks."""
+    """Compatibility wrapper returning only text chunks.
+
+    The segment vectors are discarded, so they are pooled rather than paid for.
+    """
+    kwargs.setdefault("segment_vectors", "pooled")
     return [c["text"] for c in semantic_chunk(*args, **kwargs)]
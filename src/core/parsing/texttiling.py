@@ -0,0 +1,134 @@
+"""TextTiling-style topic boundaries from adjacent window similarity.
+
+An alternative to fitting UMAP + Spectral/HDBSCAN on every document's window
+embeddings: compute the cosine similarity of each pair of neighbouring
+windows, smooth it, score every valley by its depth relative to the peaks on
+either side (Hearst, 1997) and cut where the depth clears
+``mean + cutoff * std`` of all valley depths. Everything is a linear pass
+over the windows and fully deterministic.
+
+Hearst's liberal cutoff (``cutoff=-0.5``) was tuned for sentence blocks; on
+overlapping embedding windows it over-segments badly, hence the stricter
+default of ``0.5`` (see ``tools/segment_bench.py``).
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+
+
+def adjacent_similarity(vectors: Sequence[Sequence[float]] | np.ndarray) -> np.ndarray:
+    """Cosine similarity between window ``i`` and ``i + 1`` (length ``n - 1``)."""
+    X = np.asarray(vectors, dtype="float32")
+    if len(X) < 2:
+        return np.zeros(0, dtype="float32")
+    norms = np.sqrt(np.einsum("ij,ij->i", X, X))
+    norms[norms == 0] = 1.0
+    X = X / norms[:, None]
+    return np.einsum("ij,ij->i", X[:-1], X[1:])
+
+
+def smooth(similarity: np.ndarray, smoothing: int = 1) -> np.ndarray:
+    """Moving average of half-width ``smoothing`` (edges padded)."""
+    s = np.asarray(similarity, dtype="float64")
+    if smoothing <= 0 or len(s) <= 2:
+        return s
+    width = 2 * smoothing + 1
+    padded = np.pad(s, smoothing, mode="edge")
+    return np.convolve(padded, np.ones(width) / width, mode="valid")
+
+
+def depth_scores(similarity: np.ndarray, smoothing: int = 1) -> np.ndarray:
+    """Depth of each gap: climb to the nearest peak on both sides.
+
+    ``smoothing`` is the half-width of a moving average applied first. The
+    peak climbs are computed as running recurrences, so the whole pass is
+    O(n) even for monotone similarity curves. Climbs walk across plateaus, so
+    a flat-bottomed valley scores its full depth at every gap.
+    """
+    s = smooth(similarity, smoothing)
+    n = len(s)
+    left = s.copy()
+    for i in range(1, n):
+        if s[i - 1] >= s[i]:
+            left[i] = left[i - 1]
+    right = s.copy()
+    for i in range(n - 2, -1, -1):
+        if s[i + 1] >= s[i]:
+            right[i] = right[i + 1]
+    return (left - s) + (right - s)
+
+
+def _valley_bottoms(s: np.ndarray) -> List[int]:
+    """Local minima of ``s``; a flat bottom contributes its middle gap."""
+    out: List[int] = []
+    n, i = len(s), 0
+    while i < n:
+        j = i
+        while j + 1 < n and s[j + 1] == s[i]:
+            j += 1
+        if (i == 0 or s[i - 1] > s[i]) and (j == n - 1 or s[j + 1] > s[j]):
+            out.append((i + j) // 2)
+        i = j + 1
+    return out
+
+
+def texttiling_boundaries(
+    vectors: Sequence[Sequence[float]] | np.ndarray,
+    smoothing: int = 1,
+    cutoff: float = 0.5,
+    threshold: float | None = None,
+    min_gap: int = 2,
+) -> List[int]:
+    """Return indices of the windows that start a new segment.
+
+    Args:
+        vectors: Window embeddings in document order
+        smoothing (int): Moving-average half-width over the similarity curve
+        cutoff (float): Boundaries need depth ``>= mean + cutoff * std``
+            over all valley bottoms
+        threshold (float | None): Absolute minimum depth, overriding
+            ``cutoff``
+        min_gap (int): Minimum windows between two boundaries; of two close
+            candidates the deeper one wins
+    """
+    similarity = smooth(adjacent_similarity(vectors), smoothing)
+    depth = depth_scores(similarity, smoothing=0)
+    candidates = [g for g in _valley_bottoms(similarity) if depth[g] > 1e-9]
+    if not candidates:
+        return []
+    if threshold is None:
+        scores = depth[candidates]
+        threshold = float(scores.mean() + cutoff * scores.std())
+
+    bounds: List[int] = []
+    best: List[float] = []
+    for gap in candidates:
+        if depth[gap] < threshold:
+            continue
+        window = gap + 1  # gap i separates windows i and i + 1
+        if bounds and window - bounds[-1] < min_gap:
+            if depth[gap] > best[-1]:
+                bounds[-1], best[-1] = window, float(depth[gap])
+            continue
+        bounds.append(window)
+        best.append(float(depth[gap]))
+    return bounds
+
+
+def boundary_labels(n_windows: int, boundaries: Sequence[int]) -> List[int]:
+    """Sequential segment id per window (0, 0, 1, 1, 1, 2, ...)."""
+    starts = np.zeros(n_windows, dtype=int)
+    np.add.at(starts, np.asarray(boundaries, dtype=int), 1)
+    return np.cumsum(starts).tolist()
+
+
+__all__ = [
+    "adjacent_similarity",
+    "boundary_labels",
+    "depth_scores",
+    "smooth",
+    "texttiling_boundaries",
+]
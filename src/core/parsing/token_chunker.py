@@ -0,0 +1,211 @@
+"""Single-pass, token-budgeted chunking that returns offsets, not strings.
+
+The document is tokenized once. Paragraph and sentence boundaries are mapped
+onto token indices with a linear merge, and chunks are filled greedily to
+``max_tokens``, cutting at the last paragraph break inside the budget, else
+the last sentence end, else the budget itself (never mid-token). Each chunk
+is a :class:`Span` carrying both character and token offsets, so callers
+slice the source text lazily and already know every chunk's token count.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+
+try:
+    import tiktoken  # type: ignore[import]
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    tiktoken = None  # type: ignore[assignment]
+
+TokenOffsets = Callable[[str], Sequence[int]]
+
+PARAGRAPH_RE = re.compile(r"\n[ \t]*\n\s*")
+SENTENCE_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+WORD_RE = re.compile(r"\s*(?:\w+|[^\w\s])")
+
+
+@dataclass(frozen=True)
+class Span:
+    char_start: int
+    char_end: int
+    token_start: int
+    token_end: int
+
+    @property
+    def n_tokens(self) -> int:
+        return self.token_end - self.token_start
+
+    def slice(self, text: str) -> str:
+        return text[self.char_start : self.char_end]
+
+
+def tiktoken_offsets(model: str = "text-embedding-3-small") -> TokenOffsets:
+    """Start character of every tiktoken token for ``model``."""
+    if tiktoken is None:  # pragma: no cover - optional dependency
+        raise ModuleNotFoundError(
+            "tiktoken is required for token chunking but is not installed."
+        )
+    enc = tiktoken.encoding_for_model(model)
+
+    def offsets(text: str) -> List[int]:
+        tokens = enc.encode(text, disallowed_special=())
+        return enc.decode_with_offsets(tokens)[1]
+
+    return offsets
+
+
+def word_offsets(text: str) -> List[int]:
+    """Approximate tokenizer: words and punctuation, leading space attached."""
+    return [m.start() for m in WORD_RE.finditer(text)]
+
+
+def _boundary_tokens(
+    pattern: re.Pattern, text: str, offsets: Sequence[int]
+) -> List[int]:
+    """First token at or after the start of each ``pattern`` match.
+
+    The separating whitespace thus opens the next chunk (and is trimmed),
+    which also works for tokenizers that attach leading spaces to words.
+    """
+    out: List[int] = []
+    t, n = 0, len(offsets)
+    for match in pattern.finditer(text):
+        pos = match.start()
+        while t < n and offsets[t] < pos:
+            t += 1
+        if t < n and (not out or out[-1] != t):
+            out.append(t)
+    return out
+
+
+class _Cursor:
+    """Monotone 'last boundary <= limit' lookup over a sorted list."""
+
+    def __init__(self, bounds: List[int]):
+        self.bounds = bounds
+        self.i = -1
+
+    def last_at_most(self, limit: int) -> int:
+        while self.i + 1 < len(self.bounds) and self.bounds[self.i + 1] <= limit:
+            self.i += 1
+        return self.bounds[self.i] if self.i >= 0 else -1
+
+
+def token_chunks(
+    text: str,
+    max_tokens: int = 512,
+    overlap: int = 0,
+    *,
+    token_offsets: TokenOffsets | None = None,
+    min_fill: float = 0.5,
+) -> List[Span]:
+    """Split ``text`` into spans of at most ``max_tokens`` tokens.
+
+    Args:
+        text (str): Document to chunk
+        max_tokens (int): Token budget per chunk
+        overlap (int): Tokens repeated at the start of the next chunk
+        token_offsets (callable): Returns the start character of each token;
+            defaults to :func:`tiktoken_offsets`
+        min_fill (float): A paragraph or sentence boundary is only used if
+            the chunk is at least this fraction of ``max_tokens``
+
+    Returns:
+        List[Span]: Character and token offsets, whitespace-trimmed
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be in [0, max_tokens)")
+
+    offsets = (token_offsets or tiktoken_offsets())(text)
+    n = len(offsets)
+    paragraphs = _Cursor(_boundary_tokens(PARAGRAPH_RE, text, offsets))
+    sentences = _Cursor(_boundary_tokens(SENTENCE_RE, text, offsets))
+    min_len = max(1, int(max_tokens * min_fill))
+
+    def char_at(token: int) -> int:
+        return offsets[token] if token < n else len(text)
+
+    spans: List[Span] = []
+    start = 0
+    while start < n:
+        limit = start + max_tokens
+        if limit >= n:
+            end = n
+        else:
+            end = limit
+            for cursor in (paragraphs, sentences):
+                cut = cursor.last_at_most(limit)
+                if cut >= start + min_len:
+                    end = cut
+                    break
+
+        lo, hi = char_at(start), char_at(end)
+        while lo < hi and text[lo].isspace():
+            lo += 1
+        while hi > lo and text[hi - 1].isspace():
+            hi -= 1
+        if lo < hi:
+            spans.append(Span(lo, hi, start, end))
+
+        if end >= n:
+            break
+        start = end - overlap if end - overlap > start else end
+    return spans
+
+
+def pack_chunks(
+    chunks: Sequence[str],
+    max_tokens: int,
+    *,
+    overhead: int = 0,
+    count_tokens: Callable[[str], int] | None = None,
+    separator: str = "\n\n",
+) -> List[str]:
+    """Greedily join adjacent ``chunks`` into bins of at most ``max_tokens``.
+
+    ``overhead`` is charged once per bin (e.g. the prompt template a bin is
+    wrapped in), and the separator's tokens once per join. Order is kept and
+    chunks are never split, so a chunk larger than the budget forms its own
+    bin. Blank chunks are dropped.
+
+    Args:
+        chunks (Sequence[str]): Adjacent text pieces, in document order
+        max_tokens (int): Token budget per bin, overhead included
+        overhead (int): Fixed tokens added to every bin
+        count_tokens (callable): Token counter; defaults to tiktoken
+        separator (str): Text placed between joined chunks
+
+    Returns:
+        List[str]: Packed bins
+    """
+    if count_tokens is None:
+        offsets = tiktoken_offsets()
+
+        def count_tokens(text: str) -> int:
+            return len(offsets(text))
+
+    sep_tokens = count_tokens(separator) if separator else 0
+    bins: List[str] = []
+    current: List[str] = []
+    used = overhead
+    for chunk in chunks:
+        if not chunk.strip():
+            continue
+        cost = count_tokens(chunk)
+        if current and used + sep_tokens + cost > max_tokens:
+            bins.append(separator.join(current))
+            current, used = [], overhead
+        if current:
+            used += sep_tokens
+        current.append(chunk)
+        used += cost
+    if current:
+        bins.append(separator.join(current))
+    return bins
+
+
+__all__ = ["Span", "pack_chunks", "tiktoken_offsets", "token_chunks", "word_offsets"]
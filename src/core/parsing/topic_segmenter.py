@@ -6,6 +6,7 @@ Module: core.parsing.topic_segmenter
 - @ai-intent: "Detect topic boundaries using UMAP + HDBSCAN over window embeddings."
 """
 
+import time
 from typing import Any, Dict, List, Optional
 
 import numpy as np
@@ -25,11 +26,12 @@ try:
 except ModuleNotFoundError:  # pragma: no cover - optional dependency
     umap = None  # type: ignore[assignment]
 
-from core.embeddings.embedder import embed_text
+from core.embeddings.embedder import embed_packed
 from core.logger import get_logger
 
 from .chunk_text import chunk_text
 from .semantic_chunk import semantic_chunk_text
+from .texttiling import boundary_labels, texttiling_boundaries
 
 logger = get_logger(__name__)
 
@@ -47,6 +49,55 @@ def segment_text(text: str) -> List[str]:
     return semantic_chunk_text(text)
 
 
+def tile_text(text: str) -> List[str]:
+    """Like :func:`segment_text` but with TextTiling boundaries (no clustering)."""
+    return semantic_chunk_text(text, boundary_method="texttiling")
+
+
+def _cluster_windows(
+    X: np.ndarray,
+    cluster_method: str,
+    umap_config: Optional[Dict[str, Any]],
+    hdbscan_config: Optional[Dict[str, Any]],
+    timings: Dict[str, float],
+) -> np.ndarray:
+    """Label windows with UMAP + HDBSCAN."""
+    if umap is None:  # pragma: no cover - optional dependency
+        raise ModuleNotFoundError(
+            "umap-learn is required for topic segmentation but is not installed."
+        )
+    tic = time.perf_counter()
+    reducer = umap.UMAP(
+        **(umap_config or {"n_neighbors": 15, "min_dist": 0.1, "random_state": 42})
+    )
+    X_red = reducer.fit_transform(X)
+    timings["reduce"] = time.perf_counter() - tic
+
+    if cluster_method != "hdbscan":
+        logger.warning("Unsupported cluster_method %s; using hdbscan", cluster_method)
+
+    if hdbscan is None:  # pragma: no cover - optional dependency
+        raise ModuleNotFoundError(
+            "hdbscan is required for topic segmentation but is not installed."
+        )
+    tic = time.perf_counter()
+    clusterer = hdbscan.HDBSCAN(**(hdbscan_config or {"min_cluster_size": 2}))
+    labels = clusterer.fit_predict(X_red)
+    timings["cluster"] = time.perf_counter() - tic
+
+    logger.info(
+        "HDBSCAN found %d clusters", len(set(labels)) - (1 if -1 in labels else 0)
+    )
+    return labels
+
+
+def _decode_all(enc, pieces: List[List[int]]) -> List[str]:
+    decode_batch = getattr(enc, "decode_batch", None)
+    if decode_batch is not None:
+        return decode_batch(pieces)
+    return [enc.decode(piece) for piece in pieces]
+
+
 def segment_topics(
     text: str,
     window_tokens: int = 200,
@@ -55,28 +106,34 @@ def segment_topics(
     model: str = "text-embedding-3-small",
     umap_config: Optional[Dict[str, Any]] = None,
     hdbscan_config: Optional[Dict[str, Any]] = None,
+    boundary_method: str = "cluster",
+    concurrency: int = 4,
 ) -> List[Dict[str, Any]]:
-    """Return topic segments with start/end token indices and cluster IDs."""
+    """Return topic segments with start/end token indices and cluster IDs.
+
+    With ``boundary_method="texttiling"`` the UMAP + HDBSCAN fit is replaced
+    by linear-time depth-score boundary detection over adjacent windows.
+
+    Windows are decoded in one batch and embedded with packed requests
+    (:func:`core.embeddings.embedder.embed_packed`, up to ``concurrency`` in
+    flight) rather than one request per window. Every segment carries its own
+    copy of the run's ``timings`` dict with seconds spent per stage (tokenize,
+    decode, embed, reduce, cluster), so callers may edit one freely.
+    """
     if tiktoken is None:  # pragma: no cover - optional dependency
         raise ModuleNotFoundError(
             "tiktoken is required for topic segmentation but is not installed."
         )
 
+    timings = dict.fromkeys(("tokenize", "decode", "embed", "reduce", "cluster"), 0.0)
+    tic = time.perf_counter()
     enc = tiktoken.encoding_for_model(model)
     tokens = enc.encode(text, disallowed_special=())
+    starts = list(range(0, len(tokens), step_tokens))
+    pieces = [tokens[i : i + window_tokens] for i in starts]
+    timings["tokenize"] = time.perf_counter() - tic
 
-    windows: List[List[float]] = []
-    starts: List[int] = []
-    for i in range(0, len(tokens), step_tokens):
-        window = tokens[i : i + window_tokens]
-        if not window:
-            continue
-        window_text = enc.decode(window)
-        vec = embed_text(window_text, model=model)
-        windows.append(vec)
-        starts.append(i)
-
-    if not windows:
+    if not pieces:
         logger.warning("No windows produced for segmentation")
         return [
             {
@@ -84,58 +141,59 @@ def segment_topics(
                 "start": 0,
                 "end": len(tokens),
                 "cluster_id": 0,
+                "timings": timings,
             }
         ]
 
-    logger.info("Embedded %d windows", len(windows))
+    tic = time.perf_counter()
+    window_texts = _decode_all(enc, pieces)
+    timings["decode"] = time.perf_counter() - tic
 
-    X = np.asarray(windows, dtype="float32")
-    if umap is None:  # pragma: no cover - optional dependency
-        raise ModuleNotFoundError(
-            "umap-learn is required for topic segmentation but is not installed."
-        )
-    reducer = umap.UMAP(
-        **(umap_config or {"n_neighbors": 15, "min_dist": 0.1, "random_state": 42})
+    tic = time.perf_counter()
+    windows = embed_packed(
+        window_texts,
+        model=model,
+        token_counts=[len(piece) for piece in pieces],
+        concurrency=concurrency,
     )
-    X_red = reducer.fit_transform(X)
-
-    if cluster_method != "hdbscan":
-        logger.warning("Unsupported cluster_method %s; using hdbscan", cluster_method)
+    timings["embed"] = time.perf_counter() - tic
+    logger.info("Embedded %d windows", len(windows))
 
-    if hdbscan is None:  # pragma: no cover - optional dependency
-        raise ModuleNotFoundError(
-            "hdbscan is required for topic segmentation but is not installed."
+    X = np.asarray(windows, dtype="float32")
+    if boundary_method == "texttiling":
+        tic = time.perf_counter()
+        labels = np.asarray(boundary_labels(len(X), texttiling_boundaries(X)))
+        timings["cluster"] = time.perf_counter() - tic
+    else:
+        labels = _cluster_windows(
+            X, cluster_method, umap_config, hdbscan_config, timings
         )
-    clusterer = hdbscan.HDBSCAN(**(hdbscan_config or {"min_cluster_size": 2}))
-    labels = clusterer.fit_predict(X_red)
-
-    logger.info(
-        "HDBSCAN found %d clusters", len(set(labels)) - (1 if -1 in labels else 0)
-    )
 
-    segments: List[Dict[str, Any]] = []
+    bounds: List[tuple] = []
     current_start = 0
     current_label = int(labels[0])
     for idx in range(1, len(starts)):
         if int(labels[idx]) != current_label:
-            segments.append(
-                {
-                    "text": enc.decode(tokens[current_start : starts[idx]]),
-                    "start": current_start,
-                    "end": starts[idx],
-                    "cluster_id": current_label,
-                }
-            )
+            bounds.append((current_start, starts[idx], current_label))
             current_start = starts[idx]
             current_label = int(labels[idx])
+    bounds.append((current_start, len(tokens), current_label))
 
-    segments.append(
-        {
-            "text": enc.decode(tokens[current_start : len(tokens)]),
-            "start": current_start,
-            "end": len(tokens),
-            "cluster_id": current_label,
-        }
+    tic = time.perf_counter()
+    texts = _decode_all(enc, [tokens[start:end] for start, end, _ in bounds])
+    timings["decode"] += time.perf_counter() - tic
+    logger.info(
+        "Segmentation timings: %s",
+        ", ".join(f"{stage} {secs:.3f}s" for stage, secs in timings.items()),
     )
 
-    return segments
+    return [
+        {
+            "text": seg_text,
+            "start": start,
+            "end": end,
+            "cluster_id": label,
+            "timings": dict(timings),
+        }
+        for (start, end, label), seg_text in zip(bounds, texts, strict=True)
+    ]
@@ -1,3 +1,6 @@
+from .cache import ResultCache
+from .doc_index import DocumentIndex
+from .rerank import mmr
 from .retriever import Retriever
 
-__all__ = ["Retriever"]
+__all__ = ["DocumentIndex", "ResultCache", "Retriever", "mmr"]
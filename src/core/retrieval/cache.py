@@ -0,0 +1,166 @@
+"""Bounded result cache for :class:`core.retrieval.retriever.Retriever`.
+
+Entries are tagged with the FAISS index content token they were computed
+against (``FaissStore.version``); a lookup with a different token is
+treated as a miss and the stale entry is dropped. An optional SQLite file
+lets several processes (CLI, GUI, agents) share results for the same index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Return a stable digest for ``parts`` (query text, k, flags, ...)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _restore(value: Any) -> List[tuple]:
+    """JSON round-trips turn result tuples into lists; convert them back."""
+    return [tuple(item) for item in value]
+
+
+class ResultCache:
+    """LRU cache of ranked retrieval results keyed by query digest.
+
+    Parameters
+    ----------
+    max_entries : int
+        Upper bound on cached result lists, in memory and on disk.
+    path : Path, optional
+        SQLite file used to share entries across processes.
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Path | None = None
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[str, List[tuple]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(self.path), timeout=30, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, version TEXT, payload TEXT, accessed REAL)"
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, version: str) -> Optional[List[tuple]]:
+        """Return cached results for ``key`` computed at index ``version``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(entry[1])
+                del self._entries[key]
+
+            value = self._db_get(key, version)
+            if value is None:
+                self.misses += 1
+                return None
+            self._remember(key, version, value)
+            self.hits += 1
+            return list(value)
+
+    def put(self, key: str, version: str, value: List[tuple]) -> None:
+        """Store ``value`` for ``key`` at index ``version``."""
+        value = _restore(value)
+        with self._lock:
+            self._remember(key, version, value)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    (key, version, json.dumps(value), time.time()),
+                )
+                self._db.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self._db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("Retrieval cache write failed: %s", exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def _remember(self, key: str, version: str, value: List[tuple]) -> None:
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _db_get(self, key: str, version: str) -> Optional[List[tuple]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT version, payload FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] != version:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+            return _restore(json.loads(row[1]))
+        except sqlite3.Error as exc:
+            logger.warning("Retrieval cache read failed: %s", exc)
+            return None
+
+
+_instance: "ResultCache | None" = None
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide ``ResultCache`` configured from the environment.
+
+    Environment variables:
+    - ``RETRIEVAL_CACHE_SIZE``: maximum cached result lists (default 1024).
+    - ``RETRIEVAL_CACHE_PATH``: optional SQLite file shared between processes.
+    """
+    global _instance
+    if _instance is None:
+        size = int(os.getenv("RETRIEVAL_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+        path = os.getenv("RETRIEVAL_CACHE_PATH")
+        _instance = ResultCache(size, path=Path(path) if path else None)
+    return _instance
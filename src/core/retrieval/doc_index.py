@@ -0,0 +1,188 @@
+"""Document-level routing index built on top of the chunk FAISS index.
+
+Chunks named ``<doc>_chunkNN`` are grouped once, at build time, into integer
+document codes. Each document gets an L2-normalised centroid; at query time
+the centroids pick the most promising documents and only *their* chunks are
+scored. Chunks are stored sorted by document code so pooling is a NumPy
+``reduceat`` over contiguous segments instead of a Python group-by.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Literal, Tuple
+
+import numpy as np
+
+from core.logger import get_logger
+from core.vectorstore.faiss_store import FaissStore
+
+logger = get_logger(__name__)
+
+Pooling = Literal["max", "mean", "sum"]
+POOLING_MODES = ("max", "mean", "sum")
+
+
+def document_root(name: str) -> str:
+    """Return the document ID a chunk name belongs to."""
+    return name.split("_chunk")[0]
+
+
+class DocumentIndex:
+    """Centroid index over documents plus a doc-sorted view of their chunks.
+
+    Parameters
+    ----------
+    doc_names : list[str]
+        Document ID for each integer document code.
+    chunk_ids : np.ndarray
+        ``int64`` FAISS IDs of all chunks, sorted by document code.
+    offsets : np.ndarray
+        ``len(doc_names) + 1`` offsets into ``chunk_ids`` delimiting each
+        document's chunks.
+    centroids : np.ndarray
+        ``(n_docs, d)`` normalised mean chunk vector per document.
+    version : str
+        ``FaissStore.version`` token the index was built from.
+    """
+
+    def __init__(
+        self,
+        doc_names: List[str],
+        chunk_ids: np.ndarray,
+        offsets: np.ndarray,
+        centroids: np.ndarray,
+        version: str = "",
+    ):
+        self.doc_names = list(doc_names)
+        self.chunk_ids = np.asarray(chunk_ids, dtype="int64")
+        self.offsets = np.asarray(offsets, dtype="int64")
+        self.centroids = np.asarray(centroids, dtype="float32")
+        self.version = str(version)
+        self._positions: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.doc_names)
+
+    @classmethod
+    def build(cls, store: FaissStore, id_map: Dict[int, str]) -> "DocumentIndex":
+        """Group every vector in ``store`` by document and compute centroids."""
+        ids = store.ids()
+        vectors = store.vectors()
+        roots = [document_root(id_map.get(int(i), str(int(i)))) for i in ids]
+        doc_names, codes = np.unique(
+            np.asarray(roots, dtype=object), return_inverse=True
+        )
+        codes = codes.astype("int32")
+
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes, minlength=len(doc_names))
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype("int64")
+
+        sums = np.zeros((len(doc_names), vectors.shape[1]), dtype="float32")
+        np.add.at(sums, codes, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+
+        index = cls(
+            [str(n) for n in doc_names],
+            ids[order],
+            offsets,
+            centroids,
+            version=store.version,
+        )
+        index._positions = order.astype("int64")
+        return index
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as fh:
+            np.savez(
+                fh,
+                doc_names=np.asarray(self.doc_names, dtype=str),
+                chunk_ids=self.chunk_ids,
+                offsets=self.offsets,
+                centroids=self.centroids,
+                version=np.str_(self.version),
+            )
+
+    @classmethod
+    def load(cls, path: Path, store: FaissStore) -> "DocumentIndex | None":
+        """Load ``path`` if it matches the current generation of ``store``."""
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(
+                data["doc_names"].tolist(),
+                data["chunk_ids"],
+                data["offsets"],
+                data["centroids"],
+                version=str(data["version"]),
+            )
+        if index.version != getattr(store, "version", index.version):
+            logger.warning(
+                "Ignoring stale document index %s (index version %s, built from %s)",
+                path,
+                store.version,
+                index.version,
+            )
+            return None
+        return index
+
+    def chunk_positions(self, store: FaissStore) -> np.ndarray:
+        """Storage positions of ``chunk_ids`` in ``store`` (cached)."""
+        if self._positions is None:
+            self._positions = store.positions(self.chunk_ids)
+        return self._positions
+
+    def chunk_slice(self, doc: int) -> np.ndarray:
+        return self.chunk_ids[self.offsets[doc] : self.offsets[doc + 1]]
+
+    def search(
+        self,
+        store: FaissStore,
+        query_vecs: np.ndarray,
+        k: int = 5,
+        pooling: Pooling = "mean",
+        n_docs: int | None = None,
+    ) -> List[Tuple[int, float]]:
+        """Return ``(doc_code, score)`` for the top ``k`` documents.
+
+        ``n_docs`` documents (default ``max(4 * k, 20)``) are routed by
+        centroid similarity, averaged over the query vectors; their chunks
+        are then scored exactly and pooled per document.
+        """
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"Unsupported pooling: {pooling}")
+        queries = np.asarray(query_vecs, dtype="float32").reshape(
+            -1, self.centroids.shape[1]
+        )
+        n_total = len(self.doc_names)
+        if n_total == 0 or len(queries) == 0:
+            return []
+
+        routed = (self.centroids @ queries.T).mean(axis=1)
+        n_docs = min(n_total, n_docs or max(4 * k, 20))
+        docs = np.argpartition(-routed, n_docs - 1)[:n_docs]
+        docs.sort()
+
+        starts = self.offsets[docs]
+        lengths = self.offsets[docs + 1] - starts
+        seg_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        rows = np.repeat(starts - seg_starts, lengths) + np.arange(lengths.sum())
+
+        vectors = store.vectors()[self.chunk_positions(store)[rows]]
+        chunk_scores = (vectors @ queries.T).mean(axis=1)
+
+        if pooling == "max":
+            pooled = np.maximum.reduceat(chunk_scores, seg_starts)
+        else:
+            pooled = np.add.reduceat(chunk_scores, seg_starts)
+            if pooling == "mean":
+                pooled = pooled / lengths
+
+        top = np.argsort(-pooled, kind="stable")[:k]
+        return [(int(docs[i]), float(pooled[i])) for i in top]
+
+
+__all__ = ["DocumentIndex", "POOLING_MODES", "document_root"]
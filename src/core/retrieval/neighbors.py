@@ -0,0 +1,308 @@
+"""Precomputed k-nearest-neighbour graph over every vector in the FAISS index.
+
+The graph is built by a blocked batch search against the flat index (FAISS
+parallelises each block over all cores) and stored as CSR arrays: ``indptr``
+(``int64``), ``indices`` (``int32`` row numbers) and ``scores``
+(``float16``). Row ``i`` belongs to external FAISS ID ``ids[i]``, so a
+"related documents" lookup is a dict hit plus a slice.
+
+:meth:`NeighborGraph.refresh` updates a graph after the index was rebuilt or
+upserted: only rows whose vector changed, which are new, or whose neighbour
+lists point at changed/removed rows are searched again; every other row just
+merges in the changed vectors as extra candidates.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+try:
+    import faiss  # type: ignore[import]
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    faiss = None  # type: ignore[assignment]
+
+from core.logger import get_logger
+from core.vectorstore.faiss_store import FaissStore
+
+logger = get_logger(__name__)
+
+DEFAULT_BLOCK_SIZE = 4096
+
+
+def _fingerprint(vectors: np.ndarray) -> np.ndarray:
+    """Cheap per-row signature used to detect vectors that changed."""
+    probe = np.random.default_rng(0).standard_normal((vectors.shape[1], 2))
+    return np.asarray(vectors, dtype="float64") @ probe
+
+
+def _search_rows(
+    vectors: np.ndarray, rows: np.ndarray, k: int, block_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-``k`` neighbours (excluding self) of ``rows``, as dense arrays."""
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    out_idx = np.full((len(rows), k), -1, dtype="int64")
+    out_score = np.full((len(rows), k), -np.inf, dtype="float32")
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        scores, idx = index.search(vectors[block], k + 1)
+        self_hit = idx == block[:, None]
+        # push the self match (and FAISS padding) to the end of each row
+        order = np.argsort(self_hit | (idx < 0), axis=1, kind="stable")
+        idx = np.take_along_axis(idx, order, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, order, axis=1)[:, :k]
+        out_idx[start : start + len(block)] = idx
+        out_score[start : start + len(block)] = scores
+    out_score[out_idx < 0] = -np.inf
+    return out_idx, out_score
+
+
+class NeighborGraph:
+    """CSR top-``k`` neighbour lists for every vector of a :class:`FaissStore`."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        version: str = "",
+        fingerprints: np.ndarray | None = None,
+    ):
+        self.ids = np.asarray(ids, dtype="int64")
+        self.indptr = np.asarray(indptr, dtype="int64")
+        self.indices = np.asarray(indices, dtype="int32")
+        self.scores = np.asarray(scores, dtype="float16")
+        self.k = int(k)
+        self.version = str(version)
+        self.fingerprints = (
+            np.asarray(fingerprints, dtype="float64")
+            if fingerprints is not None
+            else np.zeros((len(self.ids), 2))
+        )
+        self._rows: Dict[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        store: FaissStore,
+        k: int = 10,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        threads: int | None = None,
+    ) -> "NeighborGraph":
+        """Search every stored vector against the index in blocks."""
+        if faiss is None:  # pragma: no cover - optional dependency
+            raise ModuleNotFoundError(
+                "faiss is required for NeighborGraph but is not installed."
+            )
+        faiss.omp_set_num_threads(threads or os.cpu_count() or 1)
+        vectors = np.ascontiguousarray(store.vectors(), dtype="float32")
+        n = len(vectors)
+        k = max(0, min(k, n - 1))
+        idx, scores = _search_rows(vectors, np.arange(n), k, block_size)
+        graph = cls._from_dense(store.ids(), idx, scores, k, store.version)
+        graph.fingerprints = _fingerprint(vectors)
+        logger.info("Built %d-NN graph over %d vectors", k, n)
+        return graph
+
+    @classmethod
+    def _from_dense(
+        cls,
+        ids: np.ndarray,
+        idx: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        version: str,
+    ) -> "NeighborGraph":
+        valid = idx >= 0
+        indptr = np.concatenate(([0], np.cumsum(valid.sum(axis=1)))).astype("int64")
+        return cls(ids, indptr, idx[valid], scores[valid], k, version)
+
+    def _to_dense(self) -> Tuple[np.ndarray, np.ndarray]:
+        n, k = len(self.ids), self.k
+        idx = np.full((n, k), -1, dtype="int64")
+        scores = np.full((n, k), -np.inf, dtype="float32")
+        counts = np.diff(self.indptr)
+        rows = np.repeat(np.arange(n), counts)
+        cols = np.arange(len(self.indices)) - np.repeat(self.indptr[:-1], counts)
+        idx[rows, cols] = self.indices
+        scores[rows, cols] = self.scores
+        return idx, scores
+
+    def refresh(
+        self,
+        store: FaissStore,
+        changed: Iterable[int] | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        threads: int | None = None,
+    ) -> "NeighborGraph":
+        """Return a graph for the current ``store`` reusing unaffected rows.
+
+        ``changed`` lists external IDs whose vectors were replaced; when
+        omitted they are detected from per-row fingerprints.
+        """
+        faiss.omp_set_num_threads(threads or os.cpu_count() or 1)
+        vectors = np.ascontiguousarray(store.vectors(), dtype="float32")
+        new_ids = store.ids()
+        n, k = len(new_ids), self.k
+        if n - 1 < k or len(self) == 0:
+            return NeighborGraph.build(store, k, block_size, threads)
+
+        # map old rows onto new rows by external ID
+        sorter = np.argsort(new_ids)
+        pos = np.searchsorted(new_ids, self.ids, sorter=sorter)
+        pos = np.clip(pos, 0, n - 1)
+        old_to_new = np.where(new_ids[sorter[pos]] == self.ids, sorter[pos], -1)
+        new_to_old = np.full(n, -1, dtype="int64")
+        kept = old_to_new >= 0
+        new_to_old[old_to_new[kept]] = np.nonzero(kept)[0]
+
+        prints = _fingerprint(vectors)
+        dirty = new_to_old < 0
+        known = ~dirty
+        dirty[known] = ~np.all(
+            np.isclose(prints[known], self.fingerprints[new_to_old[known]]), axis=1
+        )
+        if changed is not None:
+            dirty |= np.isin(new_ids, np.fromiter(changed, dtype="int64"))
+        moved = np.nonzero(dirty)[0]
+
+        old_idx, old_scores = self._to_dense()
+        idx = np.full((n, k), -1, dtype="int64")
+        scores = np.full((n, k), -np.inf, dtype="float32")
+        idx[known] = old_idx[new_to_old[known]]
+        scores[known] = old_scores[new_to_old[known]]
+        remapped = np.where(idx >= 0, old_to_new[np.maximum(idx, 0)], -1)
+        # rows that lost a neighbour or point at a changed vector are recomputed
+        stale = (remapped < 0) & (idx >= 0)
+        touches_dirty = np.zeros_like(stale)
+        touches_dirty[remapped >= 0] = dirty[remapped[remapped >= 0]]
+        dirty |= (stale | touches_dirty).any(axis=1)
+        idx = remapped
+
+        dirty_rows = np.nonzero(dirty)[0]
+        clean_rows = np.nonzero(~dirty)[0]
+
+        if len(dirty_rows):
+            idx[dirty_rows], scores[dirty_rows] = _search_rows(
+                vectors, dirty_rows, k, block_size
+            )
+        if len(moved) and len(clean_rows):
+            # clean rows never point at a moved vector, so no duplicates
+            cand = vectors[moved]
+            for start in range(0, len(clean_rows), block_size):
+                rows = clean_rows[start : start + block_size]
+                extra = vectors[rows] @ cand.T
+                extra_idx = np.broadcast_to(moved, extra.shape)
+                merged_s = np.concatenate([scores[rows], extra], axis=1)
+                merged_i = np.concatenate([idx[rows], extra_idx], axis=1)
+                merged_s[merged_i == rows[:, None]] = -np.inf
+                top = np.argsort(-merged_s, axis=1, kind="stable")[:, :k]
+                idx[rows] = np.take_along_axis(merged_i, top, axis=1)
+                scores[rows] = np.take_along_axis(merged_s, top, axis=1)
+
+        graph = NeighborGraph._from_dense(new_ids, idx, scores, k, store.version)
+        graph.fingerprints = prints
+        logger.info(
+            "Refreshed neighbour graph: %d of %d rows searched again",
+            len(dirty_rows),
+            n,
+        )
+        return graph
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as fh:
+            np.savez(
+                fh,
+                ids=self.ids,
+                indptr=self.indptr,
+                indices=self.indices,
+                scores=self.scores,
+                fingerprints=self.fingerprints,
+                k=np.int64(self.k),
+                version=np.str_(self.version),
+            )
+
+    @classmethod
+    def load(
+        cls, path: Path, store: FaissStore | None = None
+    ) -> "NeighborGraph | None":
+        """Load ``path``; with ``store``, return ``None`` if it is out of date."""
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            graph = cls(
+                data["ids"],
+                data["indptr"],
+                data["indices"],
+                data["scores"],
+                int(data["k"]),
+                version=str(data["version"]),
+                fingerprints=data["fingerprints"],
+            )
+        if store is not None and graph.version != getattr(
+            store, "version", graph.version
+        ):
+            logger.warning(
+                "Ignoring stale neighbour graph %s; run `kairos embed neighbors`",
+                path,
+            )
+            return None
+        return graph
+
+    def row_of(self, external_id: int) -> int | None:
+        if self._rows is None:
+            self._rows = {int(i): row for row, i in enumerate(self.ids)}
+        return self._rows.get(int(external_id))
+
+    def neighbors(
+        self, external_id: int, k: int | None = None
+    ) -> List[Tuple[int, float]]:
+        """Return ``(external_id, score)`` neighbours of ``external_id``."""
+        row = self.row_of(external_id)
+        if row is None:
+            raise KeyError(f"Vector ID not in neighbour graph: {external_id}")
+        start, end = self.indptr[row], self.indptr[row + 1]
+        if k is not None:
+            end = min(end, start + k)
+        return [
+            (int(self.ids[j]), float(s))
+            for j, s in zip(self.indices[start:end], self.scores[start:end])
+        ]
+
+    def to_affinity(self, ids: Iterable[int] | None = None):
+        """Return a symmetric ``scipy.sparse`` affinity matrix.
+
+        With ``ids`` the matrix is restricted to (and ordered by) those
+        external IDs, e.g. the document order of an embeddings file, so it can
+        be passed to spectral clustering with ``affinity="precomputed"``.
+        """
+        from scipy import sparse
+
+        n = len(self.ids)
+        mat = sparse.csr_matrix(
+            (
+                np.clip(self.scores.astype("float32"), 0, None),
+                self.indices,
+                self.indptr,
+            ),
+            shape=(n, n),
+        )
+        if ids is not None:
+            rows = [self.row_of(i) for i in ids]
+            if any(r is None for r in rows):
+                raise KeyError("Some IDs are not in the neighbour graph")
+            mat = mat[rows][:, rows]
+        return mat.maximum(mat.T).tocsr()
+
+
+__all__ = ["NeighborGraph"]
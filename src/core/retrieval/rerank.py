@@ -0,0 +1,68 @@
+"""Re-ranking helpers applied to over-fetched FAISS candidates."""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def mmr(
+    relevance: np.ndarray,
+    vectors: np.ndarray,
+    k: int,
+    lambda_: float = 0.5,
+) -> np.ndarray:
+    """Select ``k`` candidates by maximal marginal relevance.
+
+    Parameters
+    ----------
+    relevance : np.ndarray
+        ``(n,)`` similarity of each candidate to the query.
+    vectors : np.ndarray
+        ``(n, d)`` candidate embeddings; similarities are cosine.
+    k : int
+        Number of candidates to keep.
+    lambda_ : float
+        Trade-off between relevance (``1.0``) and diversity (``0.0``).
+
+    Returns
+    -------
+    np.ndarray
+        Indices into ``relevance`` in selection order.
+
+    Each selection step pulls one row of the candidate similarity matrix
+    (a single mat-vec against all candidates) and folds it into a running
+    "max similarity to the selected set" vector, so the loop runs ``k`` times
+    over whole arrays rather than over candidate pairs, and only the ``k``
+    rows that are actually needed are ever computed.
+    """
+    relevance = np.asarray(relevance, dtype="float32")
+    n = relevance.shape[0]
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    vecs = np.ascontiguousarray(vectors, dtype="float32")
+    inv_norm = 1.0 / np.maximum(np.sqrt(np.einsum("ij,ij->i", vecs, vecs)), 1e-12)
+
+    def cosine_row(i: int) -> np.ndarray:
+        return (vecs @ vecs[i]) * (inv_norm * inv_norm[i])
+
+    selected = np.empty(k, dtype=np.int64)
+    max_sim = np.full(n, -np.inf, dtype="float32")
+    available = np.ones(n, dtype=bool)
+    first = int(np.argmax(relevance))
+    selected[0] = first
+    available[first] = False
+    np.maximum(max_sim, cosine_row(first), out=max_sim)
+
+    for step in range(1, k):
+        scores = lambda_ * relevance - (1.0 - lambda_) * max_sim
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected[step] = pick
+        available[pick] = False
+        np.maximum(max_sim, cosine_row(pick), out=max_sim)
+    return selected
+
+
+__all__ = ["mmr"]
@@ -7,28 +7,50 @@ import numpy as np
 from core.configuration.config_registry import get_path_config
 from core.embeddings.embedder import MODEL_DIMS, embed_text, get_model_for_dim
 from core.logger import get_logger
+from core.retrieval.cache import ResultCache, get_result_cache, make_cache_key
+from core.retrieval.doc_index import DocumentIndex, Pooling, document_root
+from core.retrieval.neighbors import NeighborGraph
+from core.retrieval.rerank import mmr as mmr_select
 from core.vectorstore.faiss_store import FaissStore
 
 
 class Retriever:
     """Embed queries and return ranked document IDs from the FAISS index.
 
-    Supports multi-query search, ranking across results, and optional
-    cross-document text aggregation.
+    Supports multi-query search, ranking across results, optional
+    maximal-marginal-relevance diversification, and optional
+    cross-document text aggregation. When a :class:`DocumentIndex` has been
+    built next to the FAISS index, aggregate queries route through document
+    centroids first and pool only the chunks of the best documents. Results
+    are memoized in a
+    :class:`ResultCache` tagged with the index content token, so repeated
+    queries are free until the index is rebuilt or upserted.
     """
 
+    cache: ResultCache | None = None
+    doc_index: DocumentIndex | None = None
+    neighbor_graph: NeighborGraph | None = None
+    _root_to_ids: dict[str, List[int]]
+    _root_to_ids_src: dict | None = None
+
     def __init__(
         self,
         store: FaissStore | None = None,
         model: str | None = None,
         chunk_dir: Path | None = None,
+        cache: ResultCache | None = None,
     ):
         self.logger = get_logger(__name__)
+        self.cache = cache if cache is not None else get_result_cache()
         paths = get_path_config()
         default_model = model or "text-embedding-3-small"
         dim = MODEL_DIMS.get(default_model, 1536)
         self.store = store or FaissStore(dim=dim, path=paths.vector / "mosaic.index")
         self.dim = self.store.index.d
+        self.doc_index = DocumentIndex.load(paths.vector / "doc_index.npz", self.store)
+        self.neighbor_graph = NeighborGraph.load(
+            paths.vector / "neighbors.npz", self.store
+        )
         id_map_path = paths.vector / "id_map.json"
         if id_map_path.exists():
             self.id_map = {
@@ -36,6 +58,8 @@ class Retriever:
             }
         else:
             self.id_map = {}
+        self._root_to_ids = {}
+        self._root_to_ids_src = None
         self.chunk_dir = chunk_dir or (
             paths.vector / "chunks" if (paths.vector / "chunks").exists() else None
         )
@@ -48,9 +72,24 @@ class Retriever:
         else:
             self.model = default_model
 
-    def query(self, text: str, k: int = 5, return_text: bool = False):
+    def query(
+        self,
+        text: str,
+        k: int = 5,
+        return_text: bool = False,
+        mmr: bool = False,
+        mmr_lambda: float = 0.5,
+        fetch_k: int | None = None,
+    ):
         """Return top ``k`` results for a single query string."""
-        return self.query_multi([text], k=k, return_text=return_text)
+        return self.query_multi(
+            [text],
+            k=k,
+            return_text=return_text,
+            mmr=mmr,
+            mmr_lambda=mmr_lambda,
+            fetch_k=fetch_k,
+        )
 
     def query_file(self, file: str | Path, k: int = 5, return_text: bool = False):
         """Return top ``k`` results using the contents of ``file`` as the query."""
@@ -63,6 +102,10 @@ class Retriever:
         k: int = 5,
         return_text: bool = False,
         aggregate: bool = False,
+        mmr: bool = False,
+        mmr_lambda: float = 0.5,
+        fetch_k: int | None = None,
+        pooling: Pooling = "mean",
     ) -> List[Tuple[str, float] | Tuple[str, float, str]]:
         """Return ranked results for multiple query strings.
 
@@ -76,15 +119,194 @@ class Retriever:
             Include chunk text when available.
         aggregate : bool, optional
             Combine chunks belonging to the same document.
+        mmr : bool, optional
+            Re-rank ``fetch_k`` candidates with maximal marginal relevance so
+            near-duplicate chunks do not crowd out other documents.
+        mmr_lambda : float, optional
+            MMR relevance/diversity trade-off; ``1.0`` is plain top-k.
+        fetch_k : int, optional
+            Candidates fetched before MMR; defaults to ``4 * k``.
+        pooling : {"max", "mean", "sum"}, optional
+            How chunk scores combine into a document score when
+            ``aggregate`` uses the document index.
+        """
+        texts = list(texts)
+        rerank = (max(fetch_k or 4 * k, k), float(mmr_lambda)) if mmr else None
+        if self.cache is None:
+            return self._query_multi(texts, k, return_text, aggregate, rerank, pooling)
+
+        version = self._index_version()
+        key = self.cache_key(texts, k, return_text, aggregate, rerank, pooling)
+        cached = self.cache.get(key, version)
+        if cached is not None:
+            return cached
+        results = self._query_multi(texts, k, return_text, aggregate, rerank, pooling)
+        self.cache.put(key, version, results)
+        return results
+
+    def similar(self, doc_id: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Return the ``k`` documents nearest to an indexed ``doc_id``.
+
+        ``doc_id`` may be a document or one of its ``_chunkNN`` segments; the
+        neighbours of all its chunks are pooled per document (max score) and
+        chunks of ``doc_id``'s own document are left out, so segment-mode
+        indexes do not answer with siblings. Served from the precomputed
+        :class:`NeighborGraph` when it is loaded and yields ``k`` documents;
+        otherwise the stored vectors are searched against the index.
         """
+        root = document_root(doc_id)
+        sources = self._ids_by_root().get(root)
+        if not sources:
+            raise KeyError(f"Unknown document id: {doc_id}")
+        graph = self.neighbor_graph
+        if graph is not None:
+            ranked = self._related_documents(
+                root, [graph.neighbors(idx, graph.k) for idx in sources]
+            )
+            if len(ranked) >= k:
+                return ranked[:k]
+        vectors = self.store.get_vectors(sources)
+        fetch = k + len(sources)
+        while True:
+            ranked = self._related_documents(root, self.search_vectors(vectors, fetch))
+            if len(ranked) >= k or fetch >= len(self.id_map):
+                return ranked[:k]
+            fetch *= 2
+
+    def _related_documents(
+        self, root: str, hits: List[List[Tuple[int, float]]]
+    ) -> List[Tuple[str, float]]:
+        """Best score per document in ``hits``, excluding document ``root``."""
+        best: dict[str, float] = {}
+        for query_hits in hits:
+            for idx, score in query_hits:
+                other = document_root(self.id_map.get(idx, str(idx)))
+                if other != root and score > best.get(other, -np.inf):
+                    best[other] = float(score)
+        return sorted(best.items(), key=lambda x: x[1], reverse=True)
+
+    def cache_key(
+        self,
+        texts: List[str],
+        k: int,
+        return_text: bool,
+        aggregate: bool,
+        rerank: Tuple[int, float] | None = None,
+        pooling: Pooling = "mean",
+    ) -> str:
+        return make_cache_key(
+            str(getattr(self.store, "path", "")),
+            self.model,
+            texts,
+            k,
+            return_text,
+            aggregate,
+            rerank,
+            pooling,
+        )
+
+    def _index_version(self) -> str:
+        return str(getattr(self.store, "version", ""))
+
+    def _ids_by_root(self) -> dict[str, List[int]]:
+        if self._root_to_ids_src is not self.id_map:
+            self._root_to_ids = {}
+            for idx, name in self.id_map.items():
+                self._root_to_ids.setdefault(document_root(name), []).append(idx)
+            self._root_to_ids_src = self.id_map
+        return self._root_to_ids
 
+    def search_vectors(
+        self, vectors: np.ndarray | List, k: int
+    ) -> List[List[Tuple[int, float]]]:
+        """Search the store for every row of ``vectors`` in one batched call."""
+        search_batch = getattr(self.store, "search_batch", None)
+        if search_batch is not None:
+            return search_batch(np.asarray(vectors, dtype="float32"), k)
+        return [
+            self.store.search(np.asarray(vec, dtype="float32"), k) for vec in vectors
+        ]
+
+    def _query_multi(
+        self,
+        texts: List[str],
+        k: int,
+        return_text: bool,
+        aggregate: bool,
+        rerank: Tuple[int, float] | None = None,
+        pooling: Pooling = "mean",
+    ) -> List[Tuple[str, float] | Tuple[str, float, str]]:
         vectors = [
             np.asarray(embed_text(t, model=self.model), dtype="float32") for t in texts
         ]
+        if aggregate and rerank is None and self.doc_index is not None:
+            return self.rank_documents(vectors, k, return_text, pooling)
+        if rerank is None:
+            hits = self.search_vectors(vectors, k)
+        else:
+            fetch_k, mmr_lambda = rerank
+            hits = self.diversify(self.search_vectors(vectors, fetch_k), k, mmr_lambda)
+        return self.rank_hits(hits, k, return_text, aggregate)
+
+    def diversify(
+        self, hits: List[List[Tuple[int, float]]], k: int, mmr_lambda: float = 0.5
+    ) -> List[List[Tuple[int, float]]]:
+        """Collapse per-query hits into one MMR-selected list of ``k`` hits.
+
+        Candidate relevance is the mean score across queries, matching
+        :meth:`rank_hits`; vectors come straight from the store so no
+        re-embedding is needed.
+        """
+        scores: dict[int, List[float]] = {}
+        for query_hits in hits:
+            for idx, score in query_hits:
+                scores.setdefault(int(idx), []).append(score)
+        if not scores:
+            return []
+        ids = list(scores)
+        relevance = np.fromiter(
+            (np.mean(scores[i]) for i in ids), dtype="float32", count=len(ids)
+        )
+        order = mmr_select(relevance, self.store.get_vectors(ids), k, mmr_lambda)
+        return [[(ids[i], float(relevance[i])) for i in order]]
 
+    def rank_documents(
+        self,
+        vectors: np.ndarray | List,
+        k: int,
+        return_text: bool = False,
+        pooling: Pooling = "mean",
+    ) -> List[Tuple[str, float] | Tuple[str, float, str]]:
+        """Rank whole documents through :attr:`doc_index` (see ``aggregate``)."""
+        assert self.doc_index is not None
+        docs = self.doc_index.search(self.store, vectors, k, pooling=pooling)
+        results: List[Tuple[str, float] | Tuple[str, float, str]] = []
+        for code, score in docs:
+            name = self.doc_index.doc_names[code]
+            if return_text and self.chunk_dir is not None:
+                texts_combined = []
+                for chunk_id in self.doc_index.chunk_slice(code):
+                    chunk_name = self.id_map.get(int(chunk_id), str(chunk_id))
+                    chunk_path = self.chunk_dir / f"{chunk_name}.txt"
+                    texts_combined.append(
+                        chunk_path.read_text("utf-8") if chunk_path.exists() else ""
+                    )
+                results.append((name, score, "\n".join(texts_combined)))
+            else:
+                results.append((name, score))
+        return results
+
+    def rank_hits(
+        self,
+        hits: List[List[Tuple[int, float]]],
+        k: int,
+        return_text: bool = False,
+        aggregate: bool = False,
+    ) -> List[Tuple[str, float] | Tuple[str, float, str]]:
+        """Merge per-query ``(id, score)`` hit lists into a ranked result list."""
         score_map: dict[str, List[float]] = {}
-        for vec in vectors:
-            for doc_id, score in self.store.search(vec, k):
+        for query_hits in hits:
+            for doc_id, score in query_hits:
                 name = self.id_map.get(doc_id, str(doc_id))
                 score_map.setdefault(name, []).append(score)
 
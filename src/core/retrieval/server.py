@@ -0,0 +1,247 @@
+"""Long-lived retrieval service with request micro-batching.
+
+Keeps a warm :class:`Retriever` in memory and coalesces concurrent queries
+that arrive within ``max_wait_ms`` of each other into one embedding call and
+one batched FAISS search. ``create_app`` wires the batcher into FastAPI; the
+batcher itself only needs ``asyncio`` so it can be driven directly (see
+``tools/retrieval_loadgen.py``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable, List, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from core.embeddings.embedder import embed_text_batch
+from core.logger import get_logger
+from core.retrieval.retriever import Retriever
+
+logger = get_logger(__name__)
+
+BatchEmbedder = Callable[[Sequence[str]], List[List[float]]]
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    k: int
+    return_text: bool
+    aggregate: bool
+    future: asyncio.Future = field(repr=False)
+
+
+class SearchRequest(BaseModel):
+    query: str
+    k: int = 5
+    return_text: bool = False
+    aggregate: bool = False
+
+
+class SearchBatchRequest(BaseModel):
+    queries: List[str]
+    k: int = 5
+    return_text: bool = False
+    aggregate: bool = False
+
+
+class MicroBatcher:
+    """Coalesce concurrent retrieval requests into batched embed + search calls.
+
+    Parameters
+    ----------
+    retriever : Retriever
+        Warm retriever whose store, id map and cache are shared by all requests.
+    embed_batch : callable, optional
+        ``texts -> vectors``; defaults to :func:`embed_text_batch` with the
+        retriever's model.
+    max_wait_ms : float
+        How long the first request of a batch waits for company.
+    max_batch : int
+        Upper bound on requests per batch.
+    """
+
+    def __init__(
+        self,
+        retriever: Retriever,
+        embed_batch: BatchEmbedder | None = None,
+        max_wait_ms: float = 5.0,
+        max_batch: int = 64,
+    ):
+        self.retriever = retriever
+        self.embed_batch = embed_batch or (
+            lambda texts: embed_text_batch(texts, model=retriever.model)
+        )
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.requests = 0
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        return_text: bool = False,
+        aggregate: bool = False,
+    ) -> list:
+        """Queue a multi-query request and wait for its ranked results."""
+        texts = list(texts)
+        cache = self.retriever.cache
+        if cache is not None:
+            key = self.retriever.cache_key(texts, k, return_text, aggregate)
+            cached = cache.get(key, self.retriever._index_version())
+            if cached is not None:
+                return cached
+
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        assert self._queue is not None
+        await self._queue.put(_Request(texts, k, return_text, aggregate, future))
+        return await future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            try:
+                results = await loop.run_in_executor(None, self._process, batch)
+            except Exception as exc:  # pragma: no cover - surfaced to callers
+                logger.exception("Batched retrieval failed")
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(exc)
+                continue
+            for req, result in zip(batch, results):
+                if not req.future.done():
+                    req.future.set_result(result)
+
+    def _process(self, batch: List[_Request]) -> List[list]:
+        """Embed every distinct text once and search all vectors together."""
+        version = self.retriever._index_version()
+        unique = list(dict.fromkeys(t for req in batch for t in req.texts))
+        vectors = np.asarray(self.embed_batch(unique), dtype="float32")
+        max_k = max(req.k for req in batch)
+        hits = self.retriever.search_vectors(vectors, max_k)
+        hits_by_text = dict(zip(unique, hits))
+
+        self.batches += 1
+        self.requests += len(batch)
+        results = []
+        cache = self.retriever.cache
+        vectors_by_text = dict(zip(unique, vectors))
+        for req in batch:
+            if req.aggregate and self.retriever.doc_index is not None:
+                ranked = self.retriever.rank_documents(
+                    [vectors_by_text[t] for t in req.texts], req.k, req.return_text
+                )
+            else:
+                per_query = [hits_by_text[t][: req.k] for t in req.texts]
+                ranked = self.retriever.rank_hits(
+                    per_query, req.k, req.return_text, req.aggregate
+                )
+            if cache is not None:
+                key = self.retriever.cache_key(
+                    req.texts, req.k, req.return_text, req.aggregate
+                )
+                cache.put(key, version, ranked)
+            results.append(ranked)
+        return results
+
+
+def create_app(
+    retriever: Retriever | None = None,
+    embed_batch: BatchEmbedder | None = None,
+    max_wait_ms: float = 5.0,
+    max_batch: int = 64,
+):
+    """Build the FastAPI application exposing ``/search``, ``/search_batch``
+    and ``/similar``."""
+    from fastapi import FastAPI, HTTPException
+
+    retriever = retriever or Retriever()
+    batcher = MicroBatcher(
+        retriever, embed_batch=embed_batch, max_wait_ms=max_wait_ms, max_batch=max_batch
+    )
+
+    @asynccontextmanager
+    async def lifespan(_app):
+        yield
+        await batcher.stop()
+
+    app = FastAPI(title="Kairos retrieval", lifespan=lifespan)
+    app.state.batcher = batcher
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {
+            "model": retriever.model,
+            "index_version": retriever._index_version(),
+            "vectors": int(getattr(retriever.store.index, "ntotal", 0)),
+            "batches": batcher.batches,
+            "requests": batcher.requests,
+        }
+
+    @app.post("/search")
+    async def search(req: SearchRequest) -> dict:
+        start = time.perf_counter()
+        results = await batcher.submit(
+            [req.query], req.k, req.return_text, req.aggregate
+        )
+        return {"results": results, "ms": (time.perf_counter() - start) * 1000}
+
+    @app.post("/search_batch")
+    async def search_batch(req: SearchBatchRequest) -> dict:
+        """Rank each query independently; all of them share one batch."""
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                batcher.submit([q], req.k, req.return_text, req.aggregate)
+                for q in req.queries
+            )
+        )
+        return {"results": results, "ms": (time.perf_counter() - start) * 1000}
+
+    @app.get("/similar/{doc_id}")
+    async def similar(doc_id: str, k: int = 5) -> dict:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(None, retriever.similar, doc_id, k)
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return {"results": results}
+
+    return app
+
+
+__all__ = ["MicroBatcher", "create_app"]
@@ -0,0 +1,163 @@
+"""Parallel front end for :func:`prepare_document_for_processing`.
+
+PDF/DOCX extraction is CPU-bound, so directories are fanned out over a
+process pool. Tasks are submitted in chunks to keep IPC overhead low, results
+can be collected in input order or as they finish, and a failing file only
+produces a failed :class:`IngestResult` instead of aborting the batch.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from core.configuration.config_registry import get_path_config
+from core.configuration.path_config import PathConfig
+from core.logger import get_logger
+from core.storage.upload_local import prepare_document_for_processing
+
+logger = get_logger(__name__)
+
+PROGRESS_INTERVAL_S = 5.0
+
+
+@dataclass
+class IngestResult:
+    path: Path
+    stub: dict | None = None
+    error: str | None = None
+    size: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _ingest_one(task: tuple[Path, PathConfig, bool]) -> IngestResult:
+    file_path, paths, force = task
+    start = time.perf_counter()
+    try:
+        size = file_path.stat().st_size
+        stub = prepare_document_for_processing(file_path, paths=paths, force=force)
+        return IngestResult(file_path, stub, None, size, time.perf_counter() - start)
+    except Exception as exc:
+        return IngestResult(file_path, None, str(exc), 0, time.perf_counter() - start)
+
+
+def resolve_workers(workers: int | None) -> int:
+    """``0``/``None`` means one worker per CPU core."""
+    if not workers or workers < 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class _Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def update(self, result: IngestResult) -> None:
+        self.done += 1
+        self.bytes += result.size
+        if not result.ok:
+            self.failed += 1
+            logger.error("Failed on %s: %s", result.path.name, result.error)
+        now = time.perf_counter()
+        if now - self._last >= PROGRESS_INTERVAL_S or self.done == self.total:
+            self._last = now
+            self.report(now)
+
+    def report(self, now: float | None = None) -> None:
+        elapsed = max((now or time.perf_counter()) - self.start, 1e-9)
+        logger.info(
+            "Ingested %d/%d files (%d failed) — %.1f files/s, %.2f MB/s",
+            self.done,
+            self.total,
+            self.failed,
+            self.done / elapsed,
+            self.bytes / elapsed / 1_000_000,
+        )
+
+
+def ingest_files(
+    files: Iterable[Path],
+    paths: PathConfig | None = None,
+    workers: int | None = 1,
+    chunksize: int | None = None,
+    ordered: bool = True,
+    force: bool = False,
+) -> Iterator[IngestResult]:
+    """Parse ``files`` with ``workers`` processes, yielding one result per file.
+
+    Parameters
+    ----------
+    files : Iterable[Path]
+        Raw documents to copy, extract and stub.
+    paths : PathConfig, optional
+        Directory layout shared by all workers.
+    workers : int, optional
+        Process count; ``1`` runs in-process, ``0`` uses every core.
+    chunksize : int, optional
+        Files handed to a worker per task; defaults to spreading the input
+        over roughly eight chunks per worker.
+    ordered : bool
+        Yield results in input order instead of completion order.
+    force : bool
+        Re-extract files whose stub says they are unchanged.
+    """
+    paths = paths or get_path_config()
+    tasks: List[tuple[Path, PathConfig, bool]] = [
+        (Path(f), paths, force) for f in files
+    ]
+    workers = min(resolve_workers(workers), max(len(tasks), 1))
+    progress = _Progress(len(tasks))
+
+    if workers == 1:
+        for task in tasks:
+            result = _ingest_one(task)
+            progress.update(result)
+            yield result
+        return
+
+    chunksize = chunksize or max(1, min(64, len(tasks) // (workers * 8)))
+    logger.info(
+        "Ingesting %d files with %d workers (chunksize %d)",
+        len(tasks),
+        workers,
+        chunksize,
+    )
+    # spawn, not fork: the parent may already run FAISS/OpenMP threads
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=workers) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        for result in mapper(_ingest_one, tasks, chunksize=chunksize):
+            progress.update(result)
+            yield result
+
+
+def ingest_directory(
+    directory: Path,
+    paths: PathConfig | None = None,
+    workers: int | None = 1,
+    recursive: bool = False,
+    ordered: bool = True,
+    force: bool = False,
+) -> List[IngestResult]:
+    """Ingest every file in ``directory`` and return the collected results."""
+    pattern = directory.rglob("*") if recursive else directory.glob("*")
+    files = sorted((p for p in pattern if p.is_file()), key=str)
+    return list(
+        ingest_files(files, paths=paths, workers=workers, ordered=ordered, force=force)
+    )
+
+
+__all__ = ["IngestResult", "ingest_directory", "ingest_files", "resolve_workers"]
@@ -1,26 +1,94 @@
+import hashlib
 import json
+import shutil
 from pathlib import Path
 
 from core.configuration.config_registry import get_path_config
 from core.configuration.path_config import PathConfig
 from core.logger import get_logger
-from core.parsing.extract_text import extract_text
+from core.parsing.extract_text import EXTRACTOR_VERSION, extract_text
+from core.parsing.pdf_stream import stream_pdf_to_file
 
 logger = get_logger(__name__)
 
+HASH_BLOCK_SIZE = 1 << 20
+FICLONE = 0x40049409  # Linux ioctl: share extents with the source (reflink)
+
+
+def hash_file(path: Path) -> str:
+    """Return the blake2b digest of ``path`` read in 1 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as fh:
+        while block := fh.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - non-POSIX platforms
+        return False
+    try:
+        with src.open("rb") as fin, dest.open("wb") as fout:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+        return True
+    except OSError:
+        dest.unlink(missing_ok=True)
+        return False
+
+
+def link_or_copy(src: Path, dest: Path) -> str:
+    """Materialise ``src`` at ``dest`` as cheaply as the filesystem allows.
+
+    Tries a reflink, then falls back to ``shutil.copyfile`` (which uses
+    ``sendfile`` on Linux). Both give ``dest`` its own inode, so editing the
+    source in place never rewrites the archived copy behind the stub's back.
+    Hardlinks are not used for that reason; a ``dest`` hardlinked by an
+    older run is replaced by a private copy. Returns the method used.
+    """
+    if dest.exists():
+        if dest.resolve() == src.resolve():
+            return "existing"
+        dest.unlink()
+    if _reflink(src, dest):
+        return "reflink"
+    shutil.copyfile(src, dest)
+    return "copy"
+
+
+def _read_stub(stub_file: Path) -> dict:
+    try:
+        return json.loads(stub_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
 
 def prepare_document_for_processing(
     file_path: Path,
     parsed_name: str | None = None,
     paths: PathConfig | None = None,
+    force: bool = False,
+    page_workers: int | None = None,
 ) -> dict:
     """
     Convert a raw document into parsed text and save a stub locally.
 
+    The stub's ``ingest`` block records the source size, ``mtime_ns``,
+    content hash and extractor version. When size and mtime still match (or,
+    failing that, the content hash does) and the outputs exist, the copy and
+    extraction are skipped and the existing stub is returned.
+
+    PDFs are streamed page by page into the parsed file (long ones across
+    ``page_workers`` processes) and the stub records ``page_offsets``, the
+    character offset where each page starts.
+
     Args:
         file_path (Path): Full path to the raw file
         parsed_name (str | None): Optional override for parsed .txt filename
         paths (PathConfig | None): Directory configuration override
+        force (bool): Re-extract even if the stub says nothing changed
+        page_workers (int | None): Processes for large PDFs (default: CPU count)
 
     Returns:
         dict: Stub metadata linking source and parsed files
@@ -36,32 +104,66 @@ def prepare_document_for_processing(
         parsed_name
         or file_path.stem.replace(" ", "_").replace("-", "_").lower() + ".txt"
     )
-
-    # Copy raw file
     dest_raw = paths.raw / original_name
-    dest_raw.write_bytes(file_path.read_bytes())
+    dest_parsed = paths.parsed / parsed_name
+    stub_file = paths.metadata / f"{parsed_name}.stub.json"
+
+    st = file_path.stat()
+    previous = {} if force else _read_stub(stub_file)
+    cached = previous.get("ingest") or {}
+    outputs_exist = dest_raw.exists() and dest_parsed.exists()
+    if (
+        outputs_exist
+        and cached.get("extractor_version") == EXTRACTOR_VERSION
+        and cached.get("size") == st.st_size
+    ):
+        if cached.get("mtime_ns") == st.st_mtime_ns:
+            logger.debug("Unchanged, skipping: %s", original_name)
+            return previous
+        content_hash = hash_file(file_path)
+        if cached.get("content_hash") == content_hash:
+            cached["mtime_ns"] = st.st_mtime_ns
+            stub_file.write_text(json.dumps(previous, indent=2), encoding="utf-8")
+            logger.debug("Touched but unchanged, skipping: %s", original_name)
+            return previous
+    else:
+        content_hash = hash_file(file_path)
+
+    # Link (or copy) raw file
+    method = link_or_copy(file_path, dest_raw)
 
     # Extract text and save parsed file
+    page_offsets = None
     try:
-        text = extract_text(str(file_path))
+        if file_path.suffix.lower() == ".pdf":
+            page_offsets = stream_pdf_to_file(
+                file_path, dest_parsed, workers=page_workers
+            )
+        else:
+            text = extract_text(str(file_path))
+            dest_parsed.write_text(text, encoding="utf-8")
     except Exception as e:
         raise ValueError(f"Failed to extract text from {original_name}: {e}")
 
-    dest_parsed = paths.parsed / parsed_name
-    dest_parsed.write_text(text, encoding="utf-8")
-
     # Write stub
     stub = {
         "source_file": str(dest_raw),
         "parsed_file": str(dest_parsed),
         "source_ext": file_path.suffix.lower().lstrip("."),
+        "ingest": {
+            "content_hash": content_hash,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "extractor_version": EXTRACTOR_VERSION,
+        },
     }
+    if page_offsets is not None:
+        stub["page_offsets"] = page_offsets
 
-    stub_file = paths.metadata / f"{parsed_name}.stub.json"
     stub_file.write_text(json.dumps(stub, indent=2), encoding="utf-8")
 
     logger.info("Saved stub locally: %s", stub_file)
-    logger.info("Uploaded parsed version to: %s", dest_parsed)
+    logger.info("Uploaded parsed version to: %s (raw via %s)", dest_parsed, method)
 
     return stub
 
@@ -1,42 +1,294 @@
-import json
+"""Monthly API budget shared by threads and processes.
+
+Callers *reserve* an estimated cost before a request and *settle* the
+reservation with the cost computed from the response's ``usage`` afterwards;
+the unused part of the estimate goes back to the budget, and a request that
+fails releases its reservation entirely. ``check(cost)`` reserves and settles
+in one step, and ``charge(cost)`` records spend that was never reserved
+(batch jobs, whose usage is only known when their results are collected).
+
+Accounting happens in memory under one short lock. With a ledger file, each
+process also leases budget from a shared SQLite ledger (WAL mode) in chunks
+of ``lease_usd``. Reservations draw on the local lease, and the ledger is only
+written when a lease runs out or every ``flush_interval`` seconds, so
+hundreds of requests per second cost a handful of transactions. The leases
+and settled spend of all processes never add up to more than ``max_usd``;
+the unused lease of a process that has not written for ``lease_ttl`` seconds
+(e.g. one that crashed) is reclaimed by the others.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
 import os
+import socket
+import sqlite3
+import threading
 import time
+import uuid
 from pathlib import Path
+from typing import Iterator, Optional
+
+LEASE_USD = 0.5
+LEASE_TTL = 300.0
+FLUSH_INTERVAL = 2.0
+
+
+class Reservation:
+    """Budget held for one request until it is settled or released.
+
+    As a context manager an exception releases the reservation, and leaving
+    the block without calling :meth:`settle` charges the full estimate.
+    """
+
+    def __init__(self, tracker: "BudgetTracker", amount: float):
+        self.tracker = tracker
+        self.amount = amount
+        self.open = True
+
+    def settle(self, cost: float) -> None:
+        """Charge the actual ``cost`` and give back the rest of the estimate."""
+        self.tracker._close(self, cost)
+
+    def release(self) -> None:
+        """Give back the whole reservation (the request was not billed)."""
+        self.tracker._close(self, 0.0)
+
+    def __enter__(self) -> "Reservation":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            self.release()
+        else:
+            self.settle(self.amount)
+        return False
 
 
 class BudgetTracker:
-    """Track and limit API spending across operations."""
+    """Track and limit API spending across operations.
+
+    Parameters
+    ----------
+    max_usd : float
+        Monthly budget ceiling.
+    ledger_path : Path, optional
+        SQLite ledger shared by every process that points at the same file.
+        Without it spending is tracked for this process only.
+    lease_usd : float
+        Budget taken from the ledger per transaction.
+    flush_interval : float
+        Seconds between ledger writes of settled spend.
+    lease_ttl : float
+        Seconds without a ledger write after which other processes may
+        reclaim this process's unused lease.
+    """
 
-    def __init__(self, max_usd: float, log_path: Path | None = None):
+    def __init__(
+        self,
+        max_usd: float,
+        ledger_path: Path | None = None,
+        *,
+        lease_usd: float = LEASE_USD,
+        flush_interval: float = FLUSH_INTERVAL,
+        lease_ttl: float = LEASE_TTL,
+    ):
         self.max_usd = max_usd
-        self.log_path = log_path
-        self.spent = 0.0
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self.lease_usd = lease_usd
+        self.flush_interval = flush_interval
+        self.lease_ttl = lease_ttl
         self.month = time.strftime("%Y-%m")
+        self.ledger_writes = 0
+        self._lock = threading.RLock()
+        self._spent = 0.0
+        self._reserved = 0.0
+        self._held = max_usd
+        self._pid = 0
+        self._db: sqlite3.Connection | None = None
+        if self.ledger_path:
+            self._connect()
+
+    @property
+    def spent(self) -> float:
+        """Spend settled by this process in the current month."""
+        with self._lock:
+            return self._spent
+
+    def reserve(self, cost: float) -> Optional[Reservation]:
+        """Hold ``cost`` for one request, or return ``None`` if it does not fit."""
+        with self._lock:
+            self._roll_month()
+            self._maybe_flush()
+            needed = self._spent + self._reserved + cost
+            if needed > self._held and not self._lease(cost):
+                return None
+            self._reserved += cost
+            return Reservation(self, cost)
 
     def check(self, cost: float) -> bool:
-        now = time.strftime("%Y-%m")
-        if now != self.month:
-            self.reset(now)
-        if self.spent + cost > self.max_usd:
+        """Charge ``cost`` if it fits the budget; safe to call from many threads."""
+        reservation = self.reserve(cost)
+        if reservation is None:
             return False
-        self.spent += cost
-        self._persist()
+        reservation.settle(cost)
         return True
 
+    def charge(self, cost: float) -> None:
+        """Record ``cost`` that was billed without a reservation.
+
+        Used for spend that is only known after the fact, such as a batch job
+        settled from its results' ``usage``; it is charged even if it takes
+        the month past ``max_usd``, since the money is already spent.
+        """
+        with self._lock:
+            self._roll_month()
+            self._spent += cost
+            self._maybe_flush()
+
+    def total_spent(self) -> float:
+        """Settled spend this month across every process sharing the ledger."""
+        with self._lock:
+            if self._db is None:
+                return self._spent
+            self._flush()
+            return self._db.execute(
+                "SELECT COALESCE(SUM(spent), 0) FROM ledger WHERE month = ?",
+                (self.month,),
+            ).fetchone()[0]
+
     def reset(self, month: str | None = None) -> None:
-        self.month = month or time.strftime("%Y-%m")
-        self.spent = 0.0
-        self._persist()
+        """Start this process's accounting over for ``month`` (default: now)."""
+        with self._lock:
+            self.month = month or time.strftime("%Y-%m")
+            self._spent = 0.0
+            if self._db is None:
+                return
+            self._held = 0.0
+            with self._transaction() as db:
+                db.execute(
+                    "DELETE FROM ledger WHERE owner = ? AND month = ?",
+                    (self._owner, self.month),
+                )
 
-    def _persist(self) -> None:
-        if not self.log_path:
+    def close(self) -> None:
+        """Write settled spend and return the unused lease to the ledger."""
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._flush(release=True)
+
+    def _close(self, reservation: Reservation, cost: float) -> None:
+        with self._lock:
+            if not reservation.open:
+                return
+            reservation.open = False
+            self._reserved -= reservation.amount
+            self._spent += cost
+            self._maybe_flush()
+
+    def _roll_month(self) -> None:
+        now = time.strftime("%Y-%m")
+        if now == self.month:
             return
-        self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.log_path, "w", encoding="utf-8") as f:
-            json.dump({"month": self.month, "spent": self.spent}, f)
+        if self._db is not None:
+            self._flush(release=True)
+        self.month = now
+        self._spent = 0.0
+        self._held = 0.0 if self._db is not None else self.max_usd
+
+    # -- ledger ------------------------------------------------------------
+
+    def _connect(self) -> None:
+        # Also called in a forked child, which must not reuse the parent's
+        # connection, owner id or lease.
+        self._pid = os.getpid()
+        self._owner = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}"
+        self._spent = self._reserved = self._held = 0.0
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            str(self.ledger_path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ledger ("
+            "owner TEXT, month TEXT, held REAL, spent REAL, updated REAL, "
+            "PRIMARY KEY (owner, month))"
+        )
+        self._flushed = time.monotonic()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        if self._pid != os.getpid():
+            self._connect()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        self.ledger_writes += 1
+        self._flushed = time.monotonic()
+
+    def _write_row(self, db: sqlite3.Connection) -> None:
+        db.execute(
+            "INSERT INTO ledger VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (owner, month) DO UPDATE SET held = excluded.held, "
+            "spent = excluded.spent, updated = excluded.updated",
+            (self._owner, self.month, self._held, self._spent, time.time()),
+        )
+
+    def _maybe_flush(self) -> None:
+        if (
+            self._db is not None
+            and time.monotonic() - self._flushed >= self.flush_interval
+        ):
+            self._flush()
+
+    def _flush(self, release: bool = False) -> None:
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT held FROM ledger WHERE owner = ? AND month = ?",
+                (self._owner, self.month),
+            ).fetchone()
+            if row is not None and row[0] < self._held:
+                # Reclaimed by another process while this one was quiet.
+                self._held = row[0]
+            if release:
+                self._held = self._spent
+            self._write_row(db)
+
+    def _lease(self, cost: float) -> bool:
+        """Grow this process's lease to fit ``cost``: one ledger transaction."""
+        if self._db is None:
+            return False
+        need = self._spent + self._reserved + cost - self._held
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE ledger SET held = spent "
+                "WHERE month = ? AND owner != ? AND updated < ?",
+                (self.month, self._owner, time.time() - self.lease_ttl),
+            )
+            others = db.execute(
+                "SELECT COALESCE(SUM(MAX(held, spent)), 0) FROM ledger "
+                "WHERE month = ? AND owner != ?",
+                (self.month, self._owner),
+            ).fetchone()[0]
+            free = self.max_usd - others - self._held
+            granted = need <= free
+            if granted:
+                self._held += min(free, max(need, self.lease_usd))
+            self._write_row(db)
+        return granted
 
 
 _instance: "BudgetTracker | None" = None
+_instance_lock = threading.Lock()
 
 
 def get_budget_tracker() -> "BudgetTracker | None":
@@ -44,14 +296,22 @@ def get_budget_tracker() -> "BudgetTracker | None":
 
     Environment variables:
     - ``OPENAI_BUDGET_USD``: monthly budget limit in dollars.
-    - ``OPENAI_BUDGET_LOG``: optional path to persist spend log.
+    - ``OPENAI_BUDGET_LEDGER``: SQLite ledger shared by all processes
+      (default ``budget_ledger.sqlite``; ``off`` tracks this process only).
+    - ``OPENAI_BUDGET_LEASE_USD``: budget leased from the ledger at a time.
     """
     global _instance
-    if _instance is None:
-        budget = os.getenv("OPENAI_BUDGET_USD")
-        if budget:
-            log_path = Path(os.getenv("OPENAI_BUDGET_LOG", "budget_log.json"))
-            _instance = BudgetTracker(float(budget), log_path=log_path)
-        else:
-            _instance = None
+    with _instance_lock:
+        if _instance is None:
+            budget = os.getenv("OPENAI_BUDGET_USD")
+            if budget:
+                ledger = os.getenv("OPENAI_BUDGET_LEDGER", "budget_ledger.sqlite")
+                _instance = BudgetTracker(
+                    float(budget),
+                    ledger_path=None if ledger == "off" else Path(ledger),
+                    lease_usd=float(os.getenv("OPENAI_BUDGET_LEASE_USD", LEASE_USD)),
+                )
+                atexit.register(_instance.close)
+            else:
+                _instance = None
     return _instance
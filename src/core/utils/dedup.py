@@ -1,4 +1,17 @@
+import hashlib
+import heapq
+import itertools
+import os
+import tempfile
+import zlib
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 def dedup_lines_in_folder(folder: Path, output_file: Path) -> None:
@@ -18,3 +31,570 @@ def dedup_lines_in_folder(folder: Path, output_file: Path) -> None:
     with output_file.open("w", encoding="utf-8") as out:
         for line in sorted(unique):
             out.write(line + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Streaming line dedup: sorted runs on disk + k-way merge, optional SimHash
+# ---------------------------------------------------------------------------
+
+MAX_LINES_IN_MEMORY = 1_000_000
+MERGE_FAN_IN = 128
+SIMHASH_DISTANCE = 3
+
+_RECORD = np.dtype([("key", "<u8"), ("hash", "<u8"), ("idx", "<u8")])
+_SIMHASH_BATCH_WORDS = 1 << 16
+_SIMHASH_KEY_BITS = 24
+
+
+def _iter_lines(folder: Path) -> Iterator[str]:
+    for txt_file in sorted(folder.glob("*.txt")):
+        with txt_file.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def _write_text_run(lines: Iterable[str], tmp_dir: Path) -> Path:
+    fd, name = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as out:
+        out.writelines(line + "\n" for line in lines)
+    return Path(name)
+
+
+def _read_text_run(path: Path) -> Iterator[str]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            yield line[:-1]
+
+
+def _unique_sorted(lines: Iterable[str]) -> Iterator[str]:
+    previous = None
+    for line in lines:
+        if line != previous:
+            yield line
+            previous = line
+
+
+def _merge_text_runs(runs: List[Path], tmp_dir: Path) -> Iterator[str]:
+    """k-way merge of sorted runs, in passes of at most ``MERGE_FAN_IN`` files."""
+    while len(runs) > MERGE_FAN_IN:
+        group, runs = runs[:MERGE_FAN_IN], runs[MERGE_FAN_IN:]
+        runs.append(
+            _write_text_run(
+                _unique_sorted(heapq.merge(*map(_read_text_run, group))), tmp_dir
+            )
+        )
+        for path in group:
+            path.unlink()
+    yield from _unique_sorted(heapq.merge(*map(_read_text_run, runs)))
+
+
+def _piece_batches(
+    arrays: Sequence[np.ndarray], block: int
+) -> Iterator[Tuple[List[int], List[np.ndarray]]]:
+    """Yield ``(rows, pieces)`` batches of at most ``block`` array elements.
+
+    Arrays longer than ``block`` are split into ``block``-sized pieces that
+    land in different batches; callers fold pieces back per row. Every other
+    row appears in exactly one batch, as a single piece.
+    """
+    rows: List[int] = []
+    pieces: List[np.ndarray] = []
+    total = 0
+    for row, array in enumerate(arrays):
+        for start in range(0, len(array), block):
+            piece = array[start : start + block]
+            if pieces and total + len(piece) > block:
+                yield rows, pieces
+                rows, pieces, total = [], [], 0
+            rows.append(row)
+            pieces.append(piece)
+            total += len(piece)
+    if pieces:
+        yield rows, pieces
+
+
+def _word_hashes(line: str) -> np.ndarray:
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest())
+            for w in line.lower().split() or [""]
+        ),
+        dtype=np.uint64,
+    )
+
+
+def _bit_votes(hashes: np.ndarray) -> np.ndarray:
+    """``(len(hashes), 64)`` matrix of +1/-1 votes, column ``i`` for bit ``i``."""
+    bits = np.unpackbits(
+        hashes.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+    )
+    return bits.astype(np.int32) * 2 - 1
+
+
+def _pack_bits(bits: np.ndarray) -> np.ndarray:
+    return np.packbits(bits, axis=1, bitorder="little").view("<u8").ravel()
+
+
+def simhash_lines(lines: Sequence[str]) -> np.ndarray:
+    """64-bit SimHash per line over its lower-cased words, as ``uint64``.
+
+    Word hashes are blake2b-64. Bit votes are summed per line with
+    ``np.add.reduceat`` over batches of ``_SIMHASH_BATCH_WORDS`` words, so the
+    words x 64 vote matrix never exceeds one batch; lines longer than a batch
+    are accumulated across batches.
+    """
+    hashes = [_word_hashes(line) for line in lines]
+    out = np.empty(len(lines), dtype=np.uint64)
+    partial: Dict[int, np.ndarray] = {}
+    for rows, pieces in _piece_batches(hashes, _SIMHASH_BATCH_WORDS):
+        offsets = np.cumsum([0] + [len(piece) for piece in pieces[:-1]])
+        sums = np.add.reduceat(_bit_votes(np.concatenate(pieces)), offsets, axis=0)
+        whole = []
+        for pos, row in enumerate(rows):
+            if len(hashes[row]) > _SIMHASH_BATCH_WORDS:
+                partial[row] = partial.get(row, 0) + sums[pos]
+            else:
+                whole.append(pos)
+        out[[rows[pos] for pos in whole]] = _pack_bits(sums[whole] > 0)
+    for row, votes in partial.items():
+        out[row] = _pack_bits(votes[None, :] > 0)[0]
+    return out
+
+
+def _write_record_run(records: np.ndarray, tmp_dir: Path) -> Path:
+    fd, name = tempfile.mkstemp(suffix=".bin", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as out:
+        np.sort(records, order=("key", "idx")).tofile(out)
+    return Path(name)
+
+
+def _read_record_run(path: Path, block: int = 65_536) -> Iterator[Tuple[int, ...]]:
+    with path.open("rb") as f:
+        while True:
+            records = np.fromfile(f, dtype=_RECORD, count=block)
+            if not len(records):
+                return
+            yield from records.tolist()
+
+
+def _simhash_tables(distance: int) -> List[List[Tuple[int, int]]]:
+    """Permuted-table layout for SimHash lookups within ``distance`` bits.
+
+    The 64 bits are cut into ``distance + k`` blocks; two hashes within
+    ``distance`` bits differ in at most ``distance`` blocks, so they agree on
+    all of some ``k`` blocks. Each table keys on one ``k``-combination of
+    blocks (as ``(shift, width)`` pairs), with ``k`` the smallest giving keys
+    of at least ``_SIMHASH_KEY_BITS`` bits, so buckets stay small.
+    """
+    k = 1
+    while k < 64 and 64 * k // (distance + k) < _SIMHASH_KEY_BITS:
+        k += 1
+    count = distance + k
+    bounds = [64 * b // count for b in range(count + 1)]
+    blocks = [(lo, hi - lo) for lo, hi in itertools.pairwise(bounds)]
+    return [list(combo) for combo in itertools.combinations(blocks, k)]
+
+
+def _table_keys(hashes: np.ndarray, table: List[Tuple[int, int]]) -> np.ndarray:
+    keys = np.zeros(len(hashes), dtype=np.uint64)
+    for shift, width in table:
+        block = (hashes >> np.uint64(shift)) & np.uint64((1 << width) - 1)
+        keys = (keys << np.uint64(width)) | block
+    return keys
+
+
+def _iter_bits(bitmap: np.ndarray, block: int = 65_536) -> Iterator[bool]:
+    for start in range(0, len(bitmap), block):
+        bits = np.unpackbits(bitmap[start : start + block], bitorder="little")
+        yield from bits.astype(bool).tolist()
+
+
+def _simhash_duplicates(
+    lines_path: Path, distance: int, max_lines: int, tmp_dir: Path
+) -> Tuple[np.ndarray, int]:
+    """Flag lines in ``lines_path`` within ``distance`` bits of an earlier line.
+
+    Returns ``(bitmap, dropped)``: a little-endian bit per line number, held
+    in a memory-mapped file under ``tmp_dir``, and the number of bits set.
+    For each permuted table (see :func:`_simhash_tables`), ``(key, hash,
+    line)`` records are spilled as sorted runs and merged, so only lines
+    sharing a key are compared, with a vectorized popcount against the
+    bucket's kept hashes.
+    """
+    tables = _simhash_tables(distance)
+    runs: List[List[Path]] = [[] for _ in tables]
+    offset = 0
+    reader = _read_text_run(lines_path)
+    while chunk := list(itertools.islice(reader, max_lines)):
+        hashes = simhash_lines(chunk)
+        records = np.empty(len(chunk), dtype=_RECORD)
+        records["hash"] = hashes
+        records["idx"] = np.arange(offset, offset + len(chunk), dtype=np.uint64)
+        for table, table_runs in zip(tables, runs, strict=True):
+            records["key"] = _table_keys(hashes, table)
+            table_runs.append(_write_record_run(records, tmp_dir))
+        offset += len(chunk)
+    if not offset:
+        return np.zeros(0, dtype=np.uint8), 0
+
+    bitmap = np.memmap(
+        tmp_dir / "dropped.bits", dtype=np.uint8, mode="w+", shape=((offset + 7) // 8,)
+    )
+    dropped = 0
+    for table_runs in runs:
+        merged = heapq.merge(
+            *map(_read_record_run, table_runs), key=lambda rec: (rec[0], rec[2])
+        )
+        for _, group in itertools.groupby(merged, key=lambda rec: rec[0]):
+            members = list(group)
+            if len(members) < 2:
+                continue
+            idx = np.array([rec[2] for rec in members], dtype=np.int64)
+            values = np.array([rec[1] for rec in members], dtype=np.uint64)
+            alive = ((bitmap[idx >> 3] >> (idx & 7)) & 1) == 0
+            idx, values = idx[alive], values[alive]
+            kept = values[:1]
+            for i in range(1, len(idx)):
+                if (np.bitwise_count(kept ^ values[i]) <= distance).any():
+                    bitmap[idx[i] >> 3] |= np.uint8(1 << (idx[i] & 7))
+                    dropped += 1
+                else:
+                    kept = np.append(kept, values[i])
+    return bitmap, dropped
+
+
+def dedup_lines_streaming(
+    folder: Path,
+    output_file: Path,
+    *,
+    max_lines: int = MAX_LINES_IN_MEMORY,
+    near_distance: int | None = None,
+    tmp_dir: Path | None = None,
+) -> int:
+    """Bounded-memory :func:`dedup_lines_in_folder`; returns lines written.
+
+    Lines are buffered ``max_lines`` at a time, sorted and spilled to disk as
+    runs, then k-way merged with duplicates dropped, so the output is the
+    same sorted unique list without the corpus ever being held in RAM. With
+    ``near_distance`` a SimHash pass also drops lines whose 64-bit SimHash is
+    within that many bits of an alphabetically earlier line.
+    """
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as scratch:
+        scratch_dir = Path(scratch)
+        runs: List[Path] = []
+        lines = _iter_lines(folder)
+        while chunk := list(itertools.islice(lines, max_lines)):
+            runs.append(_write_text_run(sorted(set(chunk)), scratch_dir))
+        logger.info("Spilled %d sorted runs to %s", len(runs), scratch_dir)
+
+        exact_path = output_file if near_distance is None else scratch_dir / "exact"
+        written = 0
+        with exact_path.open("w", encoding="utf-8") as out:
+            for line in _merge_text_runs(runs, scratch_dir):
+                out.write(line + "\n")
+                written += 1
+        if near_distance is None:
+            return written
+
+        bitmap, dropped = _simhash_duplicates(
+            exact_path, near_distance, max_lines, scratch_dir
+        )
+        logger.info("SimHash dropped %d near-duplicate lines", dropped)
+        with output_file.open("w", encoding="utf-8") as out:
+            for line, drop in zip(_read_text_run(exact_path), _iter_bits(bitmap)):
+                if not drop:
+                    out.write(line + "\n")
+        del bitmap
+        return written - dropped
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate documents: word shingles -> MinHash -> LSH banding
+# ---------------------------------------------------------------------------
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+NUM_BANDS = 16
+NEAR_DUP_THRESHOLD = 0.8
+DEFAULT_SECONDS_PER_DOC = 10.0
+"""Rough wall-clock cost of one ``summarize_text`` call, used when unmeasured."""
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_MINHASH_BLOCK_BYTES = 32 << 20
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """Return the sorted, unique CRC32 hashes of ``text``'s word ``k``-grams.
+
+    Text is lower-cased and whitespace-normalised first, so re-wrapped or
+    re-exported copies shingle identically. CRC32 is stable across processes,
+    which keeps persisted signatures valid between runs.
+    """
+    words = text.lower().split()
+    if len(words) <= k:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i : i + k]) for i in range(len(words) - k + 1)]
+    return np.unique(
+        np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+    )
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def minhash_signatures(
+    shingle_sets: Sequence[np.ndarray], num_perm: int = NUM_PERM, seed: int = 1
+) -> np.ndarray:
+    """MinHash signatures, ``(len(shingle_sets), num_perm)`` ``uint32``.
+
+    Shingles are concatenated and hashed block-wise under every permutation
+    at once; per-document minima are a ``np.minimum.reduceat`` over the piece
+    offsets, so there is no Python loop per shingle. Blocks are sized so the
+    ``num_perm`` x block hash matrix stays within ``_MINHASH_BLOCK_BYTES``.
+    """
+    out = np.full((len(shingle_sets), num_perm), _MAX_HASH, dtype=np.uint32)
+    a, b = _permutations(num_perm, seed)
+    block = max(1, _MINHASH_BLOCK_BYTES // (num_perm * 8))
+    for rows, pieces in _piece_batches(shingle_sets, block):
+        flat = np.concatenate(pieces).astype(np.uint64)
+        hashed = ((a * flat[None, :] + b) % _MERSENNE_PRIME) & _MAX_HASH
+        offsets = np.cumsum([0] + [len(piece) for piece in pieces[:-1]])
+        minima = np.minimum.reduceat(hashed, offsets, axis=1).T.astype(np.uint32)
+        np.minimum.at(out, np.asarray(rows), minima)
+    return out
+
+
+def lsh_candidate_pairs(signatures: np.ndarray, bands: int = NUM_BANDS) -> np.ndarray:
+    """Return ``(m, 2)`` row pairs that share at least one LSH band.
+
+    With ``r = num_perm / bands`` rows per band, a pair with Jaccard ``s``
+    becomes a candidate with probability ``1 - (1 - s**r) ** bands``.
+    """
+    num_perm = signatures.shape[1]
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+    rows = num_perm // bands
+    pairs = []
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows : (band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind="stable")
+        groups = np.split(order, np.cumsum(counts)[:-1])
+        for bucket in np.flatnonzero(counts > 1):
+            members = groups[bucket]
+            i, j = np.triu_indices(len(members), k=1)
+            pairs.append(np.stack([members[i], members[j]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+class NearDuplicateIndex:
+    """Persisted MinHash signatures for a corpus, refreshed incrementally.
+
+    Only new or edited documents (by content digest) are re-shingled on
+    :meth:`update`; everything else reuses the stored signature.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = NUM_PERM,
+        bands: int = NUM_BANDS,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.ids: List[str] = []
+        self.digests: List[str] = []
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def update(self, docs: Mapping[str, str]) -> int:
+        """Sync the index to ``docs`` (id -> text); return signatures computed.
+
+        Documents no longer present in ``docs`` are dropped.
+        """
+        known = {doc_id: pos for pos, doc_id in enumerate(self.ids)}
+        ids = sorted(docs)
+        digests = [
+            hashlib.blake2b(docs[i].encode("utf-8"), digest_size=16).hexdigest()
+            for i in ids
+        ]
+        signatures = np.empty((len(ids), self.num_perm), dtype=np.uint32)
+        stale: List[int] = []
+        for pos, doc_id in enumerate(ids):
+            old = known.get(doc_id)
+            if old is not None and self.digests[old] == digests[pos]:
+                signatures[pos] = self.signatures[old]
+            else:
+                stale.append(pos)
+        if stale:
+            signatures[stale] = minhash_signatures(
+                [shingle_hashes(docs[ids[pos]], self.shingle_size) for pos in stale],
+                self.num_perm,
+                self.seed,
+            )
+        self.ids, self.digests, self.signatures = ids, digests, signatures
+        return len(stale)
+
+    def duplicates(self, threshold: float = NEAR_DUP_THRESHOLD) -> Dict[str, str]:
+        """Map each near-duplicate ID to the canonical ID of its group.
+
+        LSH candidates are kept when their estimated Jaccard similarity (the
+        share of agreeing signature rows) reaches ``threshold``; groups are
+        the connected components and the canonical member is the smallest ID,
+        so it sorts — and is processed — first.
+        """
+        pairs = lsh_candidate_pairs(self.signatures, self.bands)
+        if not len(pairs):
+            return {}
+        agree = np.mean(
+            self.signatures[pairs[:, 0]] == self.signatures[pairs[:, 1]], axis=1
+        )
+        parent = list(range(len(self.ids)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in pairs[agree >= threshold]:
+            ri, rj = find(int(i)), find(int(j))
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+        return {
+            self.ids[i]: self.ids[find(i)] for i in range(len(self.ids)) if find(i) != i
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as fh:
+            np.savez(
+                fh,
+                ids=np.asarray(self.ids, dtype=str),
+                digests=np.asarray(self.digests, dtype=str),
+                signatures=self.signatures,
+                params=np.asarray(
+                    [self.num_perm, self.bands, self.shingle_size, self.seed]
+                ),
+            )
+
+    @classmethod
+    def load(cls, path: Path, **params) -> "NearDuplicateIndex":
+        """Load ``path``, or return an empty index if it is missing or was
+        built with different MinHash parameters."""
+        index = cls(**params)
+        if not path.exists():
+            return index
+        with np.load(path, allow_pickle=False) as data:
+            stored = data["params"].tolist()
+            current = [index.num_perm, index.bands, index.shingle_size, index.seed]
+            if stored != current:
+                logger.info("MinHash parameters changed; rebuilding %s", path)
+                return index
+            index.ids = data["ids"].tolist()
+            index.digests = data["digests"].tolist()
+            index.signatures = data["signatures"]
+        return index
+
+
+def estimate_savings(
+    tokens: Mapping[str, int],
+    duplicates: Iterable[str],
+    model: str = "gpt-4",
+    embed_model: str = "text-embedding-3-large",
+    seconds_per_doc: float = DEFAULT_SECONDS_PER_DOC,
+) -> Dict[str, float]:
+    """Estimate API dollars and seconds avoided by not processing ``duplicates``.
+
+    ``tokens`` maps document names to their approximate token counts (see
+    :func:`find_near_duplicates`); each skipped document saves one summary
+    prompt plus a full completion and one embedding pass.
+    """
+    from core.embeddings.embedder import EMBED_COST_PER_1K
+    from core.llm.invoke import LLM_COMPLETION_COST_PER_1K, LLM_PROMPT_COST_PER_1K
+
+    skipped = [tokens[name] for name in duplicates if name in tokens]
+    total = sum(skipped)
+    usd = (
+        total / 1000 * LLM_PROMPT_COST_PER_1K.get(model, 0)
+        + len(skipped) * 700 / 1000 * LLM_COMPLETION_COST_PER_1K.get(model, 0)
+        + total / 1000 * EMBED_COST_PER_1K.get(embed_model, 0)
+    )
+    return {
+        "documents": len(skipped),
+        "tokens": total,
+        "usd": round(usd, 4),
+        "seconds": round(len(skipped) * seconds_per_doc, 1),
+    }
+
+
+class _FolderTexts(Mapping[str, str]):
+    """Read-on-access view of ``*.txt`` files, noting each file's token count.
+
+    Lets :meth:`NearDuplicateIndex.update` see the folder as a mapping without
+    every parsed text being held in memory at once.
+    """
+
+    def __init__(self, folder: Path):
+        self.paths = {path.name: path for path in sorted(folder.glob("*.txt"))}
+        self.tokens: Dict[str, int] = {}
+
+    def __getitem__(self, name: str) -> str:
+        text = self.paths[name].read_text(encoding="utf-8")
+        self.tokens[name] = round(len(text) / 4)
+        return text
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+def find_near_duplicates(
+    folder: Path,
+    index_path: Path | None = None,
+    threshold: float = NEAR_DUP_THRESHOLD,
+) -> Tuple[Dict[str, str], Dict[str, int]]:
+    """Return ``(duplicates, tokens)`` for the ``*.txt`` files in ``folder``.
+
+    ``duplicates`` maps file names to their canonical file name; ``tokens``
+    maps every file name to its approximate token count (``len(text) / 4``)
+    for :func:`estimate_savings`. Files are read one at a time. When
+    ``index_path`` is given the signatures are loaded from and saved back to
+    it, so unchanged files are not re-shingled on the next run.
+    """
+    texts = _FolderTexts(folder)
+    index = NearDuplicateIndex.load(index_path) if index_path else NearDuplicateIndex()
+    computed = index.update(texts)
+    if index_path:
+        index.save(index_path)
+    duplicates = index.duplicates(threshold)
+    logger.info(
+        "MinHash: %d documents (%d re-hashed), %d near-duplicates",
+        len(index),
+        computed,
+        len(duplicates),
+    )
+    return duplicates, texts.tokens
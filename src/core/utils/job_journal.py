@@ -0,0 +1,295 @@
+"""Durable per-document stage journal for resumable batch runs.
+
+Every batch command (``pipeline run-all``, ``batch classify-all``,
+``batch ingest-all``) opens a *job* in a local SQLite file (WAL mode, safe
+to share between threads and processes). Each document's progress through
+the stages ``parsed``, ``classified`` and ``embedded`` is recorded as
+``running`` / ``done`` / ``failed`` with an attempt count, the last error and
+a fingerprint of the stage input. Re-running with ``--resume`` reopens the
+last unfinished job for the same command and skips exactly the stages that
+already finished for unchanged inputs, so only failures and never-reached
+work are retried.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.configuration.config_registry import get_path_config
+from core.configuration.path_config import PathConfig
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+STAGES = ("parsed", "classified", "embedded")
+JOURNAL_FILENAME = "job_journal.sqlite"
+
+
+def fingerprint(path: Path) -> str:
+    """Cheap change marker for a stage input: size and mtime."""
+    st = Path(path).stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _describe(params: Dict[str, Any], keys: Iterable[str]) -> str:
+    return ", ".join(f"{key}={params.get(key)!r}" for key in keys)
+
+
+class JobJournal:
+    """SQLite-backed record of jobs and per-document stage state."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, command TEXT, params TEXT, "
+            "started REAL, finished REAL);"
+            "CREATE TABLE IF NOT EXISTS stages ("
+            "job INTEGER, doc TEXT, stage TEXT, state TEXT, attempts INTEGER, "
+            "error TEXT, fingerprint TEXT, updated REAL, "
+            "PRIMARY KEY (job, doc, stage));"
+        )
+        self._db.commit()
+
+    def begin(
+        self,
+        command: str,
+        params: Optional[Dict[str, Any]] = None,
+        resume: bool = False,
+    ) -> "Job":
+        """Open a new job, or with ``resume`` the last unfinished one for ``command``.
+
+        A resumed job must have been started with the same ``params`` (pass
+        ``None`` to skip the check); otherwise its finished stages would be
+        reused for a run with different settings, so :class:`ValueError` is
+        raised naming the settings that differ.
+        """
+        encoded = json.dumps(params or {}, default=str, sort_keys=True)
+        with self._lock:
+            if resume:
+                row = self._db.execute(
+                    "SELECT id, params FROM jobs "
+                    "WHERE command = ? AND finished IS NULL "
+                    "ORDER BY id DESC LIMIT 1",
+                    (command,),
+                ).fetchone()
+                if row is not None:
+                    stored = json.loads(row[1] or "{}")
+                    wanted = json.loads(encoded)
+                    if params is not None and stored != wanted:
+                        changed = sorted(
+                            key
+                            for key in stored.keys() | wanted.keys()
+                            if stored.get(key) != wanted.get(key)
+                        )
+                        raise ValueError(
+                            f"Cannot resume {command} job {row[0]}: it was started "
+                            f"with different {', '.join(changed)} "
+                            f"({_describe(stored, changed)}); rerun with the same "
+                            "options or without --resume"
+                        )
+                    logger.info("Resuming %s job %d", command, row[0])
+                    return Job(self, row[0])
+                logger.info("No unfinished %s job to resume; starting fresh", command)
+            cur = self._db.execute(
+                "INSERT INTO jobs (command, params, started) VALUES (?, ?, ?)",
+                (command, encoded, time.time()),
+            )
+            self._db.commit()
+            return Job(self, cur.lastrowid)
+
+    def last_job(self, command: Optional[str] = None) -> Optional["Job"]:
+        with self._lock:
+            if command:
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE command = ? ORDER BY id DESC LIMIT 1",
+                    (command,),
+                ).fetchone()
+            else:
+                row = self._db.execute(
+                    "SELECT id FROM jobs ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+        return Job(self, row[0]) if row else None
+
+    def _execute(self, sql: str, args: tuple = ()) -> List[tuple]:
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+            self._db.commit()
+            return rows
+
+
+class Job:
+    """One batch run inside a :class:`JobJournal`."""
+
+    def __init__(self, journal: JobJournal, job_id: int):
+        self.journal = journal
+        self.id = job_id
+
+    def info(self) -> Dict[str, Any]:
+        command, params, started, finished = self.journal._execute(
+            "SELECT command, params, started, finished FROM jobs WHERE id = ?",
+            (self.id,),
+        )[0]
+        return {
+            "id": self.id,
+            "command": command,
+            "params": json.loads(params),
+            "started": started,
+            "finished": finished,
+        }
+
+    def state(self, doc: str, stage: str) -> Optional[Dict[str, Any]]:
+        rows = self.journal._execute(
+            "SELECT state, attempts, error, fingerprint FROM stages "
+            "WHERE job = ? AND doc = ? AND stage = ?",
+            (self.id, doc, stage),
+        )
+        if not rows:
+            return None
+        state, attempts, error, fp = rows[0]
+        return {"state": state, "attempts": attempts, "error": error, "fingerprint": fp}
+
+    def is_done(self, doc: str, stage: str, fp: Optional[str] = None) -> bool:
+        """Whether ``stage`` finished for ``doc`` (and its input is unchanged)."""
+        record = self.state(doc, stage)
+        if record is None or record["state"] != "done":
+            return False
+        return fp is None or record["fingerprint"] == fp
+
+    def pending(
+        self,
+        docs: Iterable[str],
+        stage: str,
+        fingerprints: Optional[Dict[str, str]] = None,
+    ) -> List[str]:
+        """``docs`` whose ``stage`` is not done yet: failed, interrupted or new."""
+        fingerprints = fingerprints or {}
+        return [d for d in docs if not self.is_done(d, stage, fingerprints.get(d))]
+
+    def mark(
+        self,
+        doc: str,
+        stage: str,
+        state: str,
+        error: Optional[str] = None,
+        fp: Optional[str] = None,
+    ) -> None:
+        """Record ``state``; entering ``running`` counts as a new attempt."""
+        bump = 1 if state == "running" else 0
+        self.journal._execute(
+            "INSERT INTO stages VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (job, doc, stage) DO UPDATE SET state = excluded.state, "
+            "attempts = attempts + ?, error = excluded.error, "
+            "fingerprint = COALESCE(excluded.fingerprint, fingerprint), "
+            "updated = excluded.updated",
+            (self.id, doc, stage, state, bump, error, fp, time.time(), bump),
+        )
+
+    def record_status(
+        self, doc: str, stage: str, status: str, fp: Optional[str] = None
+    ) -> None:
+        """Record a ``classify_many`` status.
+
+        ``"done"`` and ``"skipped"`` mark the stage done; ``"error: ..."``
+        marks it failed with the message as the error.
+        """
+        if status.startswith("error: "):
+            self.mark(doc, stage, "failed", error=status[len("error: ") :])
+        else:
+            self.mark(doc, stage, "done", fp=fp)
+
+    @contextlib.contextmanager
+    def track(self, doc: str, stage: str, fp: Optional[str] = None) -> Iterator[None]:
+        """Mark ``stage`` running, then done, or failed (re-raising) on error."""
+        self.mark(doc, stage, "running", fp=fp)
+        try:
+            yield
+        except BaseException as exc:
+            self.mark(doc, stage, "failed", error=str(exc) or type(exc).__name__)
+            raise
+        self.mark(doc, stage, "done", fp=fp)
+
+    def finish(self) -> None:
+        self.journal._execute(
+            "UPDATE jobs SET finished = ? WHERE id = ?", (time.time(), self.id)
+        )
+
+    def complete(self) -> bool:
+        """Log the stage summary; finish the job unless something failed.
+
+        A job with failures stays open so ``--resume`` retries only those.
+        """
+        self.log_summary()
+        failures = self.failures()
+        if failures:
+            logger.warning(
+                "Job %d left %d failed stages; re-run with --resume to retry them.",
+                self.id,
+                len(failures),
+            )
+            return False
+        self.finish()
+        return True
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """``{stage: {state: count}}`` for this job."""
+        out: Dict[str, Dict[str, int]] = {}
+        for stage, state, count in self.journal._execute(
+            "SELECT stage, state, COUNT(*) FROM stages WHERE job = ? "
+            "GROUP BY stage, state",
+            (self.id,),
+        ):
+            out.setdefault(stage, {})[state] = count
+        return out
+
+    def failures(self) -> List[Dict[str, Any]]:
+        return [
+            {"doc": doc, "stage": stage, "attempts": attempts, "error": error}
+            for doc, stage, attempts, error in self.journal._execute(
+                "SELECT doc, stage, attempts, error FROM stages "
+                "WHERE job = ? AND state != 'done' ORDER BY stage, doc",
+                (self.id,),
+            )
+        ]
+
+    def log_summary(self) -> None:
+        for stage in STAGES:
+            counts = self.summary().get(stage)
+            if counts:
+                logger.info(
+                    "Job %d %s: %s",
+                    self.id,
+                    stage,
+                    ", ".join(f"{n} {state}" for state, n in sorted(counts.items())),
+                )
+
+
+_instances: Dict[Path, JobJournal] = {}
+_instances_lock = threading.Lock()
+
+
+def get_job_journal(paths: PathConfig | None = None) -> JobJournal:
+    """Return the journal for ``paths`` (``JOB_JOURNAL_PATH`` overrides the file).
+
+    Defaults to ``<paths.output>/job_journal.sqlite`` so each corpus keeps its
+    own history.
+    """
+    paths = paths or get_path_config()
+    path = Path(os.getenv("JOB_JOURNAL_PATH") or paths.output / JOURNAL_FILENAME)
+    with _instances_lock:
+        journal = _instances.get(path)
+        if journal is None:
+            journal = _instances[path] = JobJournal(path)
+    return journal
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute``."""
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return how long the caller must wait.
+
+        The balance may go negative; later callers then wait behind this one,
+        which keeps the limiter FIFO-fair without a queue. Requests larger
+        than ``capacity`` are clamped so they can still proceed.
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter."""
+
+    def __init__(self, rpm: float | None = None, tpm: float | None = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request of ``tokens`` tokens fits; return seconds waited."""
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_instance: "RateLimiter | None" = None
+_instance_lock = threading.Lock()
+
+
+def get_rate_limiter() -> "RateLimiter | None":
+    """Return a singleton ``RateLimiter`` from environment variables.
+
+    Environment variables:
+    - ``OPENAI_RPM``: requests per minute across all threads.
+    - ``OPENAI_TPM``: prompt + completion tokens per minute.
+    """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            rpm = os.getenv("OPENAI_RPM")
+            tpm = os.getenv("OPENAI_TPM")
+            if rpm or tpm:
+                _instance = RateLimiter(
+                    float(rpm) if rpm else None, float(tpm) if tpm else None
+                )
+    return _instance
@@ -1,4 +1,5 @@
 import hashlib
+import os
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
@@ -13,7 +14,15 @@ from core.logger import get_logger
 
 
 class FaissStore:
-    """Lightweight wrapper around a FAISS index with ID mapping."""
+    """Lightweight wrapper around a FAISS index with ID mapping.
+
+    ``version`` is a content token, ``"<ntotal>-<digest>"`` over the stored IDs
+    and vectors, so caches keyed on search results can detect stale entries.
+    It is derived from the index itself rather than a counter file, so two
+    processes adding to the same index, or a lost side file, can never make
+    different contents share a token. The digest is computed lazily and
+    reset by :meth:`add`.
+    """
 
     def __init__(self, dim: int, path: Path):
         if faiss is None:  # pragma: no cover - optional dependency
@@ -25,6 +34,10 @@ class FaissStore:
         self.path = path
         self.logger = get_logger(__name__)
         self.index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        self._version: str | None = None
+        self._generation = 0
+        self._positions: dict[int, int] | None = None
+        self._positions_generation = -1
         if path.exists():
             self._load()
             if self.index.d != dim:
@@ -34,6 +47,22 @@ class FaissStore:
                     dim,
                 )
 
+    @property
+    def version(self) -> str:
+        """Content token of the current index (see the class docstring)."""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.ascontiguousarray(self.ids()).data)
+            digest.update(np.ascontiguousarray(self.vectors()).data)
+            self._version = f"{self.index.ntotal}-{digest.hexdigest()}"
+        return self._version
+
+    def bump_version(self) -> str:
+        """Recompute the token after ``index`` was changed outside :meth:`add`."""
+        self._version = None
+        self._generation += 1
+        return self.version
+
     def _hash_id(self, identifier: str) -> int:
         return int.from_bytes(
             hashlib.blake2b(identifier.encode("utf-8"), digest_size=8).digest(),
@@ -45,6 +74,8 @@ class FaissStore:
         hashed = [self._hash_id(i) if isinstance(i, str) else int(i) for i in ids]
         ids_array = np.asarray(hashed, dtype="int64")
         self.index.add_with_ids(vecs, ids_array)
+        self._version = None
+        self._generation += 1
         return hashed
 
     def search(self, vec: np.ndarray, k: int = 5) -> List[Tuple[int, float]]:
@@ -56,9 +87,56 @@ class FaissStore:
             if idx != -1
         ]
 
+    def search_batch(
+        self, vecs: np.ndarray, k: int = 5
+    ) -> List[List[Tuple[int, float]]]:
+        """Search many query vectors with a single FAISS call."""
+        query_vecs = np.asarray(vecs, dtype="float32").reshape(-1, self.index.d)
+        if len(query_vecs) == 0:
+            return []
+        distances, indices = self.index.search(query_vecs, k)
+        return [
+            [
+                (int(idx), float(dist))
+                for idx, dist in zip(row_ids, row_dist)
+                if idx != -1
+            ]
+            for row_ids, row_dist in zip(indices, distances)
+        ]
+
+    def ids(self) -> np.ndarray:
+        """Return external IDs in storage order."""
+        return faiss.vector_to_array(self.index.id_map).astype("int64", copy=False)
+
+    def vectors(self) -> np.ndarray:
+        """Return all stored vectors in storage order (zero-copy for flat indexes)."""
+        inner = faiss.downcast_index(self.index.index)
+        n, d = inner.ntotal, inner.d
+        if n == 0:
+            return np.empty((0, d), dtype="float32")
+        if hasattr(inner, "get_xb"):
+            return faiss.rev_swig_ptr(inner.get_xb(), n * d).reshape(n, d)
+        return inner.reconstruct_n(0, n)
+
+    def positions(self, ids: Iterable[int]) -> np.ndarray:
+        """Map external IDs to storage positions; unknown IDs map to -1."""
+        if self._positions_generation != self._generation or self._positions is None:
+            self._positions = {int(i): pos for pos, i in enumerate(self.ids())}
+            self._positions_generation = self._generation
+        return np.asarray([self._positions.get(int(i), -1) for i in ids], dtype="int64")
+
+    def get_vectors(self, ids: Iterable[int]) -> np.ndarray:
+        """Return the stored vectors for ``ids`` as a ``(len(ids), d)`` matrix."""
+        pos = self.positions(ids)
+        if (pos < 0).any():
+            raise KeyError("Vector IDs not found in index")
+        return np.asarray(self.vectors()[pos], dtype="float32")
+
     def persist(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        faiss.write_index(self.index, str(self.path))
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        faiss.write_index(self.index, str(tmp))
+        os.replace(tmp, self.path)
 
     def _load(self) -> None:
         self.index = faiss.read_index(str(self.path))
@@ -0,0 +1,475 @@
+"""Offline batch-job classification.
+
+Instead of one synchronous completion per chunk, ``prepare_batch`` writes every
+pending ``summarize_text`` prompt to a JSONL request file in the OpenAI Batch
+API format and records the job in a ``manifest.json`` beside it. An executor
+runs the file (``OpenAIBatchExecutor`` at batch pricing, or
+``LocalBatchExecutor`` with a fake model for offline runs and tests), and
+``collect_batch`` ingests the results JSONL: chunk answers are parsed, merged,
+overlaid with stubs and validated/persisted in bulk.
+
+Job directory layout::
+
+    <paths.output>/batches/<job_id>/
+        manifest.json    # state, model, executor batch id, per-document status
+        requests.jsonl   # one chat-completion request per chunk
+        results.jsonl    # executor output, written on collect
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Protocol
+
+from core.configuration.config_registry import get_path_config
+from core.configuration.path_config import PathConfig
+from core.constants import ERROR_BUDGET_EXCEEDED, ERROR_OPENAI_RESPONSE_NOT_JSON
+from core.llm.clients import get_openai_client
+from core.llm.invoke import DEFAULT_MAX_TOKENS, build_summary_prompt, completion_cost
+from core.logger import get_logger
+from core.metadata.merge import merge_metadata_blocks
+from core.utils.budget_tracker import get_budget_tracker
+from core.workflows.main_commands import (
+    PACK_MAX_TOKENS,
+    detect,
+    merge_stubs,
+    pack,
+    persist,
+    segment,
+)
+
+logger = get_logger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_DISCOUNT = 0.5
+BATCH_TEMPERATURE = 0.4
+_ID_SEP = "::"
+TERMINAL_FAILURES = ("failed", "expired", "cancelled")
+"""Executor states after which a batch will never produce results."""
+_OPEN_STATES = ("submitted", "completed")
+
+
+class BatchExecutor(Protocol):
+    """Runs a request JSONL somewhere and hands back the results JSONL."""
+
+    name: str
+
+    def submit(self, requests_path: Path) -> str: ...
+
+    def status(self, batch_id: str) -> str: ...
+
+    def download(self, batch_id: str, results_path: Path) -> None: ...
+
+
+def fake_summary(prompt: str) -> str:
+    """Deterministic schema-valid metadata derived from ``prompt``."""
+    words = [w.strip(".,:;!?\"'()").lower() for w in prompt.split()]
+    topics = sorted({w for w in words if len(w) > 6})[:3]
+    return json.dumps(
+        {
+            "summary": " ".join(prompt.split()[-30:]),
+            "topics": topics,
+            "tags": topics[:2],
+            "category": "batch",
+            "themes": [],
+            "priority": 3,
+            "tone": "neutral",
+            "depth": "medium",
+            "stage": "draft",
+        }
+    )
+
+
+class LocalBatchExecutor:
+    """Processes a batch in-process with ``respond(prompt) -> content``.
+
+    Output lines mirror the OpenAI Batch API, so ``collect_batch`` cannot tell
+    the two apart.
+    """
+
+    name = "local"
+
+    def __init__(self, respond: Callable[[str], str] = fake_summary):
+        self.respond = respond
+
+    def submit(self, requests_path: Path) -> str:
+        out_path = Path(requests_path).with_name("local_output.jsonl")
+        with (
+            open(requests_path, encoding="utf-8") as src,
+            open(out_path, "w", encoding="utf-8") as dst,
+        ):
+            for n, line in enumerate(src):
+                request = json.loads(line)
+                prompt = request["body"]["messages"][-1]["content"]
+                try:
+                    content = self.respond(prompt)
+                except Exception as exc:
+                    record = {"response": None, "error": {"message": str(exc)}}
+                else:
+                    usage = {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(content) // 4,
+                    }
+                    record = {
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "model": request["body"]["model"],
+                                "choices": [
+                                    {
+                                        "message": {
+                                            "role": "assistant",
+                                            "content": content,
+                                        }
+                                    }
+                                ],
+                                "usage": usage,
+                            },
+                        },
+                        "error": None,
+                    }
+                record.update(id=f"local_req_{n}", custom_id=request["custom_id"])
+                dst.write(json.dumps(record) + "\n")
+        return str(out_path)
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if Path(batch_id).exists() else "failed"
+
+    def download(self, batch_id: str, results_path: Path) -> None:
+        Path(results_path).write_bytes(Path(batch_id).read_bytes())
+
+
+class OpenAIBatchExecutor:
+    """Runs the request file through the OpenAI Batch API (24h window)."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.client = get_openai_client(api_key)
+
+    def submit(self, requests_path: Path) -> str:
+        with open(requests_path, "rb") as fh:
+            uploaded = self.client.files.create(file=fh, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, results_path: Path) -> None:
+        batch = self.client.batches.retrieve(batch_id)
+        # Batches where every request failed have only an error file, whose
+        # lines share the output format with the error set per record.
+        file_id = batch.output_file_id or batch.error_file_id
+        if file_id is None:
+            Path(results_path).write_text("", encoding="utf-8")
+            return
+        content = self.client.files.content(file_id)
+        Path(results_path).write_bytes(content.read())
+
+
+def get_batch_executor(name: str = "openai") -> BatchExecutor:
+    """Return the executor registered under ``name`` (``openai`` or ``local``)."""
+    if name == "local":
+        return LocalBatchExecutor()
+    if name == "openai":
+        return OpenAIBatchExecutor()
+    raise ValueError(f"Unknown batch executor: {name}")
+
+
+def latest_batch(paths: PathConfig | None = None) -> Path:
+    """Most recently created job directory under ``<output>/batches``."""
+    paths = paths or get_path_config()
+    jobs = sorted(p for p in (paths.output / "batches").glob("*") if p.is_dir())
+    if not jobs:
+        raise FileNotFoundError(f"No batch jobs in {paths.output / 'batches'}")
+    return jobs[-1]
+
+
+def load_manifest(job_dir: Path) -> dict:
+    return json.loads((Path(job_dir) / "manifest.json").read_text("utf-8"))
+
+
+def save_manifest(job_dir: Path, manifest: dict) -> None:
+    """Write the manifest atomically so an interrupted save never truncates it."""
+    path = Path(job_dir) / "manifest.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def open_batch_documents(paths: PathConfig | None = None) -> Dict[str, str]:
+    """Documents still pending in a submitted, uncollected job, by job id.
+
+    ``prepare_batch`` leaves these out so a second ``batch-submit`` before
+    ``batch-collect`` does not pay for the same documents twice.
+    """
+    paths = paths or get_path_config()
+    pending: Dict[str, str] = {}
+    for manifest_path in sorted((paths.output / "batches").glob("*/manifest.json")):
+        manifest = load_manifest(manifest_path.parent)
+        if manifest["state"] not in _OPEN_STATES:
+            continue
+        for name, doc in manifest["documents"].items():
+            if doc["status"] == "pending":
+                pending[name] = manifest["job_id"]
+    return pending
+
+
+def prepare_batch(
+    names: Iterable[str],
+    *,
+    model: str = "gpt-4",
+    chunked: bool = False,
+    segmentation: Literal["semantic", "paragraph", "token"] = "semantic",
+    overwrite: bool = False,
+    paths: PathConfig | None = None,
+    job_dir: Path | None = None,
+    pack_tokens: int = PACK_MAX_TOKENS,
+) -> Path:
+    """Serialize the summary prompts of every pending document into a new job.
+
+    Documents that already have ``.meta.json`` are skipped unless
+    ``overwrite``, as are documents pending in another open job (see
+    :func:`open_batch_documents`); chunks are packed into prompts of up to
+    ``pack_tokens`` as in :func:`classify`. Returns the job directory, which
+    must not exist yet.
+    """
+    paths = paths or get_path_config()
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    job_dir = Path(job_dir or paths.output / "batches" / job_id)
+    job_dir.parent.mkdir(parents=True, exist_ok=True)
+    job_dir.mkdir()
+    in_flight = open_batch_documents(paths)
+
+    documents: Dict[str, dict] = {}
+    est_cost = 0.0
+    calls_saved = tokens_saved = 0
+    with open(job_dir / "requests.jsonl", "w", encoding="utf-8") as fh:
+        for name in names:
+            if (paths.metadata / f"{name}.meta.json").exists() and not overwrite:
+                continue
+            if name in in_flight:
+                logger.info("Skipping %s: pending in batch %s", name, in_flight[name])
+                continue
+            text = (paths.parsed / name).read_text(encoding="utf-8")
+            doc_type, use_chunks = detect(text, chunked)
+            chunks = [text]
+            if use_chunks:
+                segments = segment(text, segmentation, paths.segment_boundary)
+                chunks, stats = pack(segments, doc_type, pack_tokens)
+                chunks = chunks or [text]
+                calls_saved += stats["calls_saved"]
+                tokens_saved += stats["tokens_saved"]
+            for i, chunk in enumerate(chunks):
+                prompt = build_summary_prompt(chunk, doc_type)
+                request = {
+                    "custom_id": f"{name}{_ID_SEP}{i}",
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "temperature": BATCH_TEMPERATURE,
+                        "max_tokens": DEFAULT_MAX_TOKENS,
+                    },
+                }
+                fh.write(json.dumps(request) + "\n")
+                est_cost += completion_cost(model, len(prompt) // 4, DEFAULT_MAX_TOKENS)
+            documents[name] = {
+                "doc_type": doc_type,
+                "chunks": len(chunks),
+                "status": "pending",
+            }
+
+    est_cost *= BATCH_DISCOUNT
+    manifest = {
+        "job_id": job_dir.name,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": model,
+        "state": "prepared",
+        "batch_id": None,
+        "requests": sum(doc["chunks"] for doc in documents.values()),
+        "estimated_usd": round(est_cost, 4),
+        "calls_saved": calls_saved,
+        "tokens_saved": tokens_saved,
+        "documents": documents,
+    }
+    save_manifest(job_dir, manifest)
+    logger.info(
+        "Prepared batch %s: %d documents, %d requests (%d saved by packing, "
+        "~%d prompt tokens), ~$%.2f at batch pricing",
+        manifest["job_id"],
+        len(documents),
+        manifest["requests"],
+        calls_saved,
+        tokens_saved,
+        est_cost,
+    )
+    return job_dir
+
+
+def submit_batch(job_dir: Path, executor: BatchExecutor) -> str:
+    """Hand a prepared job to ``executor`` and record its batch id.
+
+    The manifest's worst-case ``estimated_usd`` must fit the budget, but it is
+    only held while submitting: the job is charged its actual usage by
+    :func:`collect_batch`, and nothing if the batch dies unbilled.
+    """
+    manifest = load_manifest(job_dir)
+    if manifest["state"] != "prepared":
+        raise ValueError(f"Batch {manifest['job_id']} already {manifest['state']}")
+    if not manifest["documents"]:
+        logger.info("Batch %s has nothing to submit", manifest["job_id"])
+        return ""
+    tracker = get_budget_tracker()
+    reservation = tracker.reserve(manifest["estimated_usd"]) if tracker else None
+    if tracker and reservation is None:
+        raise RuntimeError(ERROR_BUDGET_EXCEEDED)
+    try:
+        manifest["batch_id"] = executor.submit(Path(job_dir) / "requests.jsonl")
+    finally:
+        if reservation is not None:
+            reservation.release()
+    manifest["executor"] = executor.name
+    manifest["state"] = "submitted"
+    manifest["submitted"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    save_manifest(job_dir, manifest)
+    logger.info("Submitted batch %s as %s", manifest["job_id"], manifest["batch_id"])
+    return manifest["batch_id"]
+
+
+def _read_results(results_path: Path) -> Dict[str, Dict[int, object]]:
+    """Map document name -> chunk index -> content string or error message."""
+    answers: Dict[str, Dict[int, object]] = {}
+    with open(results_path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            name, _, index = record["custom_id"].rpartition(_ID_SEP)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                error = record.get("error") or response.get("body", {}).get("error")
+                answer: object = Exception(str(error or "request failed"))
+            else:
+                answer = response["body"]["choices"][0]["message"]["content"].strip()
+            answers.setdefault(name, {})[int(index)] = answer
+    return answers
+
+
+def _results_cost(results_path: Path, model: str) -> float:
+    """Batch-priced cost of the ``usage`` reported in a results JSONL."""
+    cost = 0.0
+    with open(results_path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            response = json.loads(line).get("response") or {}
+            usage = (response.get("body") or {}).get("usage") or {}
+            cost += completion_cost(
+                model,
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+            )
+    return cost * BATCH_DISCOUNT
+
+
+def _metadata_from_chunks(doc: dict, chunks: Dict[int, object]) -> dict:
+    blocks: List[dict] = []
+    for i in range(doc["chunks"]):
+        answer = chunks.get(i)
+        if answer is None:
+            raise ValueError(f"missing result for chunk {i}")
+        if isinstance(answer, Exception):
+            raise answer
+        try:
+            blocks.append(json.loads(answer))
+        except json.JSONDecodeError as exc:
+            raise ValueError(
+                ERROR_OPENAI_RESPONSE_NOT_JSON.format(response=answer)
+            ) from exc
+    return blocks[0] if len(blocks) == 1 else merge_metadata_blocks(blocks)
+
+
+def collect_batch(
+    job_dir: Path, executor: BatchExecutor, paths: PathConfig | None = None
+) -> Dict[str, str]:
+    """Ingest a finished job: validate and persist every document's metadata.
+
+    Returns ``{}`` while the executor reports the batch still running;
+    otherwise a status per document (``"done"`` or ``"error: ..."``). Failed
+    documents keep no ``.meta.json``, so the next ``prepare_batch`` picks
+    them up again. If the batch itself ended in one of
+    ``TERMINAL_FAILURES``, the manifest is marked ``failed`` and its
+    documents are reset to pending for the next submit.
+
+    The budget tracker is charged once, when the results are downloaded,
+    with the reported ``usage`` at batch pricing (``charged_usd`` in the
+    manifest); a failed batch is not billed and charges nothing.
+    """
+    paths = paths or get_path_config()
+    job_dir = Path(job_dir)
+    manifest = load_manifest(job_dir)
+    if manifest["state"] == "prepared":
+        raise ValueError(f"Batch {manifest['job_id']} has not been submitted")
+    if manifest["state"] == "failed":
+        raise ValueError(
+            f"Batch {manifest['job_id']} {manifest['batch_state']}; resubmit it"
+        )
+
+    results_path = job_dir / "results.jsonl"
+    if manifest["state"] == "submitted":
+        state = executor.status(manifest["batch_id"])
+        if state in TERMINAL_FAILURES:
+            logger.error("Batch %s ended as %s", manifest["job_id"], state)
+            for doc in manifest["documents"].values():
+                doc["status"] = "pending"
+            manifest["state"] = "failed"
+            manifest["batch_state"] = state
+            save_manifest(job_dir, manifest)
+            return {name: f"error: batch {state}" for name in manifest["documents"]}
+        if state != "completed":
+            logger.info("Batch %s is %s", manifest["job_id"], state)
+            return {}
+        executor.download(manifest["batch_id"], results_path)
+        manifest["charged_usd"] = round(
+            _results_cost(results_path, manifest["model"]), 6
+        )
+        tracker = get_budget_tracker()
+        if tracker:
+            tracker.charge(manifest["charged_usd"])
+        manifest["state"] = "completed"
+        save_manifest(job_dir, manifest)
+
+    answers = _read_results(results_path)
+    status: Dict[str, str] = {}
+    for name, doc in manifest["documents"].items():
+        try:
+            metadata = _metadata_from_chunks(doc, answers.get(name, {}))
+            persist(name, merge_stubs(name, metadata, paths), paths)
+            status[name] = "done"
+        except Exception as exc:
+            logger.error("Failed to collect %s: %s", name, exc)
+            status[name] = f"error: {exc}"
+        doc["status"] = status[name]
+
+    manifest["state"] = "collected"
+    manifest["collected"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    save_manifest(job_dir, manifest)
+    failed = sum(1 for s in status.values() if s != "done")
+    logger.info(
+        "Collected batch %s: %d done, %d failed",
+        manifest["job_id"],
+        len(status) - failed,
+        failed,
+    )
+    return status
@@ -44,20 +44,47 @@ This module contains two core functions to classify documents. `classify()` supp
 - @notes: 
 """
 
+import contextvars
+import functools
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Callable, Iterable, Literal, Optional
+
+import tiktoken
+from jsonschema import ValidationError
+
+try:
+    from tqdm import tqdm
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    tqdm = None  # type: ignore[assignment]
 
 from core.configuration.config_registry import get_path_config, get_remote_config
 from core.configuration.path_config import PathConfig
-from core.llm.invoke import summarize_text
+from core.llm.cache import cache_stats, log_cache_stats
+from core.llm.invoke import (
+    build_summary_prompt,
+    discard_cached_summary,
+    summarize_text,
+)
+from core.logger import get_logger
 from core.metadata.merge import merge_metadata_blocks
 from core.metadata.schema import validate_metadata
 from core.parsing.chunk_text import chunk_text
-from core.parsing.topic_segmenter import segment_text
+from core.parsing.token_chunker import pack_chunks, token_chunks, word_offsets
+from core.parsing.topic_segmenter import segment_text, tile_text
 from core.storage.upload_local import upload_file
+from core.workflows.map_reduce import map_reduce_summarize
 
 MAX_CHARS = 16000
+SEGMENT_MAX_TOKENS = 4000
+PACK_MAX_TOKENS = 0
+"""Default prompt budget for chunk packing: off, so existing classify prompts,
+outputs and cache keys are unchanged unless ``--pack-tokens`` opts in (about
+6000 suits gpt-4's 8K context)."""
+
+logger = get_logger(__name__)
 
 
 def get_parsed_text(name: str) -> str:
@@ -85,10 +112,17 @@ def detect(text: str, force_chunked: bool) -> tuple[str, bool]:
     return doc_type, use_chunks
 
 
-def segment(text: str, segmentation: Literal["semantic", "paragraph"]) -> list[str]:
+def segment(
+    text: str,
+    segmentation: Literal["semantic", "paragraph", "token"],
+    boundary_method: str = "cluster",
+) -> list[str]:
     """Split text into chunks using the configured segmentation strategy."""
+    if segmentation == "token":
+        return [span.slice(text) for span in token_chunks(text, SEGMENT_MAX_TOKENS)]
     if segmentation == "semantic":
-        raw_chunks = segment_text(text)
+        splitter = tile_text if boundary_method == "texttiling" else segment_text
+        raw_chunks = splitter(text)
         if not raw_chunks:
             raw_chunks = chunk_text(text)
     else:
@@ -96,10 +130,70 @@ def segment(text: str, segmentation: Literal["semantic", "paragraph"]) -> list[s
     return raw_chunks
 
 
-def summarize(chunks: list[str], doc_type: str) -> dict:
-    """Summarize provided chunks and merge results when necessary."""
+@functools.lru_cache(maxsize=None)
+def _prompt_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as exc:  # encoding files unavailable, e.g. offline
+        logger.warning("No tokenizer for %s (%s); approximating by words", model, exc)
+        return None
+
+
+def count_prompt_tokens(text: str, model: str = "gpt-4") -> int:
+    """Prompt tokens of ``text`` for ``model`` (word-based if tiktoken cannot load)."""
+    enc = _prompt_encoding(model)
+    if enc is None:
+        return len(word_offsets(text))
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def pack(
+    chunks: list[str],
+    doc_type: str,
+    max_tokens: int = PACK_MAX_TOKENS,
+    count_tokens: Callable[[str], int] | None = None,
+) -> tuple[list[str], dict]:
+    """Bin adjacent chunks so each summary prompt fills up to ``max_tokens``.
+
+    The prompt template's own tokens count against every bin. Returns the
+    bins and ``{"chunks", "calls", "calls_saved", "tokens_saved"}``, where
+    ``tokens_saved`` is the template overhead no longer sent once per chunk.
+    ``max_tokens <= 0`` disables packing.
+    """
+    chunks = [chunk for chunk in chunks if chunk.strip()]
+    if len(chunks) < 2 or max_tokens <= 0:
+        return chunks, {
+            "chunks": len(chunks),
+            "calls": len(chunks),
+            "calls_saved": 0,
+            "tokens_saved": 0,
+        }
+    count_tokens = count_tokens or count_prompt_tokens
+    try:
+        overhead = count_tokens(build_summary_prompt("", doc_type))
+    except FileNotFoundError:
+        overhead = 0  # summarize_text reports the missing template itself
+    bins = pack_chunks(chunks, max_tokens, overhead=overhead, count_tokens=count_tokens)
+    saved = len(chunks) - len(bins)
+    return bins, {
+        "chunks": len(chunks),
+        "calls": len(bins),
+        "calls_saved": saved,
+        "tokens_saved": saved * overhead,
+    }
+
+
+def summarize(chunks: list[str], doc_type: str, map_reduce: bool = False) -> dict:
+    """Summarize provided chunks and merge results when necessary.
+
+    With ``map_reduce`` the chunks are summarized concurrently and reduced
+    hierarchically (see :mod:`core.workflows.map_reduce`) instead of one call
+    per chunk followed by an unbounded concatenation.
+    """
     if len(chunks) == 1:
         return summarize_text(chunks[0], doc_type=doc_type)
+    if map_reduce:
+        return map_reduce_summarize(chunks, doc_type)
 
     block_results = [
         summarize_text(chunk, doc_type=doc_type) for chunk in chunks if chunk.strip()
@@ -127,10 +221,16 @@ def persist(name: str, metadata: dict, paths: PathConfig) -> dict:
 def classify(
     name: str,
     chunked: bool = False,
-    segmentation: Literal["semantic", "paragraph"] = "semantic",
+    segmentation: Literal["semantic", "paragraph", "token"] = "semantic",
     paths: PathConfig | None = None,
+    map_reduce: bool = False,
+    pack_tokens: int = PACK_MAX_TOKENS,
 ) -> dict:
-    """Summarize a parsed document into metadata."""
+    """Summarize a parsed document into metadata.
+
+    Chunks are packed into prompts of up to ``pack_tokens`` (0 disables) so
+    small segments share one call.
+    """
     paths = paths or get_path_config()
     parsed_path = paths.parsed / name
     text = parsed_path.read_text(encoding="utf-8")
@@ -138,13 +238,117 @@ def classify(
     doc_type, use_chunks = detect(text, chunked)
 
     if use_chunks:
-        chunks = segment(text, segmentation)
+        chunks = segment(text, segmentation, paths.segment_boundary)
+        chunks, stats = pack(chunks, doc_type, pack_tokens)
+        if stats["calls_saved"]:
+            logger.info(
+                "Packed %d chunks of %s into %d calls "
+                "(%d calls, ~%d prompt tokens saved)",
+                stats["chunks"],
+                name,
+                stats["calls"],
+                stats["calls_saved"],
+                stats["tokens_saved"],
+            )
     else:
         chunks = [text]
 
-    metadata = summarize(chunks, doc_type)
+    metadata = summarize(chunks, doc_type, map_reduce=map_reduce)
     metadata = merge_stubs(name, metadata, paths)
-    return persist(name, metadata, paths)
+    try:
+        return persist(name, metadata, paths)
+    except ValidationError:
+        # A reply that parsed but fails the schema must not be replayed.
+        for chunk in chunks:
+            discard_cached_summary(chunk, doc_type)
+        raise
+
+
+def classify_many(
+    names: Iterable[str],
+    *,
+    concurrency: int = 4,
+    chunked: bool = False,
+    segmentation: Literal["semantic", "paragraph", "token"] = "semantic",
+    overwrite: bool = False,
+    paths: PathConfig | None = None,
+    progress: bool = True,
+    map_reduce: bool = False,
+    pack_tokens: int = PACK_MAX_TOKENS,
+    on_result: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Classify many parsed documents on ``concurrency`` threads.
+
+    Each document's ``.meta.json`` is written by its own worker as soon as it
+    finishes, so completion order does not matter and an interrupted run keeps
+    everything already done. API pacing is shared through the process-wide
+    rate limiter (``OPENAI_RPM``/``OPENAI_TPM``) and budget tracker. Returns a
+    status per name: ``"done"``, ``"skipped"`` or ``"error: ..."``;
+    ``on_result(name, status)`` is also called from the submitting thread as
+    each document finishes (e.g. to checkpoint a job journal).
+    """
+    paths = paths or get_path_config()
+    status: dict[str, str] = {}
+    todo: list[str] = []
+    for name in names:
+        if (paths.metadata / f"{name}.meta.json").exists() and not overwrite:
+            logger.info("Skipping %s (already classified)", name)
+            status[name] = "skipped"
+            if on_result is not None:
+                on_result(name, "skipped")
+        else:
+            todo.append(name)
+
+    bar = tqdm(total=len(todo), unit="doc") if progress and tqdm and todo else None
+    cache_before = cache_stats()
+    start = time.perf_counter()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        # Each task runs in a copy of the caller's context so a surrounding
+        # ``bypass_cache()`` also applies on the worker threads.
+        futures = {
+            pool.submit(
+                contextvars.copy_context().run,
+                classify,
+                name,
+                chunked=chunked,
+                segmentation=segmentation,
+                paths=paths,
+                map_reduce=map_reduce,
+                pack_tokens=pack_tokens,
+            ): name
+            for name in todo
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+                status[name] = "done"
+                logger.info("Done: %s", name)
+            except Exception as exc:
+                failed += 1
+                status[name] = f"error: {exc}"
+                logger.error("Error: %s — %s", name, exc)
+            if on_result is not None:
+                on_result(name, status[name])
+            if bar is not None:
+                bar.update()
+                rate = bar.n / max(time.perf_counter() - start, 1e-9) * 60
+                bar.set_postfix(failed=failed, docs_per_min=f"{rate:.1f}")
+    if bar is not None:
+        bar.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Classified %d/%d documents in %.1fs (%.1f docs/min, %d failed)",
+        len(todo) - failed,
+        len(todo),
+        elapsed,
+        len(todo) / max(elapsed, 1e-9) * 60,
+        failed,
+    )
+    log_cache_stats(cache_before)
+    return status
 
 
 def upload_metadata_to_s3(name: str, metadata: dict):
@@ -164,17 +368,19 @@ def upload_and_prepare(
     upload_file(file_name, parsed_name, paths)
 
 
+def parsed_name_for(file_name: str | Path) -> str:
+    """Default parsed ``.txt`` name that ingestion gives ``file_name``."""
+    return Path(file_name).stem.replace(" ", "_").replace("-", "_").lower() + ".txt"
+
+
 def pipeline_from_upload(
     file_name: str,
     parsed_name: Optional[str] = None,
-    segmentation: Literal["semantic", "paragraph"] = "semantic",
+    segmentation: Literal["semantic", "paragraph", "token"] = "semantic",
     paths: PathConfig | None = None,
 ) -> dict:
     """Upload, parse, and classify a single document."""
     upload_and_prepare(file_name, parsed_name, paths)
-    txt_name = (
-        parsed_name
-        or Path(file_name).stem.replace(" ", "_").replace("-", "_").lower() + ".txt"
-    )
+    txt_name = parsed_name or parsed_name_for(file_name)
     metadata = classify(txt_name, segmentation=segmentation, paths=paths)
     return metadata
@@ -0,0 +1,171 @@
+"""Hierarchical map-reduce summarization for long documents.
+
+Sequential ``summarize`` makes one round-trip per chunk and then concatenates
+every chunk summary into a single unbounded string. Here the chunk summaries
+(the *map*) run concurrently, and the results are *reduced* in consecutive,
+token-bounded groups — each group becomes one block again, either through
+another LLM call over the group's summaries or a deterministic bounded merge —
+until one block remains. With a fan-in of ``f`` blocks per group a document of
+``N`` chunks needs ``1 + ceil(log_f N)`` rounds of parallel calls instead of
+``N`` sequential ones.
+"""
+
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Literal, Optional
+
+from core.llm.invoke import summarize_text
+from core.logger import get_logger
+from core.metadata.merge import merge_metadata_blocks
+
+logger = get_logger(__name__)
+
+REDUCE_GROUP_TOKENS = 6000
+REDUCE_SUMMARY_CHARS = 2000
+RENDER_LIST_ITEMS = 12
+_LIST_KEYS = ("topics", "tags", "themes")
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def render_block(block: Dict) -> str:
+    """Compact text form of one metadata block, fed to a reduce call.
+
+    List fields are cut to ``RENDER_LIST_ITEMS`` so blocks that already carry
+    the union of many sections do not grow the reduce prompt without bound.
+    """
+    lines = [block.get("summary", "").strip()]
+    for key in _LIST_KEYS:
+        if block.get(key):
+            items = ", ".join(map(str, block[key][:RENDER_LIST_ITEMS]))
+            lines.append(f"{key.capitalize()}: {items}")
+    return "\n".join(line for line in lines if line)
+
+
+def group_blocks(blocks: List[Dict], max_tokens: int) -> List[List[Dict]]:
+    """Split ``blocks`` into consecutive groups of at most ``max_tokens``.
+
+    Every group holds at least two blocks (while two remain), so each reduce
+    round at least halves the count and the loop always terminates.
+    """
+    groups: List[List[Dict]] = []
+    current: List[Dict] = []
+    used = 0
+    for block in blocks:
+        cost = _estimate_tokens(render_block(block))
+        if len(current) >= 2 and used + cost > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(block)
+        used += cost
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+
+def bounded_merge(blocks: List[Dict], max_chars: int = REDUCE_SUMMARY_CHARS) -> Dict:
+    """``merge_metadata_blocks`` with the joined summary capped at ``max_chars``.
+
+    Each block keeps an equal share of the budget, cut at a word boundary, so
+    every section stays represented no matter how many are merged.
+    """
+    share = max(1, max_chars // len(blocks))
+    trimmed = []
+    for block in blocks:
+        summary = block.get("summary", "").strip()
+        if len(summary) > share:
+            summary = summary[:share].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+        trimmed.append({**block, "summary": summary})
+    return merge_metadata_blocks(trimmed)
+
+
+def _llm_reduce(blocks: List[Dict], summarize_one: Callable[[str], Dict]) -> Dict:
+    text = "\n\n".join(
+        f"Section {i}:\n{render_block(block)}" for i, block in enumerate(blocks, 1)
+    )
+    try:
+        reduced = summarize_one(text)
+    except ValueError as exc:
+        logger.warning("LLM reduce failed (%s); merging deterministically", exc)
+        return bounded_merge(blocks)
+    merged = merge_metadata_blocks(blocks)
+    for key in _LIST_KEYS:
+        # Keep labels the reduce call dropped; first-seen order, reduced first.
+        reduced[key] = list(dict.fromkeys([*reduced.get(key, []), *merged[key]]))
+    return reduced
+
+
+def map_reduce_summarize(
+    chunks: List[str],
+    doc_type: str,
+    *,
+    reducer: Literal["llm", "merge"] = "llm",
+    concurrency: int = 4,
+    group_tokens: int = REDUCE_GROUP_TOKENS,
+    model: str = "gpt-4",
+    summarize_fn: Optional[Callable[[str, str], Dict]] = None,
+) -> Dict:
+    """Summarize ``chunks`` concurrently and reduce them to one metadata block.
+
+    Parameters
+    ----------
+    chunks : List[str]
+        Document segments; blank ones are ignored.
+    doc_type : str
+        ``"standard"`` or ``"chatlog"``, forwarded to every call.
+    reducer : {"llm", "merge"}
+        ``"llm"`` summarizes each group's summaries with another completion;
+        ``"merge"`` combines them with :func:`bounded_merge` (no extra calls).
+    concurrency : int
+        Maximum completions in flight per round.
+    group_tokens : int
+        Approximate token budget of the summaries fed into one reduce step.
+    summarize_fn : callable, optional
+        ``(text, doc_type) -> dict`` used for map and LLM reduce calls;
+        defaults to :func:`summarize_text` with ``model``.
+    """
+    chunks = [chunk for chunk in chunks if chunk.strip()]
+    if not chunks:
+        raise ValueError("No valid metadata blocks to merge.")
+
+    def summarize_one(text: str, kind: str = doc_type) -> Dict:
+        if summarize_fn is not None:
+            return summarize_fn(text, kind)
+        return summarize_text(text, doc_type=kind, model=model)
+
+    def reduce_group(group: List[Dict]) -> Dict:
+        if reducer == "llm":
+            # Section summaries are prose whatever the source document was.
+            return _llm_reduce(group, lambda text: summarize_one(text, "standard"))
+        return bounded_merge(group)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+
+        def run(fn: Callable, items: List) -> List[Dict]:
+            # Copy the caller's context per task so ``bypass_cache()`` holds.
+            futures = [
+                pool.submit(contextvars.copy_context().run, fn, item) for item in items
+            ]
+            return [future.result() for future in futures]
+
+        blocks = run(summarize_one, chunks)
+        rounds = 1
+        while len(blocks) > 1:
+            groups = group_blocks(blocks, group_tokens)
+            blocks = run(reduce_group, groups)
+            rounds += 1
+
+    logger.info(
+        "Map-reduce summarized %d chunks in %d rounds (%s reduce)",
+        len(chunks),
+        rounds,
+        reducer,
+    )
+    return blocks[0]
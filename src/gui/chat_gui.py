@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
+import contextlib
 from typing import Dict, List
 
 import streamlit as st  # type: ignore
 import tiktoken
-from openai import OpenAI
 
-from core.configuration.config_registry import get_remote_config
-from core.llm.invoke import LLM_COMPLETION_COST_PER_1K, LLM_PROMPT_COST_PER_1K
+from core.llm.clients import get_openai_client
+from core.llm.invoke import completion_cost
 from core.utils.budget_tracker import get_budget_tracker  # type: ignore
 
 
@@ -21,25 +21,29 @@ def run_openai_chat(
     api_key: str | None = None,
 ) -> str:
     """Send conversation history to OpenAI and return the assistant reply."""
-    remote = get_remote_config()
-    client = OpenAI(api_key=api_key or remote.openai_api_key)
+    client = get_openai_client(api_key)
     tracker = get_budget_tracker()
+    reservation = None
     if tracker:
         enc = tiktoken.encoding_for_model(model)
         joined = "".join(m["content"] for m in messages)
         prompt_tokens = len(enc.encode(joined, disallowed_special=()))
-        est_cost = prompt_tokens / 1000 * LLM_PROMPT_COST_PER_1K.get(
-            model, 0
-        ) + max_tokens / 1000 * LLM_COMPLETION_COST_PER_1K.get(model, 0)
-        if not tracker.check(est_cost):
+        reservation = tracker.reserve(completion_cost(model, prompt_tokens, max_tokens))
+        if reservation is None:
             raise RuntimeError("Budget exceeded for chat request")
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,  # type: ignore[arg-type]
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
+    with reservation or contextlib.nullcontext():
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,  # type: ignore[arg-type]
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        usage = getattr(response, "usage", None)
+        if reservation is not None and usage is not None:
+            reservation.settle(
+                completion_cost(model, usage.prompt_tokens, usage.completion_tokens)
+            )
     content = response.choices[0].message.content or ""
     return content.strip()
 
@@ -1,9 +1,14 @@
 # scripts/pipeline.py
+import contextlib
+import json
+import time
 from pathlib import Path
+from typing import Iterable
 
 from core.configuration.config_registry import get_path_config
 from core.configuration.path_config import PathConfig
 from core.logger import get_logger
+from core.utils.job_journal import Job, fingerprint, get_job_journal
 
 logger = get_logger(__name__)
 
@@ -20,16 +25,29 @@ def classify(*args, **kwargs):
     return _classify(*args, **kwargs)
 
 
+def classify_many(*args, **kwargs):
+    from core.workflows.main_commands import classify_many as _classify_many
+
+    return _classify_many(*args, **kwargs)
+
+
 def generate_embeddings(*args, **kwargs):
     from core.embeddings.embedder import generate_embeddings as _generate
 
     return _generate(*args, **kwargs)
 
 
-def upload_file(file: Path, paths: PathConfig) -> None:
+def _tracked(job: Job | None, doc: str, stage: str, fp: str | None = None):
+    return job.track(doc, stage, fp) if job is not None else contextlib.nullcontext()
+
+
+def upload_file(
+    file: Path, paths: PathConfig, job: Job | None = None, key: str | None = None
+) -> None:
     """Upload and prepare a single file for downstream processing."""
     try:
-        upload_and_prepare(file, paths=paths)
+        with _tracked(job, key or str(file), "parsed", fingerprint(file)):
+            upload_and_prepare(file, paths=paths)
     except Exception as exc:  # pragma: no cover - defensive logging
         logger.error("Upload failed: %s — %s", file.name, exc)
 
@@ -41,6 +59,7 @@ def classify_document(
     segmentation: str,
     overwrite: bool,
     paths: PathConfig,
+    job: Job | None = None,
 ) -> None:
     """Classify a parsed document if classification is required."""
     name = file.name
@@ -50,20 +69,45 @@ def classify_document(
         return
 
     try:
-        classify(name, chunked=chunked, segmentation=segmentation, paths=paths)
+        with _tracked(job, name, "classified", fingerprint(file)):
+            classify(name, chunked=chunked, segmentation=segmentation, paths=paths)
         logger.info("%s classified", name)
     except Exception as exc:  # pragma: no cover - defensive logging
         logger.error("Classification failed: %s — %s", name, exc)
 
 
-def embed_document(*, method: str, paths: PathConfig) -> None:
+def link_duplicate(name: str, canonical: str, paths: PathConfig) -> None:
+    """Write ``name``'s metadata as a copy of ``canonical``'s, marked as linked."""
+    source = paths.metadata / f"{canonical}.meta.json"
+    if not source.exists():
+        logger.warning("Cannot link %s: %s has no metadata", name, canonical)
+        return
+    metadata = json.loads(source.read_text("utf-8"))
+    metadata["duplicate_of"] = canonical
+    (paths.metadata / f"{name}.meta.json").write_text(
+        json.dumps(metadata, indent=2), encoding="utf-8"
+    )
+    logger.info("%s linked to near-duplicate %s", name, canonical)
+
+
+def embed_document(
+    *,
+    method: str,
+    paths: PathConfig,
+    exclude: set[str] | None = None,
+    job: Job | None = None,
+) -> None:
     """Generate embeddings for the processed corpus."""
     logger.info("Generating embeddings and updating vector index...")
+    extra = {"exclude": exclude} if exclude else {}
+    if job is not None:
+        extra["job"] = job
     generate_embeddings(
         source_dir=paths.parsed if method != "raw" else paths.raw,
         method=method,
         out_path=paths.root / "rich_doc_embeddings.json",
         segment_mode=paths.semantic_chunking,
+        **extra,
     )
 
 
@@ -74,6 +118,11 @@ def run_pipeline(
     method: str = "summary",
     segmentation: str = "semantic",
     paths: PathConfig | None = None,
+    workers: int = 1,
+    near_duplicates: str = "off",
+    concurrency: int = 1,
+    resume: bool = False,
+    only: Iterable[Path] | None = None,
 ):
     """
     Full ingestion pipeline:
@@ -86,26 +135,146 @@ def run_pipeline(
         chunked (bool): Use chunking for classification
         overwrite (bool): Reclassify even if .meta.json exists
         method (str): Text source for embeddings: parsed, summary, raw, meta
+        workers (int): Parser processes for step 1 (``0`` = all cores)
+        near_duplicates (str): ``"off"``, ``"skip"`` (neither classify nor
+            embed near-duplicates) or ``"link"`` (skip them too, but copy the
+            canonical document's metadata with a ``duplicate_of`` field)
+        concurrency (int): Documents classified in parallel in step 2
+        resume (bool): Continue the last unfinished pipeline job in the job
+            journal, skipping every parse/classify/embed stage it already
+            finished for unchanged inputs (``overwrite`` then only applies
+            to documents the job has not classified yet)
+        only (Iterable[Path] | None): Parse and classify just these files
+            under ``input_dir``, e.g. the transcripts an incremental ChatGPT
+            parse rewrote (:func:`core.parsing.openai_export.changed_conversations`).
+            Embeddings are still rebuilt over the whole parsed corpus.
     """
     paths = paths or get_path_config()
+    only = sorted(str(path) for path in only) if only is not None else None
+    job = get_job_journal(paths).begin(
+        "pipeline",
+        {
+            "input_dir": input_dir,
+            "chunked": chunked,
+            "overwrite": overwrite,
+            "method": method,
+            "segmentation": segmentation,
+            "only": only,
+        },
+        resume=resume,
+    )
 
     logger.info("Uploading and parsing raw files...")
     files_to_upload = sorted(
         (path for path in input_dir.rglob("*") if path.is_file()),
         key=lambda path: str(path),
     )
-    for file in files_to_upload:
-        upload_file(file, paths=paths)
+    targets: set[str] | None = None
+    if only is not None:
+        from core.workflows.main_commands import parsed_name_for
+
+        wanted = {Path(path).resolve() for path in only}
+        files_to_upload = [file for file in files_to_upload if file.resolve() in wanted]
+        targets = {parsed_name_for(file) for file in files_to_upload}
+        logger.info("Restricted to %d changed input files", len(files_to_upload))
+    keys = {file: str(file.relative_to(input_dir)) for file in files_to_upload}
+    fps = {file: fingerprint(file) for file in files_to_upload}
+    files_to_upload = [
+        file
+        for file in files_to_upload
+        if not job.is_done(keys[file], "parsed", fps[file])
+    ]
+    if workers == 1:
+        for file in files_to_upload:
+            upload_file(file, paths=paths, job=job, key=keys[file])
+    else:
+        from core.storage.parallel_ingest import ingest_files
+
+        for file in files_to_upload:
+            job.mark(keys[file], "parsed", "running", fp=fps[file])
+        for result in ingest_files(files_to_upload, paths=paths, workers=workers):
+            key = keys[result.path]
+            if result.ok:
+                job.mark(key, "parsed", "done", fp=fps[result.path])
+            else:
+                job.mark(key, "parsed", "failed", error=result.error)
+
+    duplicates: dict[str, str] = {}
+    tokens: dict[str, int] = {}
+    if near_duplicates != "off":
+        from core.utils.dedup import find_near_duplicates
+
+        duplicates, tokens = find_near_duplicates(
+            paths.parsed, index_path=paths.vector / "minhash.npz"
+        )
 
     logger.info("Classifying parsed documents...")
-    for file in sorted(paths.parsed.glob("*.txt")):
-        classify_document(
-            file,
+    from core.llm.cache import cache_stats, log_cache_stats
+
+    cache_before = cache_stats()
+    parsed_fps = {
+        file.name: fingerprint(file)
+        for file in sorted(paths.parsed.glob("*.txt"))
+        if file.name not in duplicates
+    }
+    if targets is not None:
+        parsed_fps = {n: fp for n, fp in parsed_fps.items() if n in targets}
+    names = job.pending(parsed_fps, "classified", parsed_fps)
+    if len(names) < len(parsed_fps):
+        logger.info(
+            "Skipping %d documents classified earlier in job %d",
+            len(parsed_fps) - len(names),
+            job.id,
+        )
+    start = time.perf_counter()
+    if concurrency > 1:
+        for name in names:
+            job.mark(name, "classified", "running", fp=parsed_fps[name])
+        classify_many(
+            names,
+            concurrency=concurrency,
             chunked=chunked,
             segmentation=segmentation,
             overwrite=overwrite,
             paths=paths,
+            on_result=lambda name, status: job.record_status(
+                name, "classified", status, parsed_fps[name]
+            ),
         )
+    else:
+        for name in names:
+            classify_document(
+                paths.parsed / name,
+                chunked=chunked,
+                segmentation=segmentation,
+                overwrite=overwrite,
+                paths=paths,
+                job=job,
+            )
+    elapsed = time.perf_counter() - start
+    log_cache_stats(cache_before)
+
+    for name, canonical in sorted(duplicates.items()):
+        if near_duplicates == "link":
+            link_duplicate(name, canonical, paths)
+        else:
+            logger.info("Skipping %s (near-duplicate of %s)", name, canonical)
 
-    embed_document(method=method, paths=paths)
+    embed_document(method=method, paths=paths, exclude=set(duplicates), job=job)
+    if duplicates:
+        from core.utils.dedup import DEFAULT_SECONDS_PER_DOC, estimate_savings
+
+        saved = estimate_savings(
+            tokens,
+            duplicates,
+            seconds_per_doc=elapsed / len(names) if names else DEFAULT_SECONDS_PER_DOC,
+        )
+        logger.info(
+            "Near-duplicates skipped: %d docs, ~%d tokens, ~$%.2f, ~%.0fs saved",
+            saved["documents"],
+            saved["tokens"],
+            saved["usd"],
+            saved["seconds"],
+        )
+    job.complete()
     logger.info("Pipeline complete.")
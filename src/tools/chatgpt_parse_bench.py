@@ -0,0 +1,104 @@
+"""Throughput benchmark: ChatGPT export parsing with and without worker processes.
+
+Writes a synthetic ``conversations.json`` export, then parses it once per
+``--workers`` value and reports wall time, conversations/s and the CPU time
+spent in the calling process. Decoding the export stays in the calling
+process, so its CPU time is the floor the wall time cannot drop below however
+many workers render and write.
+
+    PYTHONPATH=src python src/tools/chatgpt_parse_bench.py --conversations 3000
+
+Worker processes only pay off on a machine with spare cores; on one core the
+pool adds process start-up and pickling on top of the same work.
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict
+
+from core.logger import get_logger
+from core.parsing.openai_export import parse_chatgpt_export
+
+logger = get_logger(__name__)
+
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta"]
+
+
+def synthetic_conversation(index: int, messages: int, words: int) -> Dict:
+    """Return one export conversation: a linear chain of ``messages`` turns."""
+    mapping: Dict[str, Dict] = {}
+    parent = None
+    for position in range(messages):
+        node = f"n{position}"
+        mapping[node] = {
+            "id": node,
+            "parent": parent,
+            "children": [],
+            "message": {
+                "author": {"role": "user" if position % 2 == 0 else "assistant"},
+                "content": {
+                    "content_type": "text",
+                    "parts": [" ".join(random.choices(WORDS, k=words))],
+                },
+                "create_time": float(position),
+            },
+        }
+        parent = node
+    return {
+        "id": f"{index:08d}-bench",
+        "title": f"Chat {index}",
+        "update_time": 1.0,
+        "current_node": parent,
+        "mapping": mapping,
+    }
+
+
+def write_export(path: Path, conversations: int, messages: int, words: int) -> Path:
+    random.seed(0)
+    data = [synthetic_conversation(i, messages, words) for i in range(conversations)]
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("conversations.json", json.dumps(data))
+    return path
+
+
+def run(export: Path, out_dir: Path, workers: int, stream: bool) -> None:
+    wall, cpu = time.perf_counter(), time.process_time()
+    outputs = parse_chatgpt_export(
+        export, out_dir, incremental=True, stream=stream, workers=workers
+    )
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    logger.info(
+        "workers %-2d %7.2fs  %8.0f conversations/s  calling-process CPU %.2fs",
+        workers,
+        wall,
+        len(outputs) / wall,
+        cpu,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=3000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--stream", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = write_export(
+            Path(tmp) / "export.zip", args.conversations, args.messages, args.words
+        )
+        logger.info("%d conversations x %d messages", args.conversations, args.messages)
+        for workers in args.workers:
+            run(export, Path(tmp) / f"out_{workers}", workers, args.stream)
+
+
+if __name__ == "__main__":
+    main()
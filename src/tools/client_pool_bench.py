@@ -0,0 +1,153 @@
+"""Latency of small completions with a fresh vs. pooled OpenAI client.
+
+Sends ``--requests`` tiny chat completions twice: once constructing a new
+``OpenAI`` client per call (the pre-pool behaviour) and once through
+:func:`core.llm.clients.get_openai_client`. By default the target is a local
+keep-alive HTTP/1.1 stand-in that returns a canned completion and charges
+``--handshake-ms`` once per new connection to model TCP+TLS setup, so the run
+is offline and free.
+
+    PYTHONPATH=src python src/tools/client_pool_bench.py --requests 200 --concurrency 8
+
+Pass ``--base-url https://api.openai.com/v1 --model gpt-4o-mini`` (and an API
+key in ``remote_config.json``) to measure against the real endpoint.
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+import numpy as np
+import openai
+
+from core.llm.clients import close_clients, get_openai_client
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_COMPLETION = json.dumps(
+    {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "bench",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+    }
+).encode("utf-8")
+
+
+def start_stand_in(handshake_ms: float) -> tuple:
+    """Serve canned completions on an ephemeral port; return (server, url, stats)."""
+    stats = {"connections": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with lock:
+                stats["connections"] += 1
+            time.sleep(handshake_ms / 1000.0)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(_COMPLETION)))
+            self.end_headers()
+            self.wfile.write(_COMPLETION)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", stats
+
+
+def _run(
+    call: Callable[[], None], n_requests: int, concurrency: int
+) -> tuple[List[float], float]:
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(n_requests)))
+    return latencies, time.perf_counter() - start
+
+
+def _report(label: str, latencies: List[float], elapsed: float, extra: str) -> None:
+    lat = np.asarray(latencies) * 1000
+    logger.info(
+        "%-7s requests=%d  total=%.2fs  p50=%.2fms  p99=%.2fms  %s",
+        label,
+        len(lat),
+        elapsed,
+        float(np.percentile(lat, 50)),
+        float(np.percentile(lat, 99)),
+        extra,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    stats = None
+    base_url, api_key = args.base_url, args.api_key
+    if base_url is None:
+        server, base_url, stats = start_stand_in(args.handshake_ms)
+        api_key = api_key or "bench"
+    messages = [{"role": "user", "content": "Say ok."}]
+
+    def fresh() -> None:
+        client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        try:
+            client.chat.completions.create(
+                model=args.model, messages=messages, max_tokens=1
+            )
+        finally:
+            client.close()
+
+    def pooled() -> None:
+        get_openai_client(api_key, base_url).chat.completions.create(
+            model=args.model, messages=messages, max_tokens=1
+        )
+
+    for label, call in (("fresh", fresh), ("pooled", pooled)):
+        before = stats["connections"] if stats else 0
+        latencies, elapsed = _run(call, args.requests, args.concurrency)
+        extra = f"connections={stats['connections'] - before}" if stats else ""
+        _report(label, latencies, elapsed, extra)
+    close_clients()
+    if stats:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
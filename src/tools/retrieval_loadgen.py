@@ -0,0 +1,158 @@
+"""Load generator for the micro-batching retrieval server.
+
+Builds an in-memory FAISS index of random unit vectors, swaps the OpenAI
+embedder for a deterministic stand-in with a fixed per-call latency, and
+fires concurrent queries at :class:`core.retrieval.server.MicroBatcher`.
+Reports p50/p99 latency and QPS with batching on and off.
+
+    PYTHONPATH=src python src/tools/retrieval_loadgen.py --requests 2000 --concurrency 64
+
+Pass ``--url http://127.0.0.1:8000`` to drive a running ``kairos serve``
+instead of the in-process batcher.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+from core.logger import get_logger
+from core.retrieval.retriever import Retriever
+from core.retrieval.server import MicroBatcher
+from core.vectorstore.faiss_store import FaissStore
+
+logger = get_logger(__name__)
+
+
+class StandInEmbedder:
+    """Hash-seeded unit vectors with a simulated network round-trip per call."""
+
+    def __init__(self, dim: int, call_ms: float, per_text_ms: float):
+        self.dim = dim
+        self.call_s = call_ms / 1000.0
+        self.per_text_s = per_text_ms / 1000.0
+        self.calls = 0
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.call_s + self.per_text_s * len(texts))
+        out = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.blake2b(text.encode()).digest()[:4], "big")
+            vec = np.random.default_rng(seed).standard_normal(self.dim)
+            out.append((vec / np.linalg.norm(vec)).astype("float32").tolist())
+        return out
+
+
+def build_retriever(n_vectors: int, dim: int) -> Retriever:
+    store = FaissStore(dim=dim, path=Path(tempfile.mkdtemp()) / "loadgen.index")
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((n_vectors, dim)).astype("float32")
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    ids = np.arange(1, n_vectors + 1)
+    store.add(ids, vecs)
+    retriever = Retriever(store=store, model="text-embedding-3-small")
+    retriever.id_map = {int(i): f"doc{i}" for i in ids}
+    retriever.cache = None
+    return retriever
+
+
+def _report(label: str, latencies: List[float], elapsed: float) -> None:
+    lat = np.asarray(latencies) * 1000
+    logger.info(
+        "%-12s requests=%d  qps=%.1f  p50=%.2fms  p99=%.2fms",
+        label,
+        len(lat),
+        len(lat) / elapsed,
+        float(np.percentile(lat, 50)),
+        float(np.percentile(lat, 99)),
+    )
+
+
+async def _drive(submit, n_requests: int, concurrency: int, k: int) -> tuple:
+    latencies: List[float] = []
+    counter = iter(range(n_requests))
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            await submit(f"query {i}", k)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def run_in_process(args) -> None:
+    retriever = build_retriever(args.vectors, args.dim)
+    for label, max_batch in (("unbatched", 1), ("batched", args.max_batch)):
+        embedder = StandInEmbedder(args.dim, args.call_ms, args.per_text_ms)
+        batcher = MicroBatcher(
+            retriever,
+            embed_batch=embedder,
+            max_wait_ms=args.max_wait_ms,
+            max_batch=max_batch,
+        )
+
+        async def submit(text: str, k: int, batcher=batcher):
+            return await batcher.submit([text], k)
+
+        latencies, elapsed = await _drive(
+            submit, args.requests, args.concurrency, args.k
+        )
+        await batcher.stop()
+        _report(label, latencies, elapsed)
+        logger.info(
+            "%-12s embed calls=%d  mean batch=%.1f",
+            label,
+            embedder.calls,
+            batcher.requests / max(batcher.batches, 1),
+        )
+
+
+async def run_http(args) -> None:
+    import requests
+
+    session = requests.Session()
+    loop = asyncio.get_running_loop()
+
+    async def submit(text: str, k: int):
+        return await loop.run_in_executor(
+            None,
+            lambda: session.post(
+                f"{args.url}/search", json={"query": text, "k": k}
+            ).json(),
+        )
+
+    latencies, elapsed = await _drive(submit, args.requests, args.concurrency, args.k)
+    _report("http", latencies, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--call-ms", type=float, default=20.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.2)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--url", help="Benchmark a running server instead")
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run_http(args))
+    else:
+        asyncio.run(run_in_process(args))
+
+
+if __name__ == "__main__":
+    main()
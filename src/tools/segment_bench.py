@@ -0,0 +1,109 @@
+"""Throughput benchmark: UMAP + clustering vs TextTiling segment boundaries.
+
+Generates a synthetic corpus of documents whose window embeddings are drawn
+around a few topic centroids in contiguous runs (so the true boundaries are
+known), then times both boundary methods on the same window vectors and
+reports documents/s plus boundary recall and precision within one window.
+
+    PYTHONPATH=src python src/tools/segment_bench.py --docs 50 --windows 60
+
+No embedding API calls are made; only the boundary step is measured, which
+is the part ``boundary_method`` changes.
+"""
+
+import argparse
+import time
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from core.logger import get_logger
+from core.parsing.semantic_chunk import _cluster_embeddings
+from core.parsing.texttiling import texttiling_boundaries
+
+logger = get_logger(__name__)
+
+
+def synthetic_corpus(
+    docs: int, windows: int, topics: int, dim: int, noise: float, seed: int = 0
+) -> List[Tuple[np.ndarray, List[int]]]:
+    """Return ``(window_vectors, true_boundaries)`` per document.
+
+    Each document is a run of half-window units drawn around ``topics``
+    centroids; windows average two consecutive units, mimicking the 50%
+    overlap of ``window_tokens``/``step_tokens`` in the segmenters.
+    """
+    rng = np.random.default_rng(seed)
+    corpus = []
+    units = windows + 1
+    for _ in range(docs):
+        cuts = np.sort(rng.choice(np.arange(3, units - 2), topics - 1, replace=False))
+        lengths = np.diff(np.concatenate([[0], cuts, [units]]))
+        centers = rng.standard_normal((topics, dim))
+        rows = np.repeat(centers, lengths, axis=0)
+        rows += noise * rng.standard_normal(rows.shape)
+        vectors = (rows[:-1] + rows[1:]) / 2
+        corpus.append((vectors.astype("float32"), cuts.tolist()))
+    return corpus
+
+
+def _cluster_boundaries(vectors: np.ndarray) -> List[int]:
+    labels = _cluster_embeddings(vectors, "spectral")
+    return [i for i in range(1, len(labels)) if labels[i] != labels[i - 1]]
+
+
+def _recall(found: Sequence[int], truth: Sequence[int], tolerance: int = 1) -> float:
+    """Share of ``truth`` with a ``found`` boundary within ``tolerance``."""
+    hits = sum(any(abs(f - t) <= tolerance for f in found) for t in truth)
+    return hits / max(len(truth), 1)
+
+
+def run(
+    name: str,
+    method: Callable[[np.ndarray], List[int]],
+    corpus: List[Tuple[np.ndarray, List[int]]],
+) -> None:
+    recalls, precisions = [], []
+    start = time.perf_counter()
+    for vectors, truth in corpus:
+        found = method(vectors)
+        recalls.append(_recall(found, truth))
+        precisions.append(_recall(truth, found) if found else 1.0)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "%-10s %8.1f docs/s  %7.2f ms/doc  recall@±1 %.2f  precision@±1 %.2f",
+        name,
+        len(corpus) / elapsed,
+        1000 * elapsed / len(corpus),
+        float(np.mean(recalls)),
+        float(np.mean(precisions)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--windows", type=int, default=60)
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--noise", type=float, default=0.6)
+    parser.add_argument("--skip-cluster", action="store_true")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(
+        args.docs, args.windows, args.topics, args.dim, args.noise
+    )
+    logger.info(
+        "%d docs x %d windows (%d topics, dim %d)",
+        args.docs,
+        args.windows,
+        args.topics,
+        args.dim,
+    )
+    run("texttiling", texttiling_boundaries, corpus)
+    if not args.skip_cluster:
+        run("cluster", _cluster_boundaries, corpus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Accuracy check: pooled vs re-embedded segment vectors.
+
+Runs :func:`core.parsing.semantic_chunk.semantic_chunk` with
+``segment_vectors="pooled"`` over a sample of parsed documents, re-embeds the
+same segment texts with the API, and reports the cosine similarity between
+the two plus how often each segment's nearest neighbour (among all sampled
+segments) is the same under both. Also prints the tokens the pooled mode
+avoids, so the trade-off can be chosen per corpus.
+
+    PYTHONPATH=src python src/tools/segment_pooling_check.py --limit 20
+
+This calls the embedding API (and charges the budget tracker) for both the
+window pass and the reference pass.
+"""
+
+import argparse
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from core.configuration.config_registry import get_path_config
+from core.embeddings.embedder import embed_text, embed_text_batch
+from core.logger import get_logger
+from core.parsing.semantic_chunk import semantic_chunk
+
+logger = get_logger(__name__)
+
+
+def _unit(rows: List[List[float]]) -> np.ndarray:
+    X = np.asarray(rows, dtype="float32")
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms
+
+
+def compare(pooled: np.ndarray, reference: np.ndarray) -> dict:
+    """Cosine agreement and nearest-neighbour agreement of two vector sets."""
+    cos = np.einsum("ij,ij->i", pooled, reference)
+    summary = {
+        "segments": int(len(cos)),
+        "cos_mean": float(cos.mean()),
+        "cos_p05": float(np.percentile(cos, 5)),
+        "cos_min": float(cos.min()),
+    }
+    if len(cos) > 2:
+        sims_p = pooled @ pooled.T
+        sims_r = reference @ reference.T
+        np.fill_diagonal(sims_p, -np.inf)
+        np.fill_diagonal(sims_r, -np.inf)
+        summary["nn_agreement"] = float(
+            np.mean(sims_p.argmax(axis=1) == sims_r.argmax(axis=1))
+        )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", type=Path, default=None, help="Parsed .txt dir")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--model", default="text-embedding-3-large")
+    parser.add_argument("--boundary", default="cluster")
+    args = parser.parse_args()
+
+    source = args.dir or get_path_config().parsed
+    files = sorted(source.glob("*.txt"))[: args.limit]
+    pooled_rows: List[List[float]] = []
+    reference_rows: List[List[float]] = []
+    saved_tokens = 0
+    for path in files:
+        text = path.read_text(encoding="utf-8")
+        if not text.strip():
+            continue
+        segments = semantic_chunk(
+            text,
+            model=args.model,
+            boundary_method=args.boundary,
+            segment_vectors="pooled",
+        )
+        reference = embed_text_batch(
+            [seg["text"] for seg in segments], model=args.model, embedder=embed_text
+        )
+        pooled_rows.extend(seg["embedding"] for seg in segments)
+        reference_rows.extend(reference)
+        saved_tokens += sum(seg["end"] - seg["start"] for seg in segments)
+
+    if not pooled_rows:
+        logger.warning("No segments produced from %s", source)
+        return
+    summary = compare(_unit(pooled_rows), _unit(reference_rows))
+    summary["tokens_saved"] = saved_tokens
+    for key, value in summary.items():
+        logger.info("%-14s %s", key, value)
+
+
+if __name__ == "__main__":
+    main()
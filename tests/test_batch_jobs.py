@@ -0,0 +1,233 @@
+import json
+
+import pytest
+
+from core.configuration.path_config import PathConfig
+
+
+@pytest.fixture(autouse=True)
+def _prompt_template(monkeypatch):
+    from core.llm import invoke
+    from core.workflows import main_commands
+
+    monkeypatch.setattr(invoke, "load_prompt", lambda name: f"[{name}] {{text}}")
+    monkeypatch.setattr(
+        main_commands, "count_prompt_tokens", lambda text: len(text.split())
+    )
+
+
+def _paths(tmp_path) -> PathConfig:
+    paths = PathConfig(root=tmp_path)
+    paths.parsed.mkdir()
+    paths.metadata.mkdir()
+    return paths
+
+
+def _write_docs(paths: PathConfig) -> None:
+    (paths.parsed / "short.txt").write_text("A short planning note.", encoding="utf-8")
+    (paths.parsed / "long.txt").write_text(
+        "\n\n".join(f"Paragraph {i} about architecture." * 250 for i in range(3)),
+        encoding="utf-8",
+    )
+    (paths.parsed / "done.txt").write_text("Already classified.", encoding="utf-8")
+    (paths.metadata / "done.txt.meta.json").write_text("{}", encoding="utf-8")
+
+
+def test_local_batch_round_trip(tmp_path):
+    # Imported here so the openai shims installed by other test modules at
+    # collection time are in place first.
+    from core.workflows import batch_jobs
+
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+    names = sorted(p.name for p in paths.parsed.glob("*.txt"))
+
+    job_dir = batch_jobs.prepare_batch(
+        names, chunked=True, segmentation="paragraph", paths=paths, pack_tokens=1500
+    )
+    manifest = batch_jobs.load_manifest(job_dir)
+    requests = (job_dir / "requests.jsonl").read_text("utf-8").splitlines()
+    assert manifest["state"] == "prepared"
+    assert set(manifest["documents"]) == {"short.txt", "long.txt"}
+    assert manifest["documents"]["long.txt"]["chunks"] == 3
+    assert len(requests) == manifest["requests"]
+    first = json.loads(requests[0])
+    assert first["url"] == "/v1/chat/completions"
+    assert first["custom_id"].endswith("::0")
+
+    batch_jobs.submit_batch(job_dir, batch_jobs.LocalBatchExecutor())
+    assert batch_jobs.load_manifest(job_dir)["executor"] == "local"
+
+    status = batch_jobs.collect_batch(
+        job_dir, batch_jobs.get_batch_executor("local"), paths=paths
+    )
+    assert status == {"short.txt": "done", "long.txt": "done"}
+    meta = json.loads((paths.metadata / "long.txt.meta.json").read_text("utf-8"))
+    assert meta["category"] == "batch"
+    assert batch_jobs.load_manifest(job_dir)["state"] == "collected"
+    assert batch_jobs.latest_batch(paths) == job_dir
+
+
+def test_failed_documents_are_reported_and_requeued(tmp_path):
+    from core.workflows import batch_jobs
+
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+    names = ["short.txt", "long.txt"]
+
+    def respond(prompt):
+        return (
+            "not json"
+            if "short planning" in prompt
+            else batch_jobs.fake_summary(prompt)
+        )
+
+    job_dir = batch_jobs.prepare_batch(
+        names, segmentation="paragraph", paths=paths, job_dir=tmp_path / "job1"
+    )
+    batch_jobs.submit_batch(job_dir, batch_jobs.LocalBatchExecutor(respond))
+    status = batch_jobs.collect_batch(
+        job_dir, batch_jobs.LocalBatchExecutor(), paths=paths
+    )
+
+    assert status["long.txt"] == "done"
+    assert status["short.txt"].startswith("error: Could not parse")
+    assert not (paths.metadata / "short.txt.meta.json").exists()
+
+    retry = batch_jobs.prepare_batch(names, paths=paths, job_dir=tmp_path / "job2")
+    assert list(batch_jobs.load_manifest(retry)["documents"]) == ["short.txt"]
+
+
+def test_collect_waits_for_unfinished_batch(tmp_path):
+    from core.workflows import batch_jobs
+
+    class _Pending(batch_jobs.LocalBatchExecutor):
+        def status(self, batch_id):
+            return "in_progress"
+
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+    job_dir = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+    batch_jobs.submit_batch(job_dir, _Pending())
+
+    assert batch_jobs.collect_batch(job_dir, _Pending(), paths=paths) == {}
+    assert batch_jobs.load_manifest(job_dir)["state"] == "submitted"
+    assert not (paths.metadata / "short.txt.meta.json").exists()
+
+
+def test_second_submit_skips_documents_in_open_batch(tmp_path):
+    from core.workflows import batch_jobs
+
+    class _Pending(batch_jobs.LocalBatchExecutor):
+        def status(self, batch_id):
+            return "in_progress"
+
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+    first = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+    batch_jobs.submit_batch(first, _Pending())
+    second = batch_jobs.prepare_batch(
+        ["short.txt", "long.txt"], segmentation="paragraph", paths=paths
+    )
+
+    assert first != second
+    assert list(batch_jobs.load_manifest(second)["documents"]) == ["long.txt"]
+    assert batch_jobs.open_batch_documents(paths) == {
+        "short.txt": batch_jobs.load_manifest(first)["job_id"]
+    }
+
+
+def test_dead_batch_is_failed_and_requeued(tmp_path):
+    from core.workflows import batch_jobs
+
+    class _Expired(batch_jobs.LocalBatchExecutor):
+        def status(self, batch_id):
+            return "expired"
+
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+    job_dir = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+    batch_jobs.submit_batch(job_dir, _Expired())
+
+    status = batch_jobs.collect_batch(job_dir, _Expired(), paths=paths)
+    manifest = batch_jobs.load_manifest(job_dir)
+    assert status == {"short.txt": "error: batch expired"}
+    assert manifest["state"] == "failed"
+    assert manifest["documents"]["short.txt"]["status"] == "pending"
+    assert batch_jobs.open_batch_documents(paths) == {}
+    retry = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+    assert list(batch_jobs.load_manifest(retry)["documents"]) == ["short.txt"]
+    with pytest.raises(ValueError, match="expired"):
+        batch_jobs.collect_batch(job_dir, _Expired(), paths=paths)
+
+
+def test_budget_counts_only_usage_of_collected_batches(tmp_path, monkeypatch):
+    from core.llm.invoke import completion_cost
+    from core.utils.budget_tracker import BudgetTracker
+    from core.workflows import batch_jobs
+
+    class _Expired(batch_jobs.LocalBatchExecutor):
+        def status(self, batch_id):
+            return "expired"
+
+    tracker = BudgetTracker(max_usd=1.0)
+    monkeypatch.setattr(batch_jobs, "get_budget_tracker", lambda: tracker)
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+
+    failed = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+    estimate = batch_jobs.load_manifest(failed)["estimated_usd"]
+    batch_jobs.submit_batch(failed, _Expired())
+    batch_jobs.collect_batch(failed, _Expired(), paths=paths)
+    assert tracker.spent == 0.0
+
+    retry = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+    batch_jobs.submit_batch(retry, batch_jobs.LocalBatchExecutor())
+    assert tracker.spent == 0.0
+    batch_jobs.collect_batch(retry, batch_jobs.LocalBatchExecutor(), paths=paths)
+    batch_jobs.collect_batch(retry, batch_jobs.LocalBatchExecutor(), paths=paths)
+
+    usage = [
+        json.loads(line)["response"]["body"]["usage"]
+        for line in (retry / "results.jsonl").read_text("utf-8").splitlines()
+    ]
+    actual = batch_jobs.BATCH_DISCOUNT * sum(
+        completion_cost("gpt-4", u["prompt_tokens"], u["completion_tokens"])
+        for u in usage
+    )
+    assert batch_jobs.load_manifest(retry)["charged_usd"] == pytest.approx(actual)
+    assert tracker.spent == pytest.approx(actual, abs=1e-6)
+    assert 0 < tracker.spent < estimate
+
+
+def test_submit_refuses_batch_whose_estimate_exceeds_budget(tmp_path, monkeypatch):
+    from core.utils.budget_tracker import BudgetTracker
+    from core.workflows import batch_jobs
+
+    tracker = BudgetTracker(max_usd=0.0001)
+    monkeypatch.setattr(batch_jobs, "get_budget_tracker", lambda: tracker)
+    paths = _paths(tmp_path)
+    _write_docs(paths)
+    job_dir = batch_jobs.prepare_batch(["short.txt"], paths=paths)
+
+    with pytest.raises(RuntimeError):
+        batch_jobs.submit_batch(job_dir, batch_jobs.LocalBatchExecutor())
+    assert batch_jobs.load_manifest(job_dir)["state"] == "prepared"
+    assert tracker.spent == 0.0
+
+
+def test_openai_download_falls_back_to_error_file(tmp_path):
+    from types import SimpleNamespace
+
+    from core.workflows import batch_jobs
+
+    executor = batch_jobs.OpenAIBatchExecutor.__new__(batch_jobs.OpenAIBatchExecutor)
+    batch = SimpleNamespace(output_file_id=None, error_file_id="file-err")
+    executor.client = SimpleNamespace(
+        batches=SimpleNamespace(retrieve=lambda batch_id: batch),
+        files=SimpleNamespace(
+            content=lambda file_id: SimpleNamespace(read=lambda: file_id.encode())
+        ),
+    )
+    executor.download("batch_1", tmp_path / "results.jsonl")
+    assert (tmp_path / "results.jsonl").read_text() == "file-err"
@@ -0,0 +1,139 @@
+import multiprocessing
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.utils.budget_tracker import BudgetTracker
+
+
+def test_settle_charges_usage_and_releases_the_rest():
+    tracker = BudgetTracker(max_usd=1.0)
+    reservation = tracker.reserve(0.6)
+    assert reservation is not None
+    assert tracker.reserve(0.6) is None  # 0.6 is still held
+
+    reservation.settle(0.1)
+    assert tracker.spent == pytest.approx(0.1)
+    assert tracker.reserve(0.6) is not None
+    reservation.settle(0.5)  # settling twice is a no-op
+    assert tracker.spent == pytest.approx(0.1)
+
+
+def test_failed_request_releases_its_reservation(tmp_path):
+    tracker = BudgetTracker(max_usd=1.0, ledger_path=tmp_path / "ledger.sqlite")
+    with pytest.raises(RuntimeError):
+        with tracker.reserve(0.8):
+            raise RuntimeError("API error")
+    assert tracker.spent == 0.0
+
+    with tracker.reserve(0.8):
+        pass  # no usage reported: the estimate is charged
+    assert tracker.total_spent() == pytest.approx(0.8)
+
+
+def test_charge_records_spend_without_a_reservation(tmp_path):
+    tracker = BudgetTracker(max_usd=1.0, ledger_path=tmp_path / "ledger.sqlite")
+    tracker.charge(0.4)
+    assert tracker.reserve(0.7) is None
+    tracker.charge(0.8)  # already billed, so recorded past the limit
+    assert tracker.total_spent() == pytest.approx(1.2)
+    assert not tracker.check(0.01)
+
+
+def test_ledger_writes_are_batched_across_threads(tmp_path):
+    tracker = BudgetTracker(
+        max_usd=100.0, ledger_path=tmp_path / "ledger.sqlite", lease_usd=1.0
+    )
+    ok = []
+
+    def work():
+        for _ in range(2000):
+            reservation = tracker.reserve(0.001)
+            ok.append(reservation is not None)
+            reservation.settle(0.0005)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert all(ok) and len(ok) == 16000
+    assert tracker.total_spent() == pytest.approx(8.0)
+    # 16k requests, a few lease refills and periodic flushes.
+    assert tracker.ledger_writes < 40
+    assert elapsed < 5
+
+
+def _spend_until_refused(path, cost, queue):
+    tracker = BudgetTracker(max_usd=2.0, ledger_path=path, lease_usd=0.25)
+    calls = 0
+    while tracker.check(cost):
+        calls += 1
+    tracker.close()
+    queue.put(calls)
+
+
+def test_processes_share_one_budget(tmp_path):
+    path = tmp_path / "ledger.sqlite"
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_spend_until_refused, args=(path, 0.01, queue))
+        for _ in range(4)
+    ]
+    for proc in procs:
+        proc.start()
+    calls = sum(queue.get(timeout=60) for _ in procs)
+    for proc in procs:
+        proc.join()
+
+    total = BudgetTracker(max_usd=2.0, ledger_path=path).total_spent()
+    assert total == pytest.approx(calls * 0.01)
+    # Never over budget; at most the other processes' leases left unused.
+    assert 2.0 - 3 * 0.25 <= total <= 2.0 + 1e-9
+
+
+def test_stale_lease_is_reclaimed(tmp_path):
+    path = tmp_path / "ledger.sqlite"
+    quiet = BudgetTracker(1.0, ledger_path=path, lease_usd=1.0, flush_interval=0)
+    assert quiet.check(0.2)  # holds the whole budget
+
+    assert BudgetTracker(1.0, ledger_path=path).reserve(0.5) is None
+    other = BudgetTracker(1.0, ledger_path=path, lease_usd=0.1, lease_ttl=0)
+    assert other.reserve(0.5) is not None
+
+    # The quiet process notices its lease shrank back to its spend.
+    assert quiet.reserve(0.5) is None
+    assert quiet.reserve(0.3) is not None
+
+
+def test_completion_settles_with_reported_usage(monkeypatch):
+    # Imported here so the openai shims installed by other test modules at
+    # collection time are in place first.
+    from core.llm import invoke
+
+    tracker = BudgetTracker(max_usd=1.0)
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+        usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=100),
+    )
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **_: response))
+    )
+    encoding = SimpleNamespace(encode=lambda text, disallowed_special=(): [0] * 1000)
+    monkeypatch.setattr(invoke, "get_openai_client", lambda api_key=None: client)
+    monkeypatch.setattr(invoke, "get_budget_tracker", lambda: tracker)
+    monkeypatch.setattr(invoke, "get_rate_limiter", lambda: None)
+    monkeypatch.setattr(
+        invoke, "tiktoken", SimpleNamespace(encoding_for_model=lambda m: encoding)
+    )
+
+    invoke.run_openai_completion("prompt", model="gpt-4", use_cache=False)
+
+    # Reserved 1000 prompt + 700 max completion tokens; charged 1000 + 100.
+    assert tracker.spent == pytest.approx(0.03 + 0.006)
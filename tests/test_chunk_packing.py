@@ -0,0 +1,39 @@
+from core.parsing.token_chunker import pack_chunks
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def test_pack_chunks_fills_bins_in_order():
+    chunks = ["a b c", "d e", "", "f g h i", "j"]
+    bins = pack_chunks(chunks, 8, overhead=2, count_tokens=_words, separator=" | ")
+    # 2 + 3 + 1 + 2 = 8 fits; "f g h i" would overflow.
+    assert bins == ["a b c | d e", "f g h i | j"]
+
+
+def test_oversized_chunk_gets_its_own_bin():
+    chunks = ["x " * 20, "y", "z"]
+    bins = pack_chunks(chunks, 5, count_tokens=_words, separator=" ")
+    assert bins == ["x " * 20, "y z"]
+
+
+def test_pack_reports_calls_and_template_tokens_saved(monkeypatch):
+    # Imported here so the openai shims installed by other test modules at
+    # collection time are in place first.
+    from core.llm import invoke
+    from core.workflows import main_commands
+
+    monkeypatch.setattr(invoke, "load_prompt", lambda name: "Summarize this: {text}")
+    chunks = [f"sentence number {i}" for i in range(10)]  # 3 words each
+
+    bins, stats = main_commands.pack(chunks, "standard", 15, count_tokens=_words)
+
+    # Template is 2 words; 2 + 3 * 4 + separators (0 words) = 14 per bin.
+    assert len(bins) == 3
+    assert bins[0] == "\n\n".join(chunks[:4])
+    assert stats == {"chunks": 10, "calls": 3, "calls_saved": 7, "tokens_saved": 14}
+
+    unpacked, stats = main_commands.pack(chunks, "standard", 0, count_tokens=_words)
+    assert unpacked == chunks
+    assert stats["calls_saved"] == 0
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from core.configuration.path_config import PathConfig
+
+
+def _paths(tmp_path) -> PathConfig:
+    paths = PathConfig(root=tmp_path)
+    paths.parsed.mkdir()
+    paths.metadata.mkdir()
+    return paths
+
+
+def test_classify_many_runs_concurrently_and_reports_status(tmp_path, monkeypatch):
+    # Imported here so the openai shims installed by other test modules at
+    # collection time are in place first.
+    from core.workflows import main_commands
+
+    paths = _paths(tmp_path)
+    (paths.metadata / "done.txt.meta.json").write_text("{}", encoding="utf-8")
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_classify(name, chunked=False, segmentation="semantic", paths=None, **_):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if name == "bad.txt":
+            raise ValueError("boom")
+        (paths.metadata / f"{name}.meta.json").write_text("{}", encoding="utf-8")
+
+    monkeypatch.setattr(main_commands, "classify", fake_classify)
+    names = ["done.txt", "bad.txt"] + [f"doc{i}.txt" for i in range(8)]
+
+    status = main_commands.classify_many(
+        names, concurrency=4, paths=paths, progress=False
+    )
+
+    assert status["done.txt"] == "skipped"
+    assert status["bad.txt"] == "error: boom"
+    assert all(status[f"doc{i}.txt"] == "done" for i in range(8))
+    assert peak[0] == 4
+    assert len(list(paths.metadata.glob("*.meta.json"))) == 9
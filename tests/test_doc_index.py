@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from core.retrieval import retriever as retriever_mod
+from core.retrieval.doc_index import DocumentIndex
+from core.vectorstore.faiss_store import FaissStore
+
+NAMES = {
+    1: "docA_chunk00",
+    2: "docB_chunk00",
+    3: "docA_chunk01",
+    4: "docB_chunk01",
+    5: "docC",
+}
+VECS = {
+    1: [1.0, 0.0, 0.0],
+    2: [0.6, 0.8, 0.0],
+    3: [0.0, 1.0, 0.0],
+    4: [0.6, 0.8, 0.0],
+    5: [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    pytest.importorskip("faiss")
+    s = FaissStore(dim=3, path=tmp_path / "mosaic.index")
+    s.add(list(VECS), np.asarray(list(VECS.values()), dtype="float32"))
+    return s
+
+
+def test_build_groups_chunks_by_document(store, tmp_path):
+    index = DocumentIndex.build(store, NAMES)
+    assert index.doc_names == ["docA", "docB", "docC"]
+    assert list(index.offsets) == [0, 2, 4, 5]
+    assert sorted(index.chunk_slice(0)) == [1, 3]
+
+    index.save(tmp_path / "doc_index.npz")
+    loaded = DocumentIndex.load(tmp_path / "doc_index.npz", store)
+    assert loaded.doc_names == index.doc_names
+    assert np.allclose(loaded.centroids, index.centroids)
+
+    store.add([6], np.array([[0.0, 0.6, 0.8]], dtype="float32"))
+    assert DocumentIndex.load(tmp_path / "doc_index.npz", store) is None
+
+
+@pytest.mark.parametrize(
+    "pooling, expected",
+    [("max", ["docA", "docB"]), ("mean", ["docB", "docA"]), ("sum", ["docB", "docA"])],
+)
+def test_pooling_modes(store, pooling, expected):
+    index = DocumentIndex.build(store, NAMES)
+    hits = index.search(store, np.array([1.0, 0.0, 0.0]), k=2, pooling=pooling)
+    assert [index.doc_names[code] for code, _ in hits] == expected
+
+
+def test_aggregate_query_uses_document_index(store, monkeypatch):
+    monkeypatch.setattr(
+        retriever_mod, "embed_text", lambda text, model="d": [1.0, 0.0, 0.0]
+    )
+    r = retriever_mod.Retriever.__new__(retriever_mod.Retriever)
+    r.store = store
+    r.model = "dummy"
+    r.id_map = NAMES
+    r.chunk_dir = None
+    r.doc_index = DocumentIndex.build(store, NAMES)
+
+    results = r.query_multi(["q"], k=3, aggregate=True, pooling="max")
+    assert [name for name, _ in results] == ["docA", "docB", "docC"]
+    assert results[0][1] == pytest.approx(1.0)
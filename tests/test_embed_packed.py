@@ -0,0 +1,92 @@
+import importlib
+import threading
+import types
+
+import numpy as np
+import tiktoken
+
+from core.embeddings import embedder
+
+topic_segmenter = importlib.import_module("core.parsing.topic_segmenter")
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def create(self, input, model):
+        with self.lock:
+            self.calls.append(list(input))
+        data = [
+            types.SimpleNamespace(embedding=[float("Cats" in text), 1.0])
+            for text in input
+        ]
+        return types.SimpleNamespace(data=data)
+
+
+def _fake_client(monkeypatch):
+    fake = FakeEmbeddings()
+    monkeypatch.setattr(
+        embedder, "_get_client", lambda: types.SimpleNamespace(embeddings=fake)
+    )
+    monkeypatch.setattr(embedder, "get_budget_tracker", lambda: None)
+    return fake
+
+
+def test_pack_requests_respects_token_and_input_limits():
+    assert embedder.pack_requests([3, 3, 3, 3], max_tokens=6, max_inputs=10) == [
+        range(0, 2),
+        range(2, 4),
+    ]
+    assert embedder.pack_requests([1] * 5, max_tokens=100, max_inputs=2) == [
+        range(0, 2),
+        range(2, 4),
+        range(4, 5),
+    ]
+    # An input larger than the budget still gets its own request.
+    assert embedder.pack_requests([10, 1], max_tokens=5) == [range(0, 1), range(1, 2)]
+    assert embedder.pack_requests([]) == []
+
+
+def test_embed_packed_preserves_order_across_concurrent_requests(monkeypatch):
+    fake = _fake_client(monkeypatch)
+    texts = [f"Cats {i}" if i % 2 else f"Dogs {i}" for i in range(7)]
+
+    vectors = embedder.embed_packed(
+        texts, token_counts=[1] * 7, concurrency=3, max_inputs=2
+    )
+
+    assert len(fake.calls) == 4
+    assert vectors == [[float(i % 2), 1.0] for i in range(7)]
+
+
+def test_segment_topics_batches_windows_and_reports_timings(monkeypatch):
+    class DummyEncoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+        def decode(self, tokens):
+            return " ".join(tokens)
+
+        def decode_batch(self, batch):
+            return [self.decode(tokens) for tokens in batch]
+
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: DummyEncoding())
+    fake = _fake_client(monkeypatch)
+
+    text = ("Cats purr. " * 20) + ("Python codes. " * 20)
+    segments = topic_segmenter.segment_topics(
+        text, window_tokens=10, step_tokens=5, boundary_method="texttiling"
+    )
+
+    assert len(fake.calls) == 1
+    assert len(fake.calls[0]) == 16
+    assert len(segments) == 2
+    assert segments[0]["text"].startswith("Cats")
+    assert segments[-1]["end"] == 80
+    timings = segments[0]["timings"]
+    assert set(timings) == {"tokenize", "decode", "embed", "reduce", "cluster"}
+    assert all(np.isfinite(v) and v >= 0 for v in timings.values())
+    timings["embed"] = -1.0
+    assert segments[1]["timings"]["embed"] >= 0
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from core.configuration.path_config import PathConfig
+from core.utils.job_journal import JobJournal, fingerprint
+
+try:
+    # Bound before test_pipeline installs its faiss stub at collection time.
+    import faiss
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    faiss = None
+
+
+def test_resume_reopens_last_unfinished_job(tmp_path):
+    journal = JobJournal(tmp_path / "journal.sqlite")
+    first = journal.begin("classify-all", {"chunked": True})
+    assert journal.begin("classify-all", resume=True).id == first.id
+    assert journal.begin("pipeline", resume=True).id != first.id
+
+    first.finish()
+    assert journal.begin("classify-all", resume=True).id != first.id
+    assert first.info()["params"] == {"chunked": True}
+
+
+def test_resume_refuses_job_started_with_other_params(tmp_path):
+    journal = JobJournal(tmp_path / "journal.sqlite")
+    first = journal.begin("classify-all", {"chunked": True, "overwrite": False})
+
+    with pytest.raises(ValueError, match="chunked"):
+        journal.begin(
+            "classify-all", {"chunked": False, "overwrite": False}, resume=True
+        )
+    same = journal.begin(
+        "classify-all", {"overwrite": False, "chunked": True}, resume=True
+    )
+    assert same.id == first.id
+
+
+def test_track_counts_attempts_and_keeps_errors(tmp_path):
+    job = JobJournal(tmp_path / "journal.sqlite").begin("pipeline")
+
+    with pytest.raises(RuntimeError):
+        with job.track("a.txt", "classified", "1:1"):
+            raise RuntimeError("rate limited")
+    assert job.state("a.txt", "classified") == {
+        "state": "failed",
+        "attempts": 1,
+        "error": "rate limited",
+        "fingerprint": "1:1",
+    }
+    assert job.failures()[0]["doc"] == "a.txt"
+    assert not job.complete()
+
+    with job.track("a.txt", "classified", "1:1"):
+        pass
+    assert job.state("a.txt", "classified")["attempts"] == 2
+    assert job.summary() == {"classified": {"done": 1}}
+    assert job.complete()
+    assert job.info()["finished"] is not None
+
+
+def test_pending_skips_done_unless_input_changed(tmp_path):
+    journal = JobJournal(tmp_path / "journal.sqlite")
+    job = journal.begin("classify-all")
+    job.record_status("a.txt", "classified", "done", "1:1")
+    job.record_status("b.txt", "classified", "skipped", "2:2")
+    job.record_status("c.txt", "classified", "error: boom")
+    job.mark("d.txt", "classified", "running")  # interrupted mid-call
+
+    fps = {"a.txt": "1:1", "b.txt": "2:3", "c.txt": "3:3", "d.txt": "4:4"}
+    resumed = journal.begin("classify-all", resume=True)
+    assert resumed.pending([*fps, "e.txt"], "classified", fps) == [
+        "b.txt",
+        "c.txt",
+        "d.txt",
+        "e.txt",
+    ]
+    assert resumed.state("c.txt", "classified")["error"] == "boom"
+
+
+def test_resumed_embedding_reuses_checkpointed_vectors(tmp_path, monkeypatch):
+    if faiss is None:
+        pytest.skip("faiss not installed")
+    # Imported here so the openai shims installed by other test modules at
+    # collection time are in place first.
+    from core.embeddings import embedder
+
+    paths = PathConfig(root=tmp_path)
+    paths.parsed.mkdir()
+    paths.vector.mkdir(parents=True)
+    for name in ("a", "b", "c"):
+        (paths.parsed / f"{name}.txt").write_text(f"text {name}", encoding="utf-8")
+    monkeypatch.setattr(embedder, "get_path_config", lambda force_reload=False: paths)
+
+    calls = []
+
+    def fake_embed(text, model="text-embedding-3-small"):
+        calls.append(text)
+        if text == "text b" and len(calls) <= 3:
+            raise RuntimeError("timeout")
+        return [float(len(calls))] * embedder.MODEL_DIMS[model]
+
+    monkeypatch.setattr(embedder, "embed_text", fake_embed)
+    out = tmp_path / "embeddings.json"
+    journal = JobJournal(tmp_path / "journal.sqlite")
+    job = journal.begin("pipeline")
+
+    embedder.generate_embeddings(
+        out_path=out, model="text-embedding-3-small", segment_mode=False, job=job
+    )
+    assert calls == ["text a", "text b", "text c"]
+    assert job.state("b.txt", "embedded")["state"] == "failed"
+    assert (tmp_path / "embeddings.json.partial.jsonl").exists()
+
+    resumed = journal.begin("pipeline", resume=True)
+    embedder.generate_embeddings(
+        out_path=out, model="text-embedding-3-small", segment_mode=False, job=resumed
+    )
+    assert calls[3:] == ["text b"]
+    vectors = json.loads(out.read_text())
+    assert sorted(vectors) == ["a", "b", "c"]
+    assert vectors["a"][0] == 1.0
+    assert resumed.state("b.txt", "embedded")["attempts"] == 2
+    assert not (tmp_path / "embeddings.json.partial.jsonl").exists()
+    assert (
+        fingerprint(paths.parsed / "a.txt")
+        == resumed.state("a.txt", "embedded")["fingerprint"]
+    )
@@ -0,0 +1,135 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm import cache as cache_module
+from core.llm.cache import ResponseCache, bypass_cache, make_response_key
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    monkeypatch.delenv("LLM_CACHE", raising=False)
+    monkeypatch.setattr(cache_module, "_instance", None)
+    return cache_module.get_response_cache()
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    from core.llm import invoke
+
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=' {"a": 1} '))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=500),
+        )
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(invoke, "get_openai_client", lambda api_key=None: client)
+    monkeypatch.setattr(invoke, "get_budget_tracker", lambda: None)
+    monkeypatch.setattr(invoke, "get_rate_limiter", lambda: None)
+    return invoke, calls
+
+
+def test_key_depends_on_every_request_parameter():
+    base = make_response_key("gpt-4", 0.4, 700, "prompt")
+    assert base == make_response_key("gpt-4", 0.4, 700, "prompt")
+    assert base != make_response_key("gpt-4o", 0.4, 700, "prompt")
+    assert base != make_response_key("gpt-4", 0.0, 700, "prompt")
+    assert base != make_response_key("gpt-4", 0.4, 100, "prompt")
+    assert base != make_response_key("gpt-4", 0.4, 700, "prompt!")
+
+
+def test_cache_persists_and_evicts_least_recently_used(tmp_path):
+    path = tmp_path / "llm.sqlite"
+    cache = ResponseCache(path, max_bytes=30)
+    cache.put("a", "gpt-4", "x" * 10, cost=0.5)
+    cache.put("b", "gpt-4", "y" * 10)
+    assert cache.get("a") == "x" * 10  # "b" is now least recently used
+    cache.put("c", "gpt-4", "z" * 15)
+
+    reopened = ResponseCache(path, max_bytes=30)
+    assert reopened.get("b") is None
+    assert reopened.get("a") == "x" * 10
+    assert reopened.get("c") == "z" * 15
+    assert reopened.stats() == {"hits": 2, "misses": 1, "usd_saved": 0.5}
+
+
+def test_run_openai_completion_reuses_cached_response(response_cache, fake_openai):
+    invoke, calls = fake_openai
+
+    first = invoke.run_openai_completion("hello", api_key="k")
+    second = invoke.run_openai_completion("hello", api_key="k")
+    assert first == second == '{"a": 1}'
+    assert len(calls) == 1
+
+    invoke.run_openai_completion("hello", api_key="k", max_tokens=50)
+    assert len(calls) == 2
+    stats = response_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["usd_saved"] == pytest.approx(1000 / 1000 * 0.03 + 500 / 1000 * 0.06)
+
+
+def test_bypass_skips_cache_reads_and_writes(response_cache, fake_openai):
+    invoke, calls = fake_openai
+
+    invoke.run_openai_completion("hello", api_key="k", use_cache=False)
+    with bypass_cache():
+        invoke.run_openai_completion("hello", api_key="k")
+    invoke.run_openai_completion("hello", api_key="k")
+
+    assert len(calls) == 3
+    assert len(response_cache) == 1
+
+
+def test_unparseable_summary_is_not_replayed(response_cache, fake_openai, monkeypatch):
+    invoke, calls = fake_openai
+    monkeypatch.setattr(invoke, "load_prompt", lambda name: "Summarize: {text}")
+    monkeypatch.setattr(
+        invoke,
+        "run_openai_completion",
+        lambda **kwargs: (
+            response_cache.put(
+                make_response_key("gpt-4", 0.4, 700, kwargs["prompt"]), "gpt-4", "oops"
+            )
+            or "oops"
+        ),
+    )
+
+    with pytest.raises(ValueError):
+        invoke.summarize_text("doc", config=SimpleNamespace(openai_api_key="k"))
+    assert len(response_cache) == 0
+
+
+def test_schema_invalid_summary_is_not_replayed(
+    response_cache, fake_openai, monkeypatch, tmp_path
+):
+    from jsonschema import ValidationError
+
+    from core.configuration.path_config import PathConfig
+    from core.workflows import main_commands
+
+    invoke, calls = fake_openai
+    monkeypatch.setattr(invoke, "load_prompt", lambda name: "Summarize: {text}")
+    monkeypatch.setattr(
+        invoke, "get_remote_config", lambda: SimpleNamespace(openai_api_key="k")
+    )
+
+    def reject(metadata):
+        raise ValidationError("'summary' is a required property")
+
+    monkeypatch.setattr(main_commands, "validate_metadata", reject)
+    paths = PathConfig(root=tmp_path)
+    paths.parsed.mkdir()
+    paths.metadata.mkdir()
+    (paths.parsed / "doc.txt").write_text("short note", encoding="utf-8")
+
+    with pytest.raises(ValidationError):
+        main_commands.classify("doc.txt", paths=paths)
+    assert len(calls) == 1
+    assert len(response_cache) == 0
@@ -0,0 +1,73 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm import clients
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    created = []
+
+    class _Client:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+            self.kwargs = kwargs
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(
+        clients, "openai", SimpleNamespace(OpenAI=_Client, AsyncOpenAI=_Client)
+    )
+    monkeypatch.setattr(clients, "_sync_clients", {})
+    monkeypatch.setattr(clients, "_async_clients", {})
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    return created
+
+
+def test_clients_are_reused_per_key_and_base_url(fake_openai):
+    first = clients.get_openai_client("k1")
+    assert clients.get_openai_client("k1") is first
+    assert clients.get_openai_client("k2") is not first
+    other = clients.get_openai_client("k1", base_url="http://localhost:8000/v1")
+    assert other is not first
+    assert other.kwargs["base_url"] == "http://localhost:8000/v1"
+    assert len(fake_openai) == 3
+
+    assert clients.get_async_openai_client("k1") is clients.get_async_openai_client(
+        "k1"
+    )
+    assert len(fake_openai) == 4
+
+
+def test_pooled_client_gets_tuned_connection_limits(fake_openai):
+    if clients.httpx is None:
+        pytest.skip("httpx not installed")
+    client = clients.get_openai_client("k")
+    pool = client.kwargs["http_client"]._transport._pool
+    assert pool._max_connections == clients.MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == clients.MAX_KEEPALIVE_CONNECTIONS
+
+
+def test_concurrent_callers_share_one_client(fake_openai):
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(clients.get_openai_client("k")))
+        for _ in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in seen}) == 1
+    assert len(fake_openai) == 1
+
+
+def test_close_clients_closes_and_forgets(fake_openai):
+    client = clients.get_openai_client("k")
+    clients.close_clients()
+    assert client.closed
+    assert clients.get_openai_client("k") is not client
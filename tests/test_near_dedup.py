@@ -0,0 +1,189 @@
+import random
+
+import numpy as np
+
+from core.utils.dedup import (
+    SIMHASH_DISTANCE,
+    NearDuplicateIndex,
+    dedup_lines_in_folder,
+    dedup_lines_streaming,
+    estimate_savings,
+    find_near_duplicates,
+    lsh_candidate_pairs,
+    minhash_signatures,
+    shingle_hashes,
+    simhash_lines,
+)
+
+
+def _corpus(n_docs: int = 30, words: int = 400) -> dict[str, str]:
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(3000)]
+    return {
+        f"doc{i:02d}.txt": " ".join(rng.choice(vocab) for _ in range(words))
+        for i in range(n_docs)
+    }
+
+
+def test_shingles_ignore_case_and_whitespace():
+    a = shingle_hashes("The quick  brown fox\njumps over the lazy dog")
+    b = shingle_hashes("the QUICK brown fox jumps over the lazy dog")
+    assert np.array_equal(a, b)
+    assert len(shingle_hashes("tiny")) == 1
+
+
+def test_minhash_estimates_jaccard():
+    base = np.arange(1000, dtype=np.uint64)
+    half = np.arange(500, 1500, dtype=np.uint64)  # Jaccard 1/3
+    sigs = minhash_signatures([base, base.copy(), half], num_perm=256)
+    assert np.array_equal(sigs[0], sigs[1])
+    assert abs(np.mean(sigs[0] == sigs[2]) - 1 / 3) < 0.1
+
+
+def test_minhash_splits_long_documents_across_blocks(monkeypatch):
+    import core.utils.dedup as dedup
+
+    sets = [np.arange(n, n + 700, dtype=np.uint64) for n in (0, 5, 3000)]
+    expected = minhash_signatures(sets, num_perm=32)
+    monkeypatch.setattr(dedup, "_MINHASH_BLOCK_BYTES", 32 * 8 * 100)
+    assert np.array_equal(minhash_signatures(sets, num_perm=32), expected)
+
+
+def test_lsh_candidates_only_pair_similar_rows():
+    sigs = np.array([[1, 2, 3, 4], [1, 2, 9, 9], [5, 6, 7, 8]], dtype=np.uint32)
+    assert lsh_candidate_pairs(sigs, bands=2).tolist() == [[0, 1]]
+    sigs = np.array([[1, 1], [2, 2], [1, 1], [2, 2], [1, 1]], dtype=np.uint32)
+    pairs = lsh_candidate_pairs(sigs, bands=1).tolist()
+    assert pairs == [[0, 2], [0, 4], [1, 3], [2, 4]]
+
+
+def test_near_duplicates_link_to_first_copy():
+    docs = _corpus()
+    words = docs["doc03.txt"].split()
+    words[50:55] = ["edited"] * 5
+    docs["doc03_revised.txt"] = " ".join(words)
+    docs["doc07_copy.txt"] = docs["doc07.txt"].upper()
+
+    index = NearDuplicateIndex()
+    assert index.update(docs) == len(docs)
+    assert index.duplicates() == {
+        "doc03_revised.txt": "doc03.txt",
+        "doc07_copy.txt": "doc07.txt",
+    }
+
+
+def test_index_persists_and_only_rehashes_changes(tmp_path):
+    for name, text in _corpus(5).items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    (tmp_path / "doc00_again.txt").write_text(
+        (tmp_path / "doc00.txt").read_text(encoding="utf-8"), encoding="utf-8"
+    )
+    index_path = tmp_path / "minhash.npz"
+
+    duplicates, tokens = find_near_duplicates(tmp_path, index_path=index_path)
+    assert duplicates == {"doc00_again.txt": "doc00.txt"}
+    assert sorted(tokens) == sorted(p.name for p in tmp_path.glob("*.txt"))
+    assert estimate_savings(tokens, duplicates)["tokens"] == tokens["doc00_again.txt"]
+
+    (tmp_path / "doc01.txt").write_text("something else entirely", encoding="utf-8")
+    (tmp_path / "doc02.txt").unlink()
+    index = NearDuplicateIndex.load(index_path)
+    assert len(index) == 6
+    fresh = {p.name: p.read_text(encoding="utf-8") for p in tmp_path.glob("*.txt")}
+    assert index.update(fresh) == 1
+    assert len(index) == 5
+
+    assert len(NearDuplicateIndex.load(index_path, num_perm=64, bands=8)) == 0
+
+
+def _write_prompts(folder, lines_per_file: int = 300) -> None:
+    rng = random.Random(1)
+    pool = [
+        f"prompt {i} " + " ".join(f"w{rng.randrange(500)}" for _ in range(8))
+        for i in range(400)
+    ]
+    for f in range(4):
+        lines = [rng.choice(pool) for _ in range(lines_per_file)]
+        (folder / f"p{f}.txt").write_text(
+            "\n".join(lines) + "\n\n  \n", encoding="utf-8"
+        )
+
+
+def test_streaming_dedup_matches_in_memory(tmp_path):
+    _write_prompts(tmp_path)
+    dedup_lines_in_folder(tmp_path, tmp_path / "out" / "memory.txt")
+    written = dedup_lines_streaming(
+        tmp_path, tmp_path / "out" / "stream.txt", max_lines=50
+    )
+    expected = (tmp_path / "out" / "memory.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "out" / "stream.txt").read_text(encoding="utf-8") == expected
+    assert written == len(expected.splitlines())
+
+
+def test_streaming_dedup_merges_in_passes(tmp_path, monkeypatch):
+    import core.utils.dedup as dedup
+
+    monkeypatch.setattr(dedup, "MERGE_FAN_IN", 3)
+    _write_prompts(tmp_path)
+    dedup_lines_in_folder(tmp_path, tmp_path / "out" / "memory.txt")
+    dedup_lines_streaming(tmp_path, tmp_path / "out" / "stream.txt", max_lines=40)
+    assert (tmp_path / "out" / "stream.txt").read_text(encoding="utf-8") == (
+        tmp_path / "out" / "memory.txt"
+    ).read_text(encoding="utf-8")
+
+
+def test_simhash_pass_drops_near_duplicate_lines(tmp_path):
+    rng = random.Random(2)
+    long_line = " ".join(f"w{rng.randrange(10_000)}" for _ in range(200))
+    lines = [
+        "Summarize this chat log in three bullets",
+        "summarize THIS chat   log in three bullets",
+        long_line,
+        long_line.replace(long_line.split()[100], "changed", 1),
+        "Translate the following paragraph into French",
+    ]
+    (tmp_path / "prompts.txt").write_text("\n".join(lines), encoding="utf-8")
+
+    hashes = simhash_lines(lines)
+    assert hashes[0] == hashes[1]
+    assert int(hashes[2] ^ hashes[3]).bit_count() <= SIMHASH_DISTANCE
+
+    out = tmp_path / "out.txt"
+    assert dedup_lines_streaming(tmp_path, out, max_lines=2, near_distance=3) == 3
+    kept = out.read_text(encoding="utf-8").splitlines()
+    assert kept == sorted(kept)
+    assert "Summarize this chat log in three bullets" in kept
+    assert "Translate the following paragraph into French" in kept
+
+
+def test_simhash_batches_match_single_pass(monkeypatch):
+    from core.utils import dedup
+
+    rng = random.Random(3)
+    lines = [
+        " ".join(f"w{rng.randrange(50)}" for _ in range(rng.randrange(1, 40)))
+        for _ in range(60)
+    ]
+    expected = simhash_lines(lines)
+    monkeypatch.setattr(dedup, "_SIMHASH_BATCH_WORDS", 16)
+    assert np.array_equal(simhash_lines(lines), expected)
+
+
+def test_simhash_tables_cover_distance():
+    from core.utils.dedup import _simhash_tables
+
+    rng = random.Random(4)
+    tables = _simhash_tables(3)
+    assert all(sum(width for _, width in t) >= 24 for t in tables)
+    for _ in range(200):
+        flips = rng.sample(range(64), 3)
+        a = np.array([rng.getrandbits(64)], dtype=np.uint64)
+        b = a ^ np.uint64(sum(1 << bit for bit in flips))
+        assert any(
+            all(
+                (int(a[0]) >> shift) % (1 << width)
+                == (int(b[0]) >> shift) % (1 << width)
+                for shift, width in table
+            )
+            for table in tables
+        )
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from core.retrieval import retriever as retriever_mod
+from core.retrieval.neighbors import NeighborGraph
+from core.vectorstore.faiss_store import FaissStore
+
+pytest.importorskip("faiss")
+
+
+def _unit(rows):
+    rows = np.asarray(rows, dtype="float32")
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _brute_force(store, k):
+    vecs = store.vectors()
+    sims = vecs @ vecs.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.sort(np.argsort(-sims, axis=1)[:, :k], axis=1)
+
+
+def _dense_sorted(graph):
+    idx, _ = graph._to_dense()
+    return np.sort(idx, axis=1)
+
+
+def test_build_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(0)
+    store = FaissStore(dim=8, path=tmp_path / "a.index")
+    store.add(np.arange(1, 101), _unit(rng.standard_normal((100, 8))))
+
+    graph = NeighborGraph.build(store, k=4, block_size=16)
+    assert graph.indices.dtype == np.int32 and graph.scores.dtype == np.float16
+    assert np.array_equal(_dense_sorted(graph), _brute_force(store, 4))
+
+    graph.save(tmp_path / "neighbors.npz")
+    loaded = NeighborGraph.load(tmp_path / "neighbors.npz", store)
+    assert loaded.neighbors(1, 2) == graph.neighbors(1, 2)
+    store.add([101], _unit(rng.standard_normal((1, 8))))
+    assert NeighborGraph.load(tmp_path / "neighbors.npz", store) is None
+
+
+def test_refresh_handles_changed_removed_and_new_vectors(tmp_path):
+    rng = np.random.default_rng(1)
+    vecs = _unit(rng.standard_normal((80, 8)))
+    store = FaissStore(dim=8, path=tmp_path / "a.index")
+    store.add(np.arange(1, 81), vecs)
+    graph = NeighborGraph.build(store, k=5)
+
+    vecs[10:15] = _unit(rng.standard_normal((5, 8)))
+    ids = np.r_[np.arange(1, 71), np.arange(200, 210)]
+    new_vecs = np.vstack([vecs[:70], _unit(rng.standard_normal((10, 8)))])
+    rebuilt = FaissStore(dim=8, path=tmp_path / "b.index")
+    rebuilt.add(ids[::-1], new_vecs[::-1])
+
+    refreshed = graph.refresh(rebuilt, block_size=8)
+    assert np.array_equal(_dense_sorted(refreshed), _brute_force(rebuilt, 5))
+
+
+def test_similar_uses_graph(tmp_path):
+    store = FaissStore(dim=2, path=tmp_path / "a.index")
+    store.add([1, 2, 3], _unit([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]))
+    r = retriever_mod.Retriever.__new__(retriever_mod.Retriever)
+    r.store = store
+    r.id_map = {1: "docA", 2: "docB", 3: "docC"}
+    r.neighbor_graph = NeighborGraph.build(store, k=2)
+    r.search_vectors = None  # the graph path must not search the index
+
+    assert [name for name, _ in r.similar("docA", k=2)] == ["docB", "docC"]
+    affinity = r.neighbor_graph.to_affinity([3, 1])
+    assert affinity.shape == (2, 2)
+    assert (affinity != affinity.T).nnz == 0
+
+
+def test_similar_ranks_other_documents_not_sibling_chunks(tmp_path):
+    store = FaissStore(dim=2, path=tmp_path / "a.index")
+    store.add(
+        [1, 2, 3, 4, 5],
+        _unit([[1.0, 0.0], [0.99, 0.01], [0.98, 0.02], [0.9, 0.1], [0.0, 1.0]]),
+    )
+    r = retriever_mod.Retriever.__new__(retriever_mod.Retriever)
+    r.store = store
+    r.id_map = {
+        1: "docA_chunk00",
+        2: "docA_chunk01",
+        3: "docA_chunk02",
+        4: "docB_chunk00",
+        5: "docC",
+    }
+    r.neighbor_graph = NeighborGraph.build(store, k=2)
+
+    assert [name for name, _ in r.similar("docA_chunk00", k=2)] == ["docB", "docC"]
+    r.neighbor_graph = None
+    assert [name for name, _ in r.similar("docA", k=2)] == ["docB", "docC"]
+
+
+def test_stale_graph_is_not_used_for_clustering_affinity(tmp_path, monkeypatch):
+    import json
+
+    from core.clustering import clustering_steps
+    from core.configuration.path_config import PathConfig
+
+    paths = PathConfig(root=tmp_path)
+    paths.vector.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(clustering_steps, "get_path_config", lambda: paths)
+    store = FaissStore(dim=2, path=paths.vector / "mosaic.index")
+    store.add([1, 2, 3], _unit([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]))
+    store.persist()
+    (paths.vector / "id_map.json").write_text(
+        json.dumps({"1": "docA", "2": "docB", "3": "docC", "4": "docD"})
+    )
+    NeighborGraph.build(store, k=2).save(paths.vector / "neighbors.npz")
+    names = ["docA", "docB", "docC"]
+    assert clustering_steps.load_neighbor_affinity(names).shape == (3, 3)
+
+    store.add([4], _unit([[0.5, 0.5]]))
+    store.persist()
+    assert clustering_steps.load_neighbor_affinity(names) is None
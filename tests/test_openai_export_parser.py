@@ -1,12 +1,19 @@
+import io
 import json
 import sys
+import time
 import zipfile
 from pathlib import Path
 from typing import Dict, List
 
 import pytest
 
-from core.parsing.openai_export import parse_chatgpt_export
+from core.parsing.openai_export import (
+    _iter_json_array,
+    changed_conversations,
+    load_manifest,
+    parse_chatgpt_export,
+)
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
 
@@ -194,3 +201,186 @@ def test_parse_export_sanitizes_slashes(tmp_path: Path):
     out_dir = tmp_path / "out_slash"
     parse_chatgpt_export(export_zip, out_dir)
     assert (out_dir / "0000_bs_ai_evaluation.txt").exists()
+
+
+def test_parse_export_stream_matches_default(tmp_path: Path):
+    export_zip = make_export_zip(tmp_path)
+    loaded = parse_chatgpt_export(export_zip, tmp_path / "loaded")
+    streamed = parse_chatgpt_export(export_zip, tmp_path / "streamed", stream=True)
+    assert [r["conversation"].name for r in streamed] == [
+        r["conversation"].name for r in loaded
+    ]
+    for a, b in zip(loaded, streamed):
+        assert a["conversation"].read_text() == b["conversation"].read_text()
+        assert a["prompts"].read_text() == b["prompts"].read_text()
+
+
+def test_iter_json_array_small_reads():
+    items = [
+        {"title": "a], [b", "n": 1},
+        {"title": 'quote " and , comma', "nested": [[1, 2], {"x": "]"}]},
+        "tail",
+        {"title": "x" * 100},
+    ]
+    text = "\ufeff  \n" + json.dumps(items, indent=2)
+    stream = io.StringIO(text)
+    assert list(_iter_json_array(stream, read_size=3)) == items
+    assert list(_iter_json_array(io.StringIO("[]"))) == []
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO('{"a": 1}')))
+
+
+def test_iter_json_array_throughput_close_to_json_loads():
+    # Many small elements per block: consumed text must not be re-copied per
+    # element, or streaming falls an order of magnitude behind json.loads.
+    text = json.dumps([{"id": i, "text": "x" * 170} for i in range(40_000)])
+
+    def best(fn) -> float:
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    streamed = best(lambda: sum(1 for _ in _iter_json_array(io.StringIO(text))))
+    loaded = best(lambda: json.loads(text))
+    assert streamed < 8 * loaded
+
+
+def _write_export(tmp_path: Path, conversations: List[Dict[str, object]]) -> Path:
+    export_zip = tmp_path / "export.zip"
+    with zipfile.ZipFile(export_zip, "w") as zf:
+        zf.writestr("conversations.json", json.dumps(conversations))
+    return export_zip
+
+
+def _convo(convo_id: str, title: str, reply: str, update_time: float):
+    return {
+        "id": convo_id,
+        "title": title,
+        "update_time": update_time,
+        "current_node": "2",
+        "mapping": {
+            "1": {
+                "id": "1",
+                "parent": None,
+                "children": ["2"],
+                "message": {
+                    "author": {"role": "user"},
+                    "content": {"content_type": "text", "parts": ["Hello"]},
+                },
+            },
+            "2": {
+                "id": "2",
+                "parent": "1",
+                "children": [],
+                "message": {
+                    "author": {"role": "assistant"},
+                    "content": {"content_type": "text", "parts": [reply]},
+                },
+            },
+        },
+    }
+
+
+def test_parse_export_incremental(tmp_path: Path):
+    out_dir = tmp_path / "out_inc"
+    first = [
+        _convo("aaaaaaaa-1111", "Alpha", "one", 1.0),
+        _convo("bbbbbbbb-2222", "Beta", "two", 1.0),
+    ]
+    results = parse_chatgpt_export(
+        _write_export(tmp_path, first), out_dir, incremental=True
+    )
+    names = [r["conversation"].name for r in results]
+    assert names == ["alpha_aaaaaaaa.txt", "beta_bbbbbbbb.txt"]
+    assert changed_conversations(out_dir) == [out_dir / n for n in names]
+    beta_mtime = (out_dir / "beta_bbbbbbbb.txt").stat().st_mtime_ns
+
+    # re-export: a new conversation is prepended, Alpha is edited and
+    # retitled, Beta is untouched
+    second = [
+        _convo("cccccccc-3333", "Gamma", "three", 2.0),
+        _convo("aaaaaaaa-1111", "Alpha renamed", "one, edited", 2.0),
+        _convo("bbbbbbbb-2222", "Beta", "two", 1.0),
+    ]
+    results = parse_chatgpt_export(
+        _write_export(tmp_path, second), out_dir, incremental=True
+    )
+    assert [r["conversation"].name for r in results] == [
+        "gamma_cccccccc.txt",
+        "alpha_aaaaaaaa.txt",
+        "beta_bbbbbbbb.txt",
+    ]
+    assert [p.name for p in changed_conversations(out_dir)] == [
+        "gamma_cccccccc.txt",
+        "alpha_aaaaaaaa.txt",
+    ]
+    assert "one, edited" in (out_dir / "alpha_aaaaaaaa.txt").read_text()
+    assert (out_dir / "beta_bbbbbbbb.txt").stat().st_mtime_ns == beta_mtime
+
+    # bumped update_time without content changes is not a rewrite
+    third = [_convo("bbbbbbbb-2222", "Beta", "two", 3.0)]
+    parse_chatgpt_export(_write_export(tmp_path, third), out_dir, incremental=True)
+    manifest = load_manifest(out_dir)
+    assert manifest["last_run"]["changed"] == []
+    assert manifest["last_run"]["removed"] == ["aaaaaaaa-1111", "cccccccc-3333"]
+    assert manifest["conversations"]["bbbbbbbb-2222"]["update_time"] == 3.0
+
+
+def test_parse_export_workers_match_serial(tmp_path: Path):
+    convos = [_convo(f"{i:08d}-id", f"Chat {i}", f"reply {i}", 1.0) for i in range(25)]
+    export_zip = _write_export(tmp_path, convos)
+    serial = parse_chatgpt_export(export_zip, tmp_path / "serial")
+    pooled = parse_chatgpt_export(
+        export_zip, tmp_path / "pooled", incremental=True, workers=2
+    )
+    assert len(pooled) == len(serial)
+    for a, b in zip(serial, pooled):
+        assert a["conversation"].read_text() == b["conversation"].read_text()
+        assert a["prompts"].read_text() == b["prompts"].read_text()
+    assert len(changed_conversations(tmp_path / "pooled")) == 25
+
+    again = parse_chatgpt_export(
+        export_zip, tmp_path / "pooled", incremental=True, workers=2
+    )
+    assert [r["conversation"] for r in again] == [r["conversation"] for r in pooled]
+    assert changed_conversations(tmp_path / "pooled") == []
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_parse_export_columnar(tmp_path: Path, suffix: str):
+    pytest.importorskip("pyarrow")
+    from core.parsing.message_table import read_messages
+
+    convos = [
+        _convo("aaaaaaaa-1", "Alpha", "one two three", 1.0),
+        _convo("bbbbbbbb-2", "Beta", "four", 2.0),
+    ]
+    convos[0]["mapping"]["2"]["message"]["create_time"] = 123.5
+    table_path = tmp_path / f"messages{suffix}"
+    parse_chatgpt_export(
+        _write_export(tmp_path, convos),
+        tmp_path / "out_col",
+        stream=True,
+        workers=2,
+        columnar=table_path,
+        count_tokens=_word_count,
+    )
+    rows = read_messages(table_path).to_pylist()
+    assert [(r["conversation_id"], r["position"], r["role"]) for r in rows] == [
+        ("aaaaaaaa-1", 0, "user"),
+        ("aaaaaaaa-1", 1, "assistant"),
+        ("bbbbbbbb-2", 0, "user"),
+        ("bbbbbbbb-2", 1, "assistant"),
+    ]
+    assert rows[1]["text"] == "one two three"
+    assert rows[1]["token_count"] == 3
+    assert rows[1]["timestamp"] == 123.5
+    assert rows[0]["timestamp"] is None
+    assert read_messages(table_path, columns=["text"]).column_names == ["text"]
@@ -0,0 +1,33 @@
+from core.configuration.path_config import PathConfig
+from core.storage.parallel_ingest import ingest_directory, ingest_files
+
+
+def _setup(tmp_path):
+    src = tmp_path / "drop"
+    src.mkdir()
+    for i in range(6):
+        (src / f"Doc {i}.txt").write_text(f"document {i}", encoding="utf-8")
+    (src / "broken.xyz").write_bytes(b"\xff\xfe not utf-8")
+    return src, PathConfig(root=tmp_path / "out")
+
+
+def test_parallel_ingest_isolates_failures(tmp_path):
+    src, paths = _setup(tmp_path)
+    results = ingest_directory(src, paths=paths, workers=2)
+
+    assert [r.path.name for r in results] == sorted(p.name for p in src.iterdir())
+    failed = [r for r in results if not r.ok]
+    assert [r.path.name for r in failed] == ["broken.xyz"]
+    assert (paths.parsed / "doc_3.txt").read_text(encoding="utf-8") == "document 3"
+    assert (paths.metadata / "doc_3.txt.stub.json").exists()
+
+
+def test_unordered_serial_and_parallel_agree(tmp_path):
+    src, paths = _setup(tmp_path)
+    files = sorted(src.glob("*.txt"))
+    serial = {r.path.name: r.stub for r in ingest_files(files, paths, workers=1)}
+    parallel = {
+        r.path.name: r.stub
+        for r in ingest_files(files, paths, workers=3, chunksize=1, ordered=False)
+    }
+    assert serial == parallel
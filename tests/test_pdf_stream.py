@@ -0,0 +1,42 @@
+import pytest
+
+from core.configuration.path_config import PathConfig
+from core.parsing import pdf_stream
+from core.parsing.extract_text import extract_text
+from core.storage.upload_local import prepare_document_for_processing
+
+fitz = pytest.importorskip("fitz")
+
+
+def _make_pdf(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {i} text")
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_stream_matches_extract_text(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(pdf_stream, "PARALLEL_PAGE_THRESHOLD", 4)
+    monkeypatch.setattr(pdf_stream, "MIN_PAGES_PER_WORKER", 2)
+    pdf = tmp_path / "big.pdf"
+    _make_pdf(pdf, 7)
+
+    dest = tmp_path / "big.txt"
+    offsets = pdf_stream.stream_pdf_to_file(pdf, dest, workers=workers)
+    text = dest.read_text(encoding="utf-8")
+
+    assert text == extract_text(str(pdf))
+    assert len(offsets) == 7
+    assert text[offsets[5] :].startswith("page 5")
+    assert pdf_stream.page_for_offset(offsets, offsets[5] + 3) == 5
+    assert not list(tmp_path.glob("*.partial*"))
+
+
+def test_stub_records_page_offsets(tmp_path):
+    pdf = tmp_path / "Report.pdf"
+    _make_pdf(pdf, 3)
+    stub = prepare_document_for_processing(pdf, paths=PathConfig(root=tmp_path / "out"))
+    assert len(stub["page_offsets"]) == 3
+    assert stub["page_offsets"][0] == 0
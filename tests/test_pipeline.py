@@ -4,7 +4,7 @@ import sys
 import tempfile
 from pathlib import Path
 from types import ModuleType
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 import pytest
 
@@ -166,6 +166,7 @@ def test_run_pipeline_happy_path(sample_paths: PathConfig) -> None:
         method="summary",
         out_path=sample_paths.root / "rich_doc_embeddings.json",
         segment_mode=sample_paths.semantic_chunking,
+        job=ANY,
     )
 
 
@@ -198,3 +199,49 @@ def test_run_pipeline_processes_nested_directories(sample_paths: PathConfig) ->
 
     classify_mock.assert_called_once()
     embed_mock.assert_called_once()
+
+
+def test_run_pipeline_skips_near_duplicates(sample_paths: PathConfig) -> None:
+    """Near-duplicates are neither classified nor embedded."""
+    text = " ".join(f"word{i}" for i in range(200))
+    (sample_paths.parsed / "example.txt").write_text(text, encoding="utf-8")
+    (sample_paths.parsed / "example_copy.txt").write_text(text, encoding="utf-8")
+
+    with (
+        patch.object(pipeline, "upload_and_prepare"),
+        patch.object(pipeline, "classify") as classify_mock,
+        patch.object(pipeline, "generate_embeddings") as embed_mock,
+    ):
+        pipeline.run_pipeline(
+            input_dir=sample_paths.raw,
+            paths=sample_paths,
+            near_duplicates="skip",
+        )
+
+    classify_mock.assert_called_once()
+    assert classify_mock.call_args.args == ("example.txt",)
+    assert embed_mock.call_args.kwargs["exclude"] == {"example_copy.txt"}
+    assert (sample_paths.vector / "minhash.npz").exists()
+
+
+def test_run_pipeline_only_processes_listed_files(sample_paths: PathConfig) -> None:
+    """``only`` (e.g. changed ChatGPT transcripts) limits parse and classify."""
+    (sample_paths.raw / "fresh.md").write_text("new content", encoding="utf-8")
+    (sample_paths.parsed / "fresh.txt").write_text("parsed new", encoding="utf-8")
+
+    with (
+        patch.object(pipeline, "upload_and_prepare") as upload_mock,
+        patch.object(pipeline, "classify") as classify_mock,
+        patch.object(pipeline, "generate_embeddings") as embed_mock,
+    ):
+        pipeline.run_pipeline(
+            input_dir=sample_paths.raw,
+            paths=sample_paths,
+            only=[sample_paths.raw / "fresh.md"],
+        )
+
+    assert [call.args[0] for call in upload_mock.call_args_list] == [
+        sample_paths.raw / "fresh.md"
+    ]
+    assert [call.args[0] for call in classify_mock.call_args_list] == ["fresh.txt"]
+    embed_mock.assert_called_once()
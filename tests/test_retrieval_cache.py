@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from core.retrieval import retriever as retriever_mod
+from core.retrieval.cache import ResultCache
+
+
+class DummyStore:
+    path = "dummy.index"
+
+    def __init__(self):
+        self.version = "v1"
+        self.calls = 0
+
+    def search(self, vec, k):
+        self.calls += 1
+        return [(10, 0.9)]
+
+
+def _make_retriever(store, cache):
+    r = retriever_mod.Retriever.__new__(retriever_mod.Retriever)
+    r.store = store
+    r.model = "dummy"
+    r.id_map = {10: "docA"}
+    r.chunk_dir = None
+    r.cache = cache
+    return r
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", "v1", [("docA", 0.1)])
+    cache.put("b", "v1", [("docB", 0.2)])
+    assert cache.get("a", "v1") == [("docA", 0.1)]
+    cache.put("c", "v1", [("docC", 0.3)])
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") is not None
+    assert len(cache) == 2
+
+
+def test_version_mismatch_is_a_miss():
+    cache = ResultCache()
+    cache.put("a", "v1", [("docA", 0.1)])
+    assert cache.get("a", "v2") is None
+    assert cache.get("a", "v1") is None
+
+
+def test_sqlite_cache_shared_between_instances(tmp_path):
+    db = tmp_path / "results.sqlite"
+    ResultCache(path=db).put("a", "v3", [("docA", 0.5, "text")])
+    other = ResultCache(path=db)
+    assert other.get("a", "v3") == [("docA", 0.5, "text")]
+    assert other.get("a", "v4") is None
+    assert ResultCache(path=db).get("a", "v3") is None
+
+
+def test_retriever_reuses_results_until_version_bump(monkeypatch):
+    monkeypatch.setattr(retriever_mod, "embed_text", lambda text, model="d": [0.0])
+    store = DummyStore()
+    r = _make_retriever(store, ResultCache())
+
+    assert r.query("hello", k=1) == [("docA", 0.9)]
+    assert r.query("hello", k=1) == [("docA", 0.9)]
+    assert store.calls == 1
+
+    store.version = "v2"
+    r.query("hello", k=1)
+    assert store.calls == 2
+
+
+def test_store_version_tracks_contents(tmp_path):
+    pytest.importorskip("faiss")
+    from core.vectorstore.faiss_store import FaissStore
+
+    vecs = np.eye(3, dtype="float32")
+    a = FaissStore(dim=3, path=tmp_path / "a.index")
+    a.add([1, 2], vecs[:2])
+    a.persist()
+    b = FaissStore(dim=3, path=tmp_path / "b.index")
+    b.add([1, 2], vecs[:2])
+    assert a.version == b.version
+    assert FaissStore(dim=3, path=tmp_path / "a.index").version == a.version
+
+    b.add([3], vecs[2:])
+    assert b.version != a.version
@@ -0,0 +1,39 @@
+import numpy as np
+
+from core.retrieval import retriever as retriever_mod
+from core.retrieval.rerank import mmr
+
+
+def test_mmr_skips_near_duplicates():
+    vecs = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]], dtype="float32")
+    relevance = np.array([0.9, 0.89, 0.5], dtype="float32")
+    assert list(mmr(relevance, vecs, 2, lambda_=0.5)) == [0, 2]
+    assert list(mmr(relevance, vecs, 2, lambda_=1.0)) == [0, 1]
+    assert len(mmr(relevance, vecs, 10)) == 3
+
+
+class VectorStore:
+    path = "dummy.index"
+    version = 1
+    vectors = {1: [1.0, 0.0], 2: [0.99, 0.01], 3: [0.0, 1.0]}
+
+    def search(self, vec, k):
+        return [(1, 0.9), (2, 0.89), (3, 0.5)][:k]
+
+    def get_vectors(self, ids):
+        return np.asarray([self.vectors[i] for i in ids], dtype="float32")
+
+
+def test_query_mmr_returns_diverse_documents(monkeypatch):
+    monkeypatch.setattr(retriever_mod, "embed_text", lambda text, model="d": [1.0, 0.0])
+    r = retriever_mod.Retriever.__new__(retriever_mod.Retriever)
+    r.store = VectorStore()
+    r.model = "dummy"
+    r.id_map = {1: "docA_chunk0", 2: "docA_chunk1", 3: "docB_chunk0"}
+    r.chunk_dir = None
+
+    assert [n for n, _ in r.query("q", k=2)] == ["docA_chunk0", "docA_chunk1"]
+    assert [n for n, _ in r.query("q", k=2, mmr=True)] == [
+        "docA_chunk0",
+        "docB_chunk0",
+    ]
@@ -0,0 +1,116 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from core.retrieval import retriever as retriever_mod
+from core.retrieval.cache import ResultCache
+from core.retrieval.server import MicroBatcher
+
+
+class BatchStore:
+    path = "dummy.index"
+    version = 1
+
+    def __init__(self):
+        self.batch_calls = 0
+        self.vectors = {10: [1.0, 0.0], 11: [0.0, 1.0]}
+
+    def search_batch(self, vecs, k):
+        self.batch_calls += 1
+        out = []
+        for vec in vecs:
+            hits = [(i, float(np.dot(vec, v))) for i, v in self.vectors.items()]
+            out.append(sorted(hits, key=lambda h: h[1], reverse=True)[:k])
+        return out
+
+    def get_vectors(self, ids):
+        return np.asarray([self.vectors[i] for i in ids], dtype="float32")
+
+
+def _make_retriever(store, cache=None):
+    r = retriever_mod.Retriever.__new__(retriever_mod.Retriever)
+    r.store = store
+    r.model = "dummy"
+    r.id_map = {10: "docA", 11: "docB"}
+    r.chunk_dir = None
+    r.cache = cache
+    return r
+
+
+def _embed(calls):
+    def embed(texts):
+        calls.append(list(texts))
+        return [[1.0, 0.0] if t.startswith("a") else [0.0, 1.0] for t in texts]
+
+    return embed
+
+
+def test_batcher_coalesces_concurrent_requests():
+    calls = []
+    store = BatchStore()
+    batcher = MicroBatcher(
+        _make_retriever(store), embed_batch=_embed(calls), max_wait_ms=50
+    )
+
+    async def run():
+        results = await asyncio.gather(
+            batcher.submit(["alpha"], k=1),
+            batcher.submit(["beta"], k=2),
+            batcher.submit(["alpha"], k=1),
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] == [("docA", 1.0)]
+    assert [name for name, _ in results[1]] == ["docB", "docA"]
+    assert results[2] == results[0]
+    assert calls == [["alpha", "beta"]]
+    assert store.batch_calls == 1
+    assert batcher.batches == 1 and batcher.requests == 3
+
+
+def test_batcher_serves_repeats_from_cache():
+    calls = []
+    batcher = MicroBatcher(
+        _make_retriever(BatchStore(), ResultCache()), embed_batch=_embed(calls)
+    )
+
+    async def run():
+        first = await batcher.submit(["alpha"], k=1)
+        second = await batcher.submit(["alpha"], k=1)
+        await batcher.stop()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_similar_excludes_the_document_itself():
+    r = _make_retriever(BatchStore())
+    assert r.similar("docA", k=1) == [("docB", 0.0)]
+    with pytest.raises(KeyError):
+        r.similar("missing")
+
+
+def test_http_endpoints():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from core.retrieval.server import create_app
+
+    app = create_app(_make_retriever(BatchStore()), embed_batch=_embed([]))
+    with TestClient(app) as client:
+        body = client.post("/search", json={"query": "alpha", "k": 1}).json()
+        assert body["results"] == [["docA", 1.0]]
+        body = client.post(
+            "/search_batch", json={"queries": ["alpha", "beta"], "k": 1}
+        ).json()
+        assert body["results"] == [[["docA", 1.0]], [["docB", 1.0]]]
+        assert client.get("/similar/docB", params={"k": 1}).json()["results"] == [
+            ["docA", 0.0]
+        ]
+        assert client.get("/similar/nope").status_code == 404
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+import tiktoken
+
+from core.configuration.path_config import PathConfig
+from core.parsing.texttiling import (
+    boundary_labels,
+    depth_scores,
+    texttiling_boundaries,
+)
+
+
+def _windows(lengths, dim=32, noise=0.1, seed=0):
+    """Half-overlapping windows over runs of per-topic units."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((len(lengths), dim))
+    rows = np.repeat(centers, lengths, axis=0)
+    rows += noise * rng.standard_normal(rows.shape)
+    return (rows[:-1] + rows[1:]) / 2
+
+
+def test_boundaries_at_topic_shifts():
+    found = texttiling_boundaries(_windows([8, 5, 10]))
+    assert len(found) == 2
+    assert abs(found[0] - 8) <= 1 and abs(found[1] - 13) <= 1
+    assert boundary_labels(7, [2, 5]) == [0, 0, 1, 1, 1, 2, 2]
+
+
+def test_single_topic_and_tiny_inputs():
+    flat = np.ones((6, 4))
+    assert texttiling_boundaries(flat) == []
+    assert texttiling_boundaries(np.ones((1, 4))) == []
+    assert boundary_labels(3, []) == [0, 0, 0]
+
+
+def test_depth_scores_climb_to_peaks():
+    sims = np.array([0.9, 0.8, 0.2, 0.7, 0.95])
+    depth = depth_scores(sims, smoothing=0)
+    assert depth[2] == pytest.approx((0.9 - 0.2) + (0.95 - 0.2))
+    assert depth[0] == 0 and depth[-1] == 0
+
+
+def test_min_gap_keeps_deeper_boundary():
+    rng = np.random.default_rng(1)
+    a, b, c = rng.standard_normal((3, 8))
+    vectors = np.stack([a] * 6 + [b] + [c] * 6)
+    assert len(texttiling_boundaries(vectors, smoothing=0, min_gap=3)) == 1
+
+
+def test_semantic_chunk_texttiling(monkeypatch):
+    import core.parsing.semantic_chunk as sc_module
+
+    class DummyEncoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+        def decode(self, tokens):
+            return " ".join(tokens)
+
+    def fake_batch(texts, model=None, embedder=None):
+        return [[1.0, 0.0] if "Cats" in t else [0.0, 1.0] for t in texts]
+
+    def no_clustering(*args, **kwargs):
+        raise AssertionError("texttiling must not cluster")
+
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: DummyEncoding())
+    monkeypatch.setattr(sc_module, "embed_text_batch", fake_batch)
+    monkeypatch.setattr(sc_module, "_cluster_embeddings", no_clustering)
+
+    text = ("Cats purr. " * 20) + ("Python codes. " * 20)
+    chunks = sc_module.semantic_chunk(
+        text, window_tokens=10, step_tokens=5, boundary_method="texttiling"
+    )
+    assert [c["cluster_id"] for c in chunks] == [0, 1]
+    assert "Python" not in chunks[0]["text"]
+
+
+def test_semantic_chunk_pooled_skips_second_pass(monkeypatch):
+    import core.parsing.semantic_chunk as sc_module
+
+    class DummyEncoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+        def decode(self, tokens):
+            return " ".join(tokens)
+
+    calls = []
+
+    def fake_batch(texts, model=None, embedder=None):
+        calls.append(len(texts))
+        return [[1.0, 0.0] if "Cats" in t else [0.0, 1.0] for t in texts]
+
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: DummyEncoding())
+    monkeypatch.setattr(sc_module, "embed_text_batch", fake_batch)
+
+    text = ("Cats purr. " * 20) + ("Python codes. " * 20)
+    kwargs = dict(window_tokens=10, step_tokens=5, boundary_method="texttiling")
+    embedded = sc_module.semantic_chunk(text, **kwargs)
+    assert len(calls) == 2
+    calls.clear()
+    pooled = sc_module.semantic_chunk(text, segment_vectors="pooled", **kwargs)
+    assert len(calls) == 1
+    assert [c["text"] for c in pooled] == [c["text"] for c in embedded]
+    for a, b in zip(pooled, embedded):
+        assert np.dot(a["embedding"], b["embedding"]) > 0.9
+
+
+def test_path_config_segment_boundary(tmp_path):
+    assert PathConfig(root=tmp_path).segment_boundary == "cluster"
+    pc = PathConfig(root=tmp_path, segment_boundary="texttiling")
+    assert pc.segment_boundary == "texttiling"
+    with pytest.raises(ValueError):
+        PathConfig(root=tmp_path, segment_boundary="umap")
+
+
+def test_pool_window_vectors_token_weighted():
+    from core.parsing.semantic_chunk import pool_window_vectors
+
+    windows = [[1.0, 0.0], [0.0, 1.0], [0.0, 1.0]]
+    spans = [(0, 10), (5, 15), (10, 18)]
+    pooled = pool_window_vectors(windows, spans, [(0, 10), (10, 18)])
+    # first segment: 10 tokens of window 0, 5 of window 1
+    expected = np.array([10.0, 5.0]) / np.hypot(10.0, 5.0)
+    assert np.allclose(pooled[0], expected)
+    assert np.allclose(pooled[1], [0.0, 1.0])
@@ -0,0 +1,54 @@
+import pytest
+
+from core.parsing.token_chunker import Span, token_chunks, word_offsets
+
+
+def _chunks(text, **kwargs):
+    return token_chunks(text, token_offsets=word_offsets, **kwargs)
+
+
+def test_spans_respect_budget_and_cover_text():
+    paras = [" ".join(f"w{p}_{i}." for i in range(7)) for p in range(6)]
+    text = "\n\n".join(paras)
+    n_tokens = len(word_offsets(text))
+    spans = _chunks(text, max_tokens=20)
+    assert all(span.n_tokens <= 20 for span in spans)
+    assert spans[0].token_start == 0 and spans[-1].token_end == n_tokens
+    for a, b in zip(spans, spans[1:]):
+        assert a.token_end == b.token_start
+    # every paragraph is 14 tokens, so each chunk is exactly one paragraph
+    assert [span.slice(text) for span in spans] == paras
+
+
+def test_falls_back_to_sentences_then_tokens():
+    sentence = "alpha beta gamma delta epsilon zeta."  # 7 tokens
+    text = " ".join([sentence] * 4)
+    spans = _chunks(text, max_tokens=16)
+    assert [span.slice(text) for span in spans] == [sentence + " " + sentence] * 2
+
+    words = " ".join(f"x{i}" for i in range(25))
+    spans = _chunks(words, max_tokens=10)
+    assert [span.n_tokens for span in spans] == [10, 10, 5]
+    assert spans[0].slice(words) == " ".join(f"x{i}" for i in range(10))
+    assert spans[1].slice(words).startswith("x10")
+
+
+def test_overlap_and_offsets():
+    words = " ".join(f"x{i}" for i in range(20))
+    spans = _chunks(words, max_tokens=8, overlap=3)
+    assert [(s.token_start, s.token_end) for s in spans] == [
+        (0, 8),
+        (5, 13),
+        (10, 18),
+        (15, 20),
+    ]
+    assert spans[1].slice(words).split()[0] == "x5"
+    assert spans[0] == Span(0, len(" ".join(f"x{i}" for i in range(8))), 0, 8)
+
+
+def test_rejects_bad_arguments():
+    assert _chunks("") == []
+    with pytest.raises(ValueError):
+        _chunks("text", max_tokens=0)
+    with pytest.raises(ValueError):
+        _chunks("text", max_tokens=4, overlap=4)
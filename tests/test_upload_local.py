@@ -0,0 +1,64 @@
+import os
+
+from core.configuration.path_config import PathConfig
+from core.storage import upload_local
+
+
+def test_unchanged_files_are_not_reextracted(tmp_path, monkeypatch):
+    calls = []
+    real_extract = upload_local.extract_text
+
+    def counting_extract(path):
+        calls.append(path)
+        return real_extract(path)
+
+    monkeypatch.setattr(upload_local, "extract_text", counting_extract)
+    paths = PathConfig(root=tmp_path / "out")
+    src = tmp_path / "Notes.txt"
+    src.write_text("first", encoding="utf-8")
+
+    stub = upload_local.prepare_document_for_processing(src, paths=paths)
+    assert stub["ingest"]["size"] == 5
+    assert os.stat(stub["source_file"]).st_ino != src.stat().st_ino
+    assert len(calls) == 1
+
+    assert upload_local.prepare_document_for_processing(src, paths=paths) == stub
+    os.utime(src, ns=(src.stat().st_atime_ns, src.stat().st_mtime_ns + 10**9))
+    upload_local.prepare_document_for_processing(src, paths=paths)
+    assert len(calls) == 1
+
+    src.unlink()
+    src.write_text("second", encoding="utf-8")
+    stub = upload_local.prepare_document_for_processing(src, paths=paths)
+    assert len(calls) == 2
+    assert (paths.parsed / "notes.txt").read_text(encoding="utf-8") == "second"
+    assert upload_local.prepare_document_for_processing(src, paths=paths, force=True)
+    assert len(calls) == 3
+
+
+def test_archived_raw_file_does_not_alias_the_source(tmp_path):
+    paths = PathConfig(root=tmp_path / "out")
+    src = tmp_path / "notes.txt"
+    src.write_text("first", encoding="utf-8")
+    upload_local.prepare_document_for_processing(src, paths=paths)
+
+    with src.open("r+", encoding="utf-8") as fh:  # edit in place, same inode
+        fh.write("FIRST")
+    os.utime(src, ns=(src.stat().st_atime_ns, src.stat().st_mtime_ns + 10**9))
+    assert (paths.raw / "notes.txt").read_text(encoding="utf-8") == "first"
+
+    upload_local.prepare_document_for_processing(src, paths=paths)
+    assert (paths.raw / "notes.txt").read_text(encoding="utf-8") == "FIRST"
+    assert (paths.parsed / "notes.txt").read_text(encoding="utf-8") == "FIRST"
+
+
+def test_link_or_copy_replaces_an_old_hardlink(tmp_path):
+    src = tmp_path / "a.txt"
+    src.write_text("data", encoding="utf-8")
+    dest = tmp_path / "raw" / "a.txt"
+    dest.parent.mkdir()
+    os.link(src, dest)
+
+    assert upload_local.link_or_copy(src, dest) in {"reflink", "copy"}
+    assert not dest.samefile(src)
+    assert upload_local.link_or_copy(src, src) == "existing"